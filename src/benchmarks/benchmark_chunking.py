@@ -0,0 +1,88 @@
+import argparse
+import glob
+import os
+import time
+from collections.abc import Callable
+from functools import partial
+
+from loguru import logger
+
+from src.configs.settings import Settings
+from src.steps.generate_summaries.chunking import SectionChunker, get_token_counter, rough_token_count
+
+
+def split_equal_word_slices(text: str, max_tokens: int) -> list[str]:
+    """The previous chunker: equal word slices sized from the words/0.75 token estimate."""
+    token_count = rough_token_count(text)
+    if token_count <= max_tokens:
+        return [text]
+
+    words = text.split()
+    chunk_len = int(len(words) * max_tokens / token_count)
+    return [" ".join(words[i : i + chunk_len]) for i in range(0, len(words), chunk_len)]
+
+
+def llm_calls(chunks: list[str]) -> int:
+    """Number of completions needed to summarize an article split into `chunks` (map, then combine)."""
+    return 1 if len(chunks) == 1 else len(chunks) + 1
+
+
+def run_benchmark(articles: dict[str, str], budgets: list[int], model: str) -> None:
+    """
+    Compare the word-slice and section-aware chunkers on the same articles.
+
+    For every budget, reports the LLM calls needed per article, and how many chunks exceed
+    the budget when measured with the model's tokenizer (requests that would fail).
+
+    Args:
+        articles (dict[str, str]): Article text per file name.
+        budgets (list[int]): Token budgets to compare.
+        model (str): Model whose tokenizer measures the chunks.
+    """
+    count_tokens = get_token_counter(model)
+    total_tokens = sum(count_tokens(text) for text in articles.values())
+    logger.info(f"Chunking {len(articles)} articles ({total_tokens} tokens with the {model} tokenizer)")
+
+    for budget in budgets:
+        chunker = SectionChunker(budget, count_tokens)
+        splitters: dict[str, Callable[[str], list[str]]] = {
+            "word_slices": partial(split_equal_word_slices, max_tokens=budget),
+            "sections": chunker.chunk,
+        }
+        for name, split in splitters.items():
+            start = time.perf_counter()
+            chunked = [split(text) for text in articles.values()]
+            elapsed = time.perf_counter() - start
+
+            sizes = [count_tokens(chunk) for chunks in chunked for chunk in chunks]
+            calls = sum(llm_calls(chunks) for chunks in chunked)
+            oversized = sum(size > budget for size in sizes)
+            logger.info(
+                f"budget {budget:6} | {name:11} | {calls:4} LLM calls | {len(sizes):4} chunks | "
+                f"{oversized:3} over budget | largest {max(sizes):6} tokens | {elapsed * 1000:7.1f} ms"
+            )
+
+        # a second pass over the same articles is served from the per-section token cache
+        start = time.perf_counter()
+        for text in articles.values():
+            chunker.chunk(text)
+        logger.info(f"budget {budget:6} | sections    | cached re-chunk {(time.perf_counter() - start) * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the word-slice and section-aware chunkers.")
+    parser.add_argument("--budgets", type=int, nargs="+", default=[2_000, 4_000, 8_000], help="Token budgets per chunk.")
+    parser.add_argument("--model", help="Model whose tokenizer measures the chunks. Defaults to the LLM model setting.")
+    args = parser.parse_args()
+
+    settings = Settings()
+    settings.load_yaml()
+
+    articles = {}
+    for path in sorted(glob.glob(os.path.join(settings.yaml_config.output_dir, "*.md"))):
+        with open(path, encoding="utf-8") as f:
+            articles[os.path.basename(path)] = f.read()
+    if not articles:
+        raise ValueError("No crawled articles found to chunk")
+
+    run_benchmark(articles, args.budgets, args.model or settings.openai_llm_model)
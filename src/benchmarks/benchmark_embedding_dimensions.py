@@ -0,0 +1,87 @@
+import argparse
+import math
+import random
+import time
+
+import bson
+from loguru import logger
+
+from src.benchmarks.benchmark_vector_encoding import cosine, load_vectors, normalize, top_k
+from src.configs.settings import Settings
+from src.infra.vector_encoding import encode_vector, truncate_vector
+
+
+def matryoshka_vectors(
+    count: int, dimensions: int, queries: int, noise: float
+) -> tuple[list[list[float]], list[list[float]]]:
+    """
+    Random unit vectors whose leading components carry most of the variance, like shortened embeddings.
+
+    Args:
+        count (int): Number of corpus vectors.
+        dimensions (int): Number of dimensions.
+        queries (int): Number of queries.
+        noise (float): Standard deviation of the perturbation of the queries.
+
+    Returns:
+        tuple[list[list[float]], list[list[float]]]: The corpus and the queries.
+    """
+    rng = random.Random(42)
+    scales = [1 / math.sqrt(1 + i / 32) for i in range(dimensions)]
+    corpus = [normalize([rng.gauss(0, scale) for scale in scales]) for _ in range(count)]
+    picked = rng.sample(corpus, min(queries, count))
+    return corpus, [
+        normalize([x + rng.gauss(0, noise * scale) for x, scale in zip(vector, scales, strict=True)]) for vector in picked
+    ]
+
+
+def run_benchmark(corpus: list[list[float]], queries: list[list[float]], sizes: list[int], k: int) -> None:
+    """
+    Compare retrieval recall, exact search latency and storage size of shortened embeddings.
+
+    Recall@k is measured against the exact cosine top-k of the full-size vectors. Latency is
+    the mean time of an exact (brute-force) search per query; storage is the BSON size of all
+    vectors stored as double arrays and as float32 vectors.
+
+    Args:
+        corpus (list[list[float]]): Full-size stored vectors.
+        queries (list[list[float]]): Full-size query vectors.
+        sizes (list[int]): Numbers of dimensions to compare.
+        k (int): Number of neighbours compared.
+    """
+    full_size = len(corpus[0])
+    logger.info(f"{len(corpus)} vectors of {full_size} dimensions, {len(queries)} queries, recall@{k}")
+    exact = [top_k([cosine(query, vector) for vector in corpus], k) for query in queries]
+
+    for size in sorted({min(size, full_size) for size in sizes}):
+        shortened = [truncate_vector(vector, size) for vector in corpus]
+        start = time.perf_counter()
+        found = [top_k([cosine(truncate_vector(query, size), vector) for vector in shortened], k) for query in queries]
+        latency = (time.perf_counter() - start) / len(queries)
+
+        recall = sum(len(a & b) / k for a, b in zip(exact, found, strict=True)) / len(queries)
+        array_bytes = len(bson.encode({"embedding": shortened[0]})) * len(corpus)
+        float32_bytes = len(bson.encode({"embedding": encode_vector(shortened[0], "float32")})) * len(corpus)
+        logger.info(
+            f"{size:5} dims | recall@{k} {recall:.3f} | {latency * 1000:7.2f} ms per query | "
+            f"array {array_bytes / 1e6:6.2f} MB | float32 {float32_bytes / 1e6:6.2f} MB"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare embedding sizes on recall, search latency and storage.")
+    parser.add_argument("--from-mongo", action="store_true", help="Use the stored embeddings instead of random ones.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[256, 512, 1536], help="Dimensions to compare.")
+    parser.add_argument("--count", type=int, default=500, help="Number of synthetic vectors.")
+    parser.add_argument("--dimensions", type=int, default=1536, help="Dimensions of the synthetic vectors.")
+    parser.add_argument("--queries", type=int, default=50, help="Number of queries.")
+    parser.add_argument("--noise", type=float, default=0.5, help="Perturbation of the synthetic queries.")
+    parser.add_argument("--k", type=int, default=10, help="Number of neighbours compared.")
+    args = parser.parse_args()
+
+    if args.from_mongo:
+        # stored vectors must be full-size embeddings for the comparison to be meaningful
+        corpus, queries = load_vectors(Settings(), args.queries)
+    else:
+        corpus, queries = matryoshka_vectors(args.count, args.dimensions, args.queries, args.noise)
+    run_benchmark(corpus, queries, args.sizes, args.k)
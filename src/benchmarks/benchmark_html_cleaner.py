@@ -0,0 +1,113 @@
+import argparse
+import glob
+import os
+import time
+from collections.abc import Callable
+
+from loguru import logger
+
+from src.configs.settings import Settings
+from src.steps.etl.html_cleaner import HTML_CLEANERS
+
+
+def load_saved_sections(html_dir: str) -> list[str]:
+    """
+    Load saved section HTML files (one section per `.html` file).
+
+    Args:
+        html_dir (str): Directory containing the saved HTML files.
+
+    Returns:
+        list[str]: The HTML of every saved section.
+    """
+    sections = []
+    for path in sorted(glob.glob(os.path.join(html_dir, "*.html"))):
+        with open(path, encoding="utf-8") as f:
+            sections.append(f.read())
+    return sections
+
+
+def synthesize_sections(output_dir: str) -> list[str]:
+    """
+    Build Wikipedia-like section HTML from the crawled article texts, with links,
+    citation superscripts, styles and tables, for runs without saved HTML.
+
+    Args:
+        output_dir (str): Directory holding the crawled article text files.
+
+    Returns:
+        list[str]: Synthetic HTML sections.
+    """
+    sections = []
+    for path in sorted(glob.glob(os.path.join(output_dir, "*.md"))):
+        with open(path, encoding="utf-8") as f:
+            blocks = [block for block in f.read().split("\n\n") if len(block.split()) > 20]
+
+        for n, block in enumerate(blocks):
+            words = [f'<a href="/wiki/{w}" title="{w}">{w}</a>' if i % 9 == 0 else w for i, w in enumerate(block.split())]
+            sentences = " ".join(words).replace(". ", f'.<sup class="reference"><a href="#cite-{n}">[{n}]</a></sup> ')
+            sections.append(
+                f'<div class="mw-content-ltr mw-parser-output"><div class="mw-heading mw-heading2"><h2 id="s{n}">S{n}</h2>'
+                f'<span class="mw-editsection">[<a href="/edit">edit</a>]</span></div>'
+                f'<style data-mw-deduplicate="x">.mw-parser-output .hatnote{{font-style:italic}}</style>'
+                f"<p>{sentences}</p><table><tr><th>Season</th><td>{n}&#160;&ndash;&#160;{n + 1}</td></tr></table>"
+                f"</div><!-- NewPP limit report -->"
+            )
+    return sections
+
+
+def time_cleaner(cleaner: Callable[[str], str], sections: list[str], repeat: int) -> tuple[float, list[str]]:
+    """Return the best total time over `repeat` runs and the cleaned outputs."""
+    best = float("inf")
+    outputs: list[str] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        outputs = [cleaner(html) for html in sections]
+        best = min(best, time.perf_counter() - start)
+    return best, outputs
+
+
+def run_benchmark(sections: list[str], repeat: int = 3) -> None:
+    """
+    Time every registered HTML cleaner on the same sections and check their outputs are identical.
+
+    Args:
+        sections (list[str]): Section HTML to clean.
+        repeat (int): Number of timed runs per cleaner; the fastest is reported.
+    """
+    total_kb = sum(len(html) for html in sections) / 1024
+    logger.info(f"Benchmarking {len(HTML_CLEANERS)} cleaners on {len(sections)} sections ({total_kb:.0f} KB)")
+
+    timings: dict[str, float] = {}
+    reference: list[str] | None = None
+    for name, cleaner in HTML_CLEANERS.items():
+        elapsed, outputs = time_cleaner(cleaner, sections, repeat)
+        timings[name] = elapsed
+
+        if reference is None:
+            reference = outputs
+        mismatches = sum(a != b for a, b in zip(reference, outputs, strict=True))
+        logger.info(
+            f"{name:10} | {elapsed * 1000:8.1f} ms total | {elapsed / len(sections) * 1e6:8.1f} µs/section | "
+            f"{total_kb / elapsed:8.0f} KB/s | mismatches: {mismatches}"
+        )
+
+    baseline = timings["bs4"]
+    for name, elapsed in timings.items():
+        logger.success(f"{name:10} | speedup vs bs4: {baseline / elapsed:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare HTML cleaner backends on saved section HTML.")
+    parser.add_argument("--html-dir", help="Directory of saved section .html files. Defaults to synthetic sections.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per cleaner.")
+    args = parser.parse_args()
+
+    settings = Settings()
+    settings.load_yaml()
+
+    sections = load_saved_sections(args.html_dir) if args.html_dir else synthesize_sections(settings.yaml_config.output_dir)
+    if not sections:
+        raise ValueError("No section HTML found to benchmark")
+
+    run_benchmark(sections, repeat=args.repeat)
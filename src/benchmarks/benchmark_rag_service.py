@@ -0,0 +1,73 @@
+import argparse
+import time
+from collections.abc import Callable
+
+from loguru import logger
+
+from src.configs.settings import Settings
+from src.infra.instrumentation import percentile
+from src.infra.llm_gateway import LLMGateway
+from src.search.search_tracing_opik import RagService
+
+QUERIES = [
+    "When did Atlético Madrid last win La Liga?",
+    "What is the name of Real Madrid's home stadium?",
+    "Who are FC Barcelona's biggest rivals?",
+]
+
+
+def answer_cold(query: str) -> str:
+    """The previous per-query setup: settings, OpenAI client and MongoDB client created, then closed."""
+    gateway = LLMGateway()
+    try:
+        with RagService(Settings(), gateway) as service:
+            return service.answer(query)
+    finally:
+        # RagService leaves the gateway open as it is shared; this one is per query
+        gateway.client.close()
+
+
+def time_queries(answer: Callable[[str], str], queries: list[str], rounds: int) -> list[float]:
+    """Answer every query `rounds` times and return the latency of each answer, in seconds."""
+    latencies = []
+    for _ in range(rounds):
+        for query in queries:
+            start = time.perf_counter()
+            answer(query)
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def run_benchmark(queries: list[str], rounds: int) -> None:
+    """
+    Compare per-query latency with clients created per query and with one long-lived `RagService`.
+
+    Both variants use a gateway without response cache, so every query sends its embedding and
+    completion requests; the difference is the setup cost: reading the settings, TLS handshakes
+    and MongoDB topology discovery.
+
+    Args:
+        queries (list[str]): Questions answered in each round.
+        rounds (int): Number of times every question is answered per variant.
+    """
+    gateway = LLMGateway()
+    with RagService(gateway=gateway) as service:
+        # warm the connection pools before timing
+        service.answer(queries[0])
+        variants = {"cold": answer_cold, "warm": service.answer}
+        for name, answer in variants.items():
+            latencies = time_queries(answer, queries, rounds)
+            logger.info(
+                f"{name:5} | {len(latencies):4} queries | "
+                f"mean {sum(latencies) / len(latencies) * 1000:7.1f} ms | "
+                f"p50 {percentile(latencies, 50) * 1000:7.1f} ms | p95 {percentile(latencies, 95) * 1000:7.1f} ms"
+            )
+    gateway.client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare per-query RAG latency with cold and warm clients.")
+    parser.add_argument("--rounds", type=int, default=5, help="Number of times every question is answered.")
+    args = parser.parse_args()
+
+    run_benchmark(QUERIES, args.rounds)
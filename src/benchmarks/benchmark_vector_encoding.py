@@ -0,0 +1,127 @@
+import argparse
+import math
+import random
+
+import bson
+from loguru import logger
+from pymongo import MongoClient
+
+from src.configs.settings import Settings
+from src.infra.vector_encoding import decode_vector, encode_vector, pack_bits, quantize_int8
+
+
+def normalize(vector: list[float]) -> list[float]:
+    """Scale a vector to unit length."""
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
+
+
+def cosine(a: list[float], b: list[float]) -> float:
+    """Cosine similarity of two vectors."""
+    dot = sum(x * y for x, y in zip(a, b, strict=True))
+    return dot / ((math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))) or 1.0)
+
+
+def hamming(a: list[int], b: list[int]) -> int:
+    """Number of differing bits between two packed bit vectors."""
+    return sum(bin(x ^ y).count("1") for x, y in zip(a, b, strict=True))
+
+
+def top_k(scores: list[float], k: int) -> set[int]:
+    """Indexes of the `k` highest scores."""
+    return set(sorted(range(len(scores)), key=scores.__getitem__, reverse=True)[:k])
+
+
+def synthetic_vectors(
+    count: int, dimensions: int, queries: int, noise: float
+) -> tuple[list[list[float]], list[list[float]]]:
+    """
+    Random unit vectors, and queries made by perturbing some of them.
+
+    Args:
+        count (int): Number of corpus vectors.
+        dimensions (int): Number of dimensions.
+        queries (int): Number of queries.
+        noise (float): Standard deviation of the perturbation of the queries.
+
+    Returns:
+        tuple[list[list[float]], list[list[float]]]: The corpus and the queries.
+    """
+    rng = random.Random(42)
+    corpus = [normalize([rng.gauss(0, 1) for _ in range(dimensions)]) for _ in range(count)]
+    picked = rng.sample(corpus, min(queries, count))
+    return corpus, [normalize([x + rng.gauss(0, noise) for x in vector]) for vector in picked]
+
+
+def load_vectors(settings: Settings, queries: int) -> tuple[list[list[float]], list[list[float]]]:
+    """
+    Load the stored embeddings, using the first `queries` of them as queries.
+
+    Args:
+        settings (Settings): Settings with the MongoDB connection.
+        queries (int): Number of queries.
+
+    Returns:
+        tuple[list[list[float]], list[list[float]]]: The corpus and the queries.
+    """
+    client: MongoClient = MongoClient(settings.mongodb_uri)
+    try:
+        collection = client[settings.mongodb_database][settings.mongodb_collection_index]
+        corpus = [decode_vector(doc["embedding"]) for doc in collection.find({}, {"_id": 0, "embedding": 1})]
+    finally:
+        client.close()
+    if not corpus or any(len(vector) != len(corpus[0]) for vector in corpus):
+        raise ValueError("Stored vectors must be full-precision embeddings of the same size")
+    return corpus, corpus[:queries]
+
+
+def run_benchmark(corpus: list[list[float]], queries: list[list[float]], k: int) -> None:
+    """
+    Compare the storage size and retrieval recall of each vector encoding.
+
+    Sizes are BSON bytes of an `{"embedding": ...}` document. Recall@k is measured against
+    the exact cosine top-k on full-precision vectors: int8 vectors are ranked by cosine,
+    bit vectors by Hamming distance, like the Atlas index would.
+
+    Args:
+        corpus (list[list[float]]): Stored vectors.
+        queries (list[list[float]]): Query vectors.
+        k (int): Number of neighbours compared.
+    """
+    dimensions = len(corpus[0])
+    logger.info(f"{len(corpus)} vectors of {dimensions} dimensions, {len(queries)} queries, recall@{k}")
+
+    baseline = len(bson.encode({"embedding": corpus[0]}))
+    for encoding in ("array", "float32", "int8", "packed_bit"):
+        size = len(bson.encode({"embedding": encode_vector(corpus[0], encoding)}))  # type: ignore[arg-type]
+        logger.info(f"{encoding:10} | {size:6} bytes per vector | {baseline / size:5.1f}x smaller than array")
+
+    int8_corpus = [quantize_int8(vector) for vector in corpus]
+    bit_corpus = [pack_bits(vector) for vector in corpus]
+    recalls = {"int8": 0.0, "packed_bit": 0.0}
+    for query in queries:
+        exact = top_k([cosine(query, vector) for vector in corpus], k)
+        query_int8, query_bits = quantize_int8(query), pack_bits(query)
+        int8 = top_k([cosine(query_int8, vector) for vector in int8_corpus], k)  # type: ignore[arg-type]
+        bits = top_k([-hamming(query_bits, vector) for vector in bit_corpus], k)
+        recalls["int8"] += len(exact & int8) / k
+        recalls["packed_bit"] += len(exact & bits) / k
+    for encoding, recall in recalls.items():
+        logger.info(f"{encoding:10} | recall@{k} {recall / len(queries):.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare vector encodings on size and recall.")
+    parser.add_argument("--from-mongo", action="store_true", help="Use the stored embeddings instead of random ones.")
+    parser.add_argument("--count", type=int, default=500, help="Number of synthetic vectors.")
+    parser.add_argument("--dimensions", type=int, default=1536, help="Dimensions of the synthetic vectors.")
+    parser.add_argument("--queries", type=int, default=50, help="Number of queries.")
+    parser.add_argument("--noise", type=float, default=0.05, help="Perturbation of the synthetic queries.")
+    parser.add_argument("--k", type=int, default=10, help="Number of neighbours compared.")
+    args = parser.parse_args()
+
+    if args.from_mongo:
+        corpus, queries = load_vectors(Settings(), args.queries)
+    else:
+        corpus, queries = synthetic_vectors(args.count, args.dimensions, args.queries, args.noise)
+    run_benchmark(corpus, queries, args.k)
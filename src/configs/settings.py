@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import ClassVar, TypedDict
+from typing import ClassVar, Literal, TypedDict
 
 import yaml
 from pydantic import BaseModel, Field
@@ -20,6 +20,45 @@ class CrawledDoc(BaseModel):
     content: str
     timestamp: datetime
     metadata: dict[str, str]
+    content_hash: str | None = None
+
+
+ExtractMode = Literal["sections", "full_page"]
+RefreshMode = Literal["skip_existing", "incremental", "full"]
+HtmlCleaner = Literal["bs4", "streaming"]
+HttpCacheMode = Literal["record", "replay", "passthrough"]
+DocumentStorage = Literal["files", "store"]
+
+
+class CrawlerConfig(BaseModel):
+    extract_mode: ExtractMode = "sections"
+    refresh_mode: RefreshMode = "skip_existing"
+    manifest_file: str = ".crawl_manifest.json"
+    html_cleaner: HtmlCleaner = "bs4"
+    max_workers: int = 4
+    team_workers: int = 1
+    requests_per_second: float = 3.0
+    burst: int = 1
+    http_cache_mode: HttpCacheMode = "passthrough"
+    http_cache_dir: str = "src/data/http_cache"
+    storage: DocumentStorage = "files"
+    store_dir: str = "src/data/document_store"
+
+
+IngestMode = Literal["bulk", "per_document"]
+
+
+class IngestConfig(BaseModel):
+    mode: IngestMode = "bulk"
+    batch_size: int = 500
+
+
+EtlMode = Literal["materialized", "streaming"]
+
+
+class EtlConfig(BaseModel):
+    mode: EtlMode = "materialized"
+    batch_size: int = 50
 
 
 class YamlConfig(BaseModel):
@@ -27,6 +66,9 @@ class YamlConfig(BaseModel):
     eval_dir: str
     eval_dataset: str
     teams: list[Team]
+    crawler: CrawlerConfig = Field(default_factory=CrawlerConfig)
+    ingest: IngestConfig = Field(default_factory=IngestConfig)
+    etl: EtlConfig = Field(default_factory=EtlConfig)
 
 
 class SummaryConfig(TypedDict):
@@ -34,6 +76,12 @@ class SummaryConfig(TypedDict):
     max_tokens: int
 
 
+SummaryMode = Literal["online", "batch"]
+VectorEncoding = Literal["array", "float32", "int8", "packed_bit"]
+VectorQuantization = Literal["none", "scalar", "binary"]
+VectorBackend = Literal["atlas", "exact", "hnsw"]
+
+
 def load_yaml_config(path: str) -> YamlConfig:
     with open(path, encoding="utf-8") as f:
         data = yaml.safe_load(f)
@@ -74,13 +122,66 @@ class Settings(BaseSettings):
         default_factory=lambda: ["team", "source_url"], description="Fields to use as the query filter for MongoDB upserts."
     )
 
+    vector_encoding: VectorEncoding = Field(
+        default="array",
+        description="Storage format of the summary vectors: 'array' of doubles, packed 'float32', 'int8' or 'packed_bit'.",
+    )
+    vector_quantization: VectorQuantization = Field(
+        default="none", description="Index-side quantization of full-precision vectors: 'none', 'scalar' or 'binary'."
+    )
+    vector_backend: VectorBackend = Field(
+        default="atlas",
+        description="Vector search backend: Atlas '$vectorSearch', or an in-process 'exact' or 'hnsw' index.",
+    )
+    vector_index_path: str = Field(
+        default="src/data/vector_index/summary_vectors",
+        description="Path prefix of the files persisting the in-process vector index.",
+    )
+
     openai_api_key: str = Field(default="", description="OpenAI API key for accessing the OpenAI services.")
 
     openai_embedding_model: str = Field(
         default="text-embedding-3-small", description="OpenAI model for generating text embeddings."
     )
+    openai_embedding_dimensions: int = Field(
+        default=1536,
+        description="Dimensions of the embeddings; text-embedding-3 models return shortened embeddings below their size.",
+    )
     openai_llm_model: str = Field(default="gpt-4o-mini", description="OpenAI model for generating text completions.")
 
+    summary_max_workers: int = Field(
+        default=4, description="Number of summaries written in parallel by the summarization pipeline."
+    )
+    summary_mode: SummaryMode = Field(
+        default="online",
+        description="'online' to summarize with synchronous requests, 'batch' to submit them as OpenAI Batch API jobs.",
+    )
+    summary_batch_dir: str = Field(
+        default="src/data/batch_jobs", description="Directory holding the JSONL job files of batch summarization."
+    )
+    summary_batch_poll_seconds: float = Field(
+        default=30.0, description="Interval between status checks of a running batch job, in seconds."
+    )
+
+    llm_cache_enabled: bool = Field(
+        default=False,
+        description="Whether chat completions are served from the persistent LLM response cache. Off by default so "
+        "evaluation runs measure the model rather than replay its earlier answers.",
+    )
+    llm_cache_path: str = Field(
+        default="src/data/llm_cache.sqlite", description="Path of the SQLite database holding cached LLM responses."
+    )
+    llm_cache_max_entries: int = Field(
+        default=50_000, description="Maximum number of cached LLM responses, least recently used evicted first."
+    )
+    llm_cache_ttl_seconds: float | None = Field(
+        default=None, description="Lifetime of a cached LLM response in seconds; unset keeps responses until evicted."
+    )
+
+    metrics_dir: str = Field(
+        default="src/data/metrics", description="Directory of the JSON metrics reports written at the end of each run."
+    )
+
     openai_llm_judge_model: str = Field(
         default="gpt-4o", description="OpenAI model for judging the quality of text completions."
     )
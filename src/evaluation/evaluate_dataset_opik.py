@@ -3,13 +3,13 @@ from pathlib import Path
 from typing import Any
 
 from loguru import logger
-from openai import OpenAI
 from opik import Opik, track
 from opik.evaluation import evaluate
 from opik.evaluation.metrics import AnswerRelevance, Hallucination
-from opik.integrations.openai import track_openai
 
 from src.configs.settings import Settings
+from src.infra.instrumentation import get_instrumentation
+from src.infra.llm_gateway import LLMGateway, get_llm_gateway
 
 
 def load_config_and_dataset() -> tuple[Settings, list[dict[str, str]]]:
@@ -33,26 +33,16 @@ def load_config_and_dataset() -> tuple[Settings, list[dict[str, str]]]:
     return settings, qa_data
 
 
-def initialize_openai_client(api_key: str) -> OpenAI:
-    """
-    Initialize and return an OpenAI client wrapped with Opik tracking.
-
-    Args:
-        api_key: OpenAI API key string.
-
-    Returns:
-        OpenAI client instance wrapped with tracking.
-    """
-    return track_openai(OpenAI(api_key=api_key))
-
-
-def get_llm_application(model: str, openai_client: OpenAI) -> Any:
+def get_llm_application(model: str, gateway: LLMGateway) -> Any:
     """
     Create a tracked LLM application function that queries the OpenAI API.
 
+    Completions go through the shared LLM gateway and its response cache, so re-running
+    the evaluation only calls the API for questions whose answer is not cached yet.
+
     Args:
         model: The model name to use for chat completions.
-        openai_client: Initialized OpenAI client.
+        gateway: LLM gateway whose calls are traced with Opik.
 
     Returns:
         A function that takes a string input and returns the model's output string.
@@ -60,12 +50,7 @@ def get_llm_application(model: str, openai_client: OpenAI) -> Any:
 
     @track
     def app(input: str) -> str:
-        response = openai_client.chat.completions.create(
-            model=model,
-            messages=[{"role": "user", "content": input}],
-        )
-        content = response.choices[0].message.content
-        return content.strip() if content is not None else ""
+        return gateway.chat(messages=[{"role": "user", "content": input}], model=model, tracked=True).strip()
 
     return app
 
@@ -79,8 +64,8 @@ def evaluate_llm_app(settings: Settings, qa_data: list[dict[str, str]]) -> None:
         qa_data: List of question-answer dicts to evaluate.
     """
     model = settings.openai_llm_model
-    openai_client = initialize_openai_client(settings.openai_api_key)
-    llm_app = get_llm_application(model, openai_client)
+    gateway = get_llm_gateway()
+    llm_app = get_llm_application(model, gateway)
 
     def task(x: dict[str, Any]) -> dict:
         """
@@ -104,16 +89,20 @@ def evaluate_llm_app(settings: Settings, qa_data: list[dict[str, str]]) -> None:
     ]
 
     logger.info("Running evaluation...")
-    evaluate(
-        dataset=dataset,
-        task=task,
-        scoring_metrics=metrics,
-        experiment_config={
-            "model": model,
-            "description": "Evaluation of QA LLM application using summaries from MongoDB context",
-        },
-    )
+    instrumentation = get_instrumentation()
+    with instrumentation.stage("evaluate_dataset"):
+        evaluate(
+            dataset=dataset,
+            task=task,
+            scoring_metrics=metrics,
+            experiment_config={
+                "model": model,
+                "description": "Evaluation of QA LLM application using summaries from MongoDB context",
+            },
+        )
     logger.info("✅ Evaluation completed.")
+    gateway.log_stats()
+    instrumentation.finish_run("evaluate_dataset", settings.metrics_dir)
 
 
 if __name__ == "__main__":
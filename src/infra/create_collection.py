@@ -1,11 +1,15 @@
+import argparse
+from typing import Any
+
 from loguru import logger
-from pymongo import MongoClient
+from pymongo import ASCENDING, IndexModel, MongoClient
 from pymongo.collection import Collection
 from pymongo.database import Database
 from pymongo.errors import CollectionInvalid
 from pymongo.operations import SearchIndexModel
 
 from src.configs.settings import Settings
+from src.infra.vector_encoding import vector_index_field
 
 
 def create_summary_vectors_collection(db: Database) -> None:
@@ -27,38 +31,177 @@ def create_vector_search_index(vector_collection: Collection) -> None:
     """
     Create a vector search index on the specified collection if it doesn't exist.
 
+    The field definition follows `openai_embedding_dimensions`, `vector_encoding` and
+    `vector_quantization` from the settings; an existing index with another definition is
+    updated to match.
+
     Args:
         vector_collection: The MongoDB collection where the index will be created.
         index_name: The name of the search index.
     """
+    definition = {
+        "fields": [
+            vector_index_field(settings.vector_encoding, settings.vector_quantization, settings.openai_embedding_dimensions)
+        ]
+    }
     search_index_model = SearchIndexModel(
-        definition={
-            "fields": [
-                {
-                    "type": "vector",
-                    "numDimensions": 1536,  # For OpenAI text-embedding-3-small
-                    "path": "embedding",
-                    "similarity": "cosine",
-                }
-            ]
-        },
+        definition=definition,
         name=settings.mongodb_collection_index_name,
         type="vectorSearch",
     )
 
-    existing_indexes = vector_collection.list_search_indexes()
-    if not any(idx["name"] == settings.mongodb_collection_index_name for idx in existing_indexes):
+    existing = next(
+        (idx for idx in vector_collection.list_search_indexes() if idx["name"] == settings.mongodb_collection_index_name),
+        None,
+    )
+    if existing is None:
         vector_collection.create_search_index(model=search_index_model)
         logger.info(f"Vector search index '{settings.mongodb_collection_index_name}' created.")
+    elif existing.get("latestDefinition") != definition:
+        vector_collection.update_search_index(settings.mongodb_collection_index_name, definition)
+        logger.info(f"Vector search index '{settings.mongodb_collection_index_name}' updated to {definition['fields'][0]}.")
     else:
         logger.warning(f"Vector search index '{settings.mongodb_collection_index_name}' already exists.")
 
 
+def get_index_models(settings: Settings) -> dict[str, list[IndexModel]]:
+    """
+    Declare the regular indexes backing the filters used on each collection.
+
+    - teams: the upsert filter of `mongo_ingest_step` (`mongodb_query_fields`, unique) and
+      the `content_hash` used to detect unchanged documents.
+    - summary_vectors: the `team` + `summary_type` filter of `insert_embeddings` (unique).
+
+    Args:
+        settings: Application settings holding the collection names and query fields.
+
+    Returns:
+        dict[str, list[IndexModel]]: Index models per collection name.
+    """
+    query_keys = [(field, ASCENDING) for field in settings.mongodb_query_fields]
+    return {
+        settings.mongodb_collection: [
+            IndexModel(query_keys, name="_".join(settings.mongodb_query_fields), unique=True),
+            IndexModel([("content_hash", ASCENDING)], name="content_hash"),
+        ],
+        settings.mongodb_collection_index: [
+            IndexModel([("team", ASCENDING), ("summary_type", ASCENDING)], name="team_summary_type", unique=True),
+        ],
+    }
+
+
+def create_regular_indexes(db: Database, index_models: dict[str, list[IndexModel]]) -> None:
+    """
+    Create the declared indexes that are missing.
+
+    An index whose key pattern already exists is skipped, whatever its name: MongoDB refuses
+    a second index on the same keys, so an index created earlier under another name is kept.
+
+    Args:
+        db: The MongoDB database instance.
+        index_models: Index models per collection name, from `get_index_models`.
+    """
+    for collection_name, models in index_models.items():
+        collection = db[collection_name]
+        missing = find_missing_indexes(collection, models)
+        for model in models:
+            if model.document["name"] not in missing:
+                logger.info(f"Index on {list(model.document['key'])} already exists on '{collection_name}', skipping.")
+        if missing:
+            created = collection.create_indexes([model for model in models if model.document["name"] in missing])
+            logger.info(f"Indexes created on '{collection_name}': {', '.join(created)}")
+
+
+def find_missing_indexes(collection: Collection, models: list[IndexModel]) -> list[str]:
+    """
+    Return the names of declared indexes whose key pattern does not exist on the collection.
+
+    Args:
+        collection: The MongoDB collection to inspect.
+        models: Declared index models for the collection.
+
+    Returns:
+        list[str]: Names of the missing indexes.
+    """
+    existing_keys = [list(info["key"]) for info in collection.index_information().values()]
+    return [
+        model.document["name"]
+        for model in models
+        if [tuple(key) for key in model.document["key"].items()] not in existing_keys
+    ]
+
+
+def find_collection_scans(plan: Any) -> bool:
+    """
+    Return whether an explain plan contains a collection scan stage.
+
+    Args:
+        plan: An explain output, or any part of it.
+
+    Returns:
+        bool: True if a `COLLSCAN` stage appears anywhere in the plan.
+    """
+    if isinstance(plan, dict):
+        return plan.get("stage") == "COLLSCAN" or any(find_collection_scans(value) for value in plan.values())
+    if isinstance(plan, list):
+        return any(find_collection_scans(value) for value in plan)
+    return False
+
+
+def check_indexes(db: Database, index_models: dict[str, list[IndexModel]]) -> bool:
+    """
+    Report missing indexes and explain the declared access paths to find collection scans.
+
+    Each index is checked with an equality query on its key fields, using values from an
+    existing document when the collection is not empty.
+
+    Args:
+        db: The MongoDB database instance.
+        index_models: Index models per collection name, from `get_index_models`.
+
+    Returns:
+        bool: True if every index exists and no access path scans the collection.
+    """
+    healthy = True
+    for collection_name, models in index_models.items():
+        collection = db[collection_name]
+
+        missing = find_missing_indexes(collection, models)
+        for name in missing:
+            logger.error(f"Missing index '{name}' on '{collection_name}'")
+        healthy = healthy and not missing
+
+        for model in models:
+            fields = list(model.document["key"])
+            sample = collection.find_one({}, {field: 1 for field in fields}) or {}
+            query = {field: sample.get(field, "") for field in fields}
+            if find_collection_scans(collection.find(query).explain()):
+                logger.error(f"Collection scan on '{collection_name}' for filter on {fields}")
+                healthy = False
+            else:
+                logger.info(f"Filter on {fields} in '{collection_name}' uses an index")
+
+    if healthy:
+        logger.success("All declared indexes exist and no collection scans were found.")
+    return healthy
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create the MongoDB collections and indexes.")
+    parser.add_argument("--check", action="store_true", help="Only report missing indexes and collection scans.")
+    args = parser.parse_args()
+
     settings = Settings()
     client: MongoClient = MongoClient(settings.mongodb_uri)
     db = client[settings.mongodb_database]
+    index_models = get_index_models(settings)
+
+    if args.check:
+        healthy = check_indexes(db, index_models)
+        client.close()
+        raise SystemExit(0 if healthy else 1)
 
     create_summary_vectors_collection(db)
     vector_collection = db[settings.mongodb_collection_index]
     create_vector_search_index(vector_collection)
+    create_regular_indexes(db, index_models)
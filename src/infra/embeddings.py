@@ -0,0 +1,103 @@
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from loguru import logger
+
+from src.infra.llm_gateway import LLMGateway, get_llm_gateway
+from src.steps.generate_summaries.chunking import get_token_counter
+
+# Limits of one request to the OpenAI embeddings endpoint
+MAX_BATCH_INPUTS = 2_048
+MAX_BATCH_TOKENS = 300_000
+
+
+class BatchEmbedder:
+    """
+    Embed many texts with few requests, sent concurrently through the LLM gateway.
+
+    Texts are deduplicated, packed in order into batches bounded by `max_batch_inputs`
+    inputs and `max_batch_tokens` tokens, and the batches are sent in parallel. Embeddings
+    are mapped back to the input texts by index, so the result is aligned with the input.
+
+    Args:
+        gateway (LLMGateway | None): Gateway sending the requests. Defaults to the shared gateway.
+        model (str | None): Embedding model. Defaults to `openai_embedding_model` from the settings.
+        max_batch_inputs (int): Maximum number of texts per request.
+        max_batch_tokens (int): Maximum number of tokens per request.
+        max_workers (int): Number of requests sent in parallel.
+        count_tokens (Callable[[str], int] | None): Function counting the tokens of a text.
+            Defaults to the tokenizer of the model.
+        dimensions (int | None): Size of the embeddings. Defaults to the gateway's.
+    """
+
+    def __init__(
+        self,
+        gateway: LLMGateway | None = None,
+        model: str | None = None,
+        max_batch_inputs: int = MAX_BATCH_INPUTS,
+        max_batch_tokens: int = MAX_BATCH_TOKENS,
+        max_workers: int = 4,
+        count_tokens: Callable[[str], int] | None = None,
+        dimensions: int | None = None,
+    ):
+        self.gateway = gateway or get_llm_gateway()
+        self.model = model or self.gateway.embedding_model
+        self.max_batch_inputs = max_batch_inputs
+        self.max_batch_tokens = max_batch_tokens
+        self.max_workers = max_workers
+        self.count_tokens = count_tokens or get_token_counter(self.model)
+        self.dimensions = dimensions
+
+    def batches(self, texts: list[str]) -> list[list[int]]:
+        """
+        Pack texts in order into batches within the input and token limits.
+
+        Args:
+            texts (list[str]): Texts to embed.
+
+        Returns:
+            list[list[int]]: Indexes of the texts of each batch.
+        """
+        batches: list[list[int]] = []
+        current: list[int] = []
+        current_tokens = 0
+        for i, text in enumerate(texts):
+            tokens = self.count_tokens(text)
+            if current and (len(current) == self.max_batch_inputs or current_tokens + tokens > self.max_batch_tokens):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def embed(self, texts: list[str], tracked: bool = False) -> list[list[float]]:
+        """
+        Embed texts with batched, concurrent requests.
+
+        Args:
+            texts (list[str]): Texts to embed.
+            tracked (bool): Whether to trace the requests in Opik.
+
+        Returns:
+            list[list[float]]: One embedding per text, in input order.
+        """
+        unique = list(dict.fromkeys(texts))
+        if not unique:
+            return []
+
+        batches = self.batches(unique)
+        logger.info(f"Embedding {len(texts)} texts ({len(unique)} unique) in {len(batches)} requests")
+
+        def embed_batch(batch: list[int]) -> list[list[float]]:
+            return self.gateway.embed(
+                [unique[i] for i in batch], model=self.model, tracked=tracked, dimensions=self.dimensions
+            )
+
+        embeddings: dict[str, list[float]] = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(batches)))) as executor:
+            for batch, vectors in zip(batches, executor.map(embed_batch, batches), strict=True):
+                for i, vector in zip(batch, vectors, strict=True):
+                    embeddings[unique[i]] = vector
+        return [embeddings[text] for text in texts]
@@ -0,0 +1,195 @@
+import argparse
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+from typing import Any, Literal
+
+from loguru import logger
+from pymongo import ASCENDING, MongoClient
+from pymongo.collection import Collection
+from pymongo.errors import OperationFailure
+
+from src.configs.settings import Settings
+from src.infra.embeddings import BatchEmbedder
+from src.infra.insert_embeddings import upsert_summary_embeddings
+from src.steps.generate_summaries.generate_summaries_step import (
+    SUMMARY_PROJECTION,
+    summaries_are_stale,
+    summarize_document,
+)
+
+SyncMode = Literal["auto", "change_stream", "poll"]
+
+# React to new or replaced documents, and to updates that touch the article content
+CONTENT_CHANGE_PIPELINE = [
+    {
+        "$match": {
+            "$or": [
+                {"operationType": {"$in": ["insert", "replace"]}},
+                {"updateDescription.updatedFields.content_hash": {"$exists": True}},
+                {"updateDescription.updatedFields.content": {"$exists": True}},
+            ]
+        }
+    }
+]
+
+
+class IncrementalSync:
+    """
+    Keep summaries and their embeddings in step with the team documents, one document at a time.
+
+    When a team document's content changes, only that document is re-summarized and only its
+    rewritten summaries are re-embedded. Changes are picked up from a MongoDB change stream,
+    or by polling the `updated_at` watermark set by `mongo_ingest_step` where change streams
+    are not available (standalone servers).
+
+    Args:
+        source_collection (Collection): Collection containing team content.
+        vector_collection (Collection): Collection of summary vectors.
+        embed (Callable | None): Function re-embedding summaries, called with the vector
+            collection, the team document and the summary variants to embed. Defaults to
+            the OpenAI embedding model from the settings.
+    """
+
+    def __init__(
+        self,
+        source_collection: Collection[dict[str, Any]],
+        vector_collection: Collection[dict[str, Any]],
+        embed: Callable[[Collection[dict[str, Any]], dict[str, Any], list[str]], int] | None = None,
+    ):
+        self.source_collection = source_collection
+        self.vector_collection = vector_collection
+        self.watermark: datetime | None = None
+        if embed is None:
+            settings = Settings()
+            self.vector_encoding = settings.vector_encoding
+            # built once and reused for every synced document
+            self.embedder = BatchEmbedder(
+                model=settings.openai_embedding_model, dimensions=settings.openai_embedding_dimensions
+            )
+        self.embed = embed or self._openai_embed
+
+    def _openai_embed(
+        self, vector_collection: Collection[dict[str, Any]], doc: dict[str, Any], summary_types: list[str]
+    ) -> int:
+        return upsert_summary_embeddings(self.embedder, vector_collection, doc, summary_types, self.vector_encoding)
+
+    def process(self, doc_id: Any) -> list[str]:
+        """
+        Summarize one team document if needed and re-embed its rewritten summaries.
+
+        Args:
+            doc_id (Any): `_id` of the team document.
+
+        Returns:
+            list[str]: Summary variants that were rewritten and re-embedded.
+        """
+        doc = self.source_collection.find_one({"_id": doc_id}, SUMMARY_PROJECTION)
+        if doc is None:
+            return []
+
+        start = time.perf_counter()
+        written = summarize_document(self.source_collection, doc)
+        if written:
+            updated = self.source_collection.find_one({"_id": doc_id})
+            if updated is not None:
+                self.embed(self.vector_collection, updated, written)
+            logger.success(f"⚡ Synced {doc['team']} ({', '.join(written)}) in {time.perf_counter() - start:.1f}s")
+        return written
+
+    def catch_up(self) -> int:
+        """
+        Process the documents changed while the sync was not running.
+
+        Returns:
+            int: Number of documents whose summaries were rewritten.
+        """
+        projection = {"_id": 1, "content_hash": 1, "summaries_content_hash": 1, "summaries": 1}
+        pending = [
+            doc["_id"]
+            for doc in self.source_collection.find({}, projection)
+            if summaries_are_stale(doc) or not doc.get("summaries")
+        ]
+        logger.info(f"Catching up on {len(pending)} documents")
+        return sum(1 for doc_id in pending if self.process(doc_id))
+
+    def poll_once(self) -> int:
+        """
+        Process the documents written since the last poll, using the `updated_at` watermark.
+
+        Returns:
+            int: Number of documents whose summaries were rewritten.
+        """
+        if self.watermark is None:
+            self.watermark = datetime.now(UTC)
+
+        # $gte so documents written in the same instant as the watermark are not missed;
+        # processing an up-to-date document again is a no-op
+        changed = list(
+            self.source_collection.find({"updated_at": {"$gte": self.watermark}}, {"_id": 1, "updated_at": 1}).sort(
+                "updated_at", ASCENDING
+            )
+        )
+        synced = 0
+        for doc in changed:
+            synced += bool(self.process(doc["_id"]))
+            self.watermark = doc["updated_at"]
+        return synced
+
+    def poll(self, interval: float = 5.0) -> None:
+        """Poll for changed documents every `interval` seconds, until interrupted."""
+        logger.info(f"Polling '{self.source_collection.name}' for changes every {interval}s")
+        while True:
+            self.poll_once()
+            time.sleep(interval)
+
+    def watch(self) -> None:
+        """Process content changes from a MongoDB change stream, until interrupted."""
+        resume_token = None
+        logger.info(f"Watching '{self.source_collection.name}' for content changes")
+        while True:
+            with self.source_collection.watch(CONTENT_CHANGE_PIPELINE, resume_after=resume_token) as stream:
+                for change in stream:
+                    self.process(change["documentKey"]["_id"])
+                    resume_token = stream.resume_token
+
+    def run(self, mode: SyncMode = "auto", interval: float = 5.0) -> None:
+        """
+        Catch up on pending documents, then follow changes.
+
+        Args:
+            mode (SyncMode): "change_stream", "poll", or "auto" to use change streams when the
+                server supports them and fall back to polling otherwise.
+            interval (float): Polling interval in seconds.
+        """
+        self.watermark = datetime.now(UTC)
+        self.catch_up()
+
+        if mode == "poll":
+            self.poll(interval)
+            return
+        try:
+            self.watch()
+        except OperationFailure as e:
+            if mode == "change_stream":
+                raise
+            logger.warning(f"Change streams are not available ({e}), polling instead")
+            self.poll(interval)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-summarize and re-embed team documents as their content changes.")
+    parser.add_argument("--mode", choices=["auto", "change_stream", "poll"], default="auto")
+    parser.add_argument("--interval", type=float, default=5.0, help="Polling interval in seconds.")
+    args = parser.parse_args()
+
+    settings = Settings()
+    client: MongoClient = MongoClient(settings.mongodb_uri)
+    db = client[settings.mongodb_database]
+
+    try:
+        IncrementalSync(db[settings.mongodb_collection], db[settings.mongodb_collection_index]).run(args.mode, args.interval)
+    except KeyboardInterrupt:
+        logger.info("Incremental sync stopped")
+    finally:
+        client.close()
@@ -1,15 +1,258 @@
+import argparse
+from typing import Any
+
 from loguru import logger
-from openai import OpenAI
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
+from pymongo.collection import Collection
 from pymongo.mongo_client import MongoClient as MongoClientType
 
-from src.configs.settings import Settings
+from src.configs.settings import Settings, VectorEncoding
+from src.infra.embeddings import BatchEmbedder
+from src.infra.instrumentation import get_instrumentation
+from src.infra.vector_encoding import decode_vector, encode_vector, truncate_vector
+from src.utils.hashing import sha256_text
+
+# Size of the vectors stored before the dimensions were configurable and recorded
+LEGACY_EMBEDDING_DIMENSIONS = 1536
+
+# Encodings whose stored vectors can be shortened without re-embedding
+TRUNCATABLE_ENCODINGS = ("array", "float32")
+
 
+def build_vector_doc(
+    doc: dict[str, Any], summary_type: str, embedding: list[float], encoding: VectorEncoding = "array"
+) -> dict[str, Any]:
+    """
+    Build the vector collection document of one summary of a team document.
+
+    Args:
+        doc: Source team document holding the summaries.
+        summary_type: Summary variant, e.g. "default".
+        embedding: Embedding of the summary text.
+        encoding: Storage format of the embedding, see `encode_vector`.
 
-def insert_embeddings() -> None:
+    Returns:
+        The document to store in the vector collection.
+    """
+    return {
+        "team": doc["team"],
+        "summary_type": summary_type,
+        "summary_text": doc["summaries"][summary_type],
+        "text_hash": sha256_text(doc["summaries"][summary_type]),
+        "embedding": encode_vector(embedding, encoding),
+        "vector_encoding": encoding,
+        "dimensions": len(embedding),
+        "source_url": doc.get("source_url"),
+        "metadata": doc.get("metadata", {}),
+        "timestamp": doc.get("timestamp"),
+    }
+
+
+def upsert_summary_embeddings(
+    embedder: BatchEmbedder,
+    vector_collection: Collection,
+    doc: dict[str, Any],
+    summary_types: list[str],
+    encoding: VectorEncoding = "array",
+) -> int:
+    """
+    Embed the given summaries of a team document and replace their vectors.
+
+    Args:
+        embedder: Embedder sending the embedding requests.
+        vector_collection: The vector collection.
+        doc: Source team document holding the summaries.
+        summary_types: Summary variants to (re-)embed.
+        encoding: Storage format of the embeddings.
+
+    Returns:
+        The number of vectors written.
+    """
+    summary_types = [summary_type for summary_type in summary_types if doc.get("summaries", {}).get(summary_type)]
+    if not summary_types:
+        return 0
+
+    embeddings = embedder.embed([doc["summaries"][summary_type] for summary_type in summary_types])
+    for summary_type, embedding in zip(summary_types, embeddings, strict=True):
+        vector_collection.replace_one(
+            {"team": doc["team"], "summary_type": summary_type},
+            build_vector_doc(doc, summary_type, embedding, encoding),
+            upsert=True,
+        )
+    logger.info(f"Re-embedded {len(summary_types)} summaries for team '{doc['team']}'.")
+    return len(summary_types)
+
+
+def load_vector_states(vector_collection: Collection) -> dict[tuple[str, str], tuple[str, str, int]]:
+    """
+    Load the text hash, encoding and size of every stored vector, keyed by team and summary type, with one query.
+
+    Vectors written before text hashes were stored are read once more, with their text, and
+    their hash is backfilled so they are not re-embedded needlessly.
+
+    Args:
+        vector_collection: The vector collection.
+
+    Returns:
+        The text hash, vector encoding and dimensions of each (team, summary_type) vector.
+        Vectors stored before encodings and dimensions were recorded are 1536-d arrays.
+    """
+    states: dict[tuple[str, str], tuple[str, str, int]] = {}
+    legacy = False
+    projection = {"_id": 0, "team": 1, "summary_type": 1, "text_hash": 1, "vector_encoding": 1, "dimensions": 1}
+    for vector in vector_collection.find({}, projection):
+        if vector.get("text_hash"):
+            states[(vector["team"], vector["summary_type"])] = (
+                vector["text_hash"],
+                vector.get("vector_encoding", "array"),
+                vector.get("dimensions", LEGACY_EMBEDDING_DIMENSIONS),
+            )
+        else:
+            legacy = True
+
+    if legacy:
+        backfill = []
+        for vector in vector_collection.find(
+            {"text_hash": None},
+            {"_id": 1, "team": 1, "summary_type": 1, "summary_text": 1, "vector_encoding": 1, "dimensions": 1},
+        ):
+            text_hash = sha256_text(vector.get("summary_text") or "")
+            states[(vector["team"], vector["summary_type"])] = (
+                text_hash,
+                vector.get("vector_encoding", "array"),
+                vector.get("dimensions", LEGACY_EMBEDDING_DIMENSIONS),
+            )
+            backfill.append(UpdateOne({"_id": vector["_id"]}, {"$set": {"text_hash": text_hash}}))
+        vector_collection.bulk_write(backfill, ordered=False)
+        logger.info(f"Backfilled the text hash of {len(backfill)} vectors.")
+    return states
+
+
+def sync_embeddings(
+    source_collection: Collection,
+    vector_collection: Collection,
+    embedder: BatchEmbedder,
+    batch_size: int = 500,
+    encoding: VectorEncoding = "array",
+    dimensions: int | None = None,
+) -> int:
+    """
+    Embed the summaries that are new or changed since their vector was written, and upsert their vectors.
+
+    The stored vectors are diffed against the summaries by text hash, loaded with one projected
+    query. Team documents are streamed with only the fields a vector needs, and pending
+    summaries are embedded and written `batch_size` at a time as unordered bulk upserts, so
+    at most one batch of vectors is held in memory. Vectors stored with another encoding
+    than `encoding`, or another size than `dimensions` when given, are rewritten too.
+
+    Args:
+        source_collection: Collection containing the team summaries.
+        vector_collection: The vector collection.
+        embedder: Embedder sending the embedding requests.
+        batch_size: Number of summaries embedded and written per batch.
+        encoding: Storage format of the embeddings.
+        dimensions: Expected size of the vectors. Defaults to not checking it.
+
+    Returns:
+        The number of vectors written.
+    """
+    stored_states = load_vector_states(vector_collection)
+    projection = {"_id": 0, "team": 1, "summaries": 1, "source_url": 1, "metadata": 1, "timestamp": 1}
+    pending: list[tuple[dict[str, Any], str]] = []
+    written = unchanged = 0
+
+    def flush() -> int:
+        embeddings = embedder.embed([doc["summaries"][summary_type] for doc, summary_type in pending])
+        operations = [
+            UpdateOne(
+                {"team": doc["team"], "summary_type": summary_type},
+                {"$set": build_vector_doc(doc, summary_type, embedding, encoding)},
+                upsert=True,
+            )
+            for (doc, summary_type), embedding in zip(pending, embeddings, strict=True)
+        ]
+        vector_collection.bulk_write(operations, ordered=False)
+        pending.clear()
+        return len(operations)
+
+    for doc in source_collection.find({}, projection):
+        for summary_type, summary_text in doc.get("summaries", {}).items():
+            if not summary_text:
+                continue
+            state = stored_states.get((doc["team"], summary_type))
+            if state is not None and state[:2] == (sha256_text(summary_text), encoding) and dimensions in (None, state[2]):
+                unchanged += 1
+                continue
+            pending.append((doc, summary_type))
+            if len(pending) >= batch_size:
+                written += flush()
+
+    if pending:
+        written += flush()
+
+    logger.info(f"Upserted {written} new or changed vectors, {unchanged} unchanged.")
+    return written
+
+
+def truncate_embeddings(vector_collection: Collection, dimensions: int, batch_size: int = 500) -> int:
+    """
+    Shorten the stored full-precision vectors larger than `dimensions`, without re-embedding them.
+
+    text-embedding-3 embeddings keep their meaning when truncated and renormalized, so moving
+    to fewer dimensions only rewrites the stored vectors. Quantized vectors, and vectors
+    smaller than `dimensions`, are left for `sync_embeddings` to re-embed.
+
+    Args:
+        vector_collection: The vector collection.
+        dimensions: Target size of the vectors.
+        batch_size: Number of vectors written per bulk write.
+
+    Returns:
+        The number of vectors shortened.
+    """
+    projection = {"_id": 1, "embedding": 1, "vector_encoding": 1, "dimensions": 1}
+    operations: list[UpdateOne] = []
+    truncated = 0
+    for vector in vector_collection.find({}, projection):
+        encoding = vector.get("vector_encoding", "array")
+        if encoding not in TRUNCATABLE_ENCODINGS or vector.get("dimensions", LEGACY_EMBEDDING_DIMENSIONS) <= dimensions:
+            continue
+        embedding = truncate_vector(decode_vector(vector["embedding"]), dimensions)
+        operations.append(
+            UpdateOne(
+                {"_id": vector["_id"]},
+                {"$set": {"embedding": encode_vector(embedding, encoding), "dimensions": dimensions}},
+            )
+        )
+        if len(operations) >= batch_size:
+            vector_collection.bulk_write(operations, ordered=False)
+            truncated += len(operations)
+            operations = []
+
+    if operations:
+        vector_collection.bulk_write(operations, ordered=False)
+        truncated += len(operations)
+    logger.info(f"Truncated {truncated} vectors to {dimensions} dimensions.")
+    return truncated
+
+
+def insert_embeddings(embedder: BatchEmbedder | None = None, batch_size: int = 500, truncate: bool = False) -> int:
     """
     Generate OpenAI embeddings for summaries stored in the MongoDB source collection
-    and insert them into the vector collection, skipping duplicates.
+    and upsert them into the vector collection, skipping summaries whose vector is up to date.
+
+    See `sync_embeddings`: a vector is rewritten when its summary is new or its text changed,
+    e.g. after the summaries were regenerated, or when its encoding or size differs from
+    `vector_encoding` and `openai_embedding_dimensions` in the settings.
+
+    Args:
+        embedder: Embedder sending the embedding requests. Defaults to a `BatchEmbedder`
+            with the embedding model from the settings.
+        batch_size: Number of summaries embedded and written per batch.
+        truncate: Whether to first shorten larger stored vectors in place, see `truncate_embeddings`.
+
+    Returns:
+        The number of vectors written.
 
     Raises:
         ValueError: If MongoDB URI or OpenAI API key are not set in the settings.
@@ -20,48 +263,42 @@ def insert_embeddings() -> None:
     if not mongodb_uri or not openai_api_key:
         raise ValueError("MongoDB URI and OpenAI API key must be set in the settings.")
 
-    openai_client = OpenAI(api_key=openai_api_key)
+    embedder = embedder or BatchEmbedder(
+        model=settings.openai_embedding_model, dimensions=settings.openai_embedding_dimensions
+    )
 
     client: MongoClientType = MongoClient(mongodb_uri)
     db = client[settings.mongodb_database]
-    source_collection = db[settings.mongodb_collection]
-    vector_collection = db[settings.mongodb_collection_index]
-
-    batch_to_insert = []
-
-    for doc in source_collection.find():
-        team = doc["team"]
-        summaries = doc.get("summaries", {})
-
-        for summary_type, summary_text in summaries.items():
-            if vector_collection.find_one({"team": team, "summary_type": summary_type}):
-                logger.warning(f"Skipping existing summary for team '{team}' and type '{summary_type}'.")
-                continue
-
-            embedding_response = openai_client.embeddings.create(input=summary_text, model="text-embedding-3-small")
-            embedding = embedding_response.data[0].embedding
-
-            new_doc = {
-                "team": team,
-                "summary_type": summary_type,
-                "summary_text": summary_text,
-                "embedding": embedding,
-                "source_url": doc.get("source_url"),
-                "metadata": doc.get("metadata", {}),
-                "timestamp": doc.get("timestamp"),
-            }
-
-            batch_to_insert.append(new_doc)
-
-    if batch_to_insert:
-        vector_collection.insert_many(batch_to_insert)
-        logger.info(f"Inserted {len(batch_to_insert)} new documents into the vector collection.")
-    else:
-        logger.warning("No new documents to insert into the vector collection.")
+    try:
+        if truncate:
+            truncate_embeddings(db[settings.mongodb_collection_index], settings.openai_embedding_dimensions, batch_size)
+        return sync_embeddings(
+            db[settings.mongodb_collection],
+            db[settings.mongodb_collection_index],
+            embedder,
+            batch_size,
+            settings.vector_encoding,
+            settings.openai_embedding_dimensions,
+        )
+    finally:
+        client.close()
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Embed new or changed summaries into the vector collection.")
+    parser.add_argument(
+        "--truncate",
+        action="store_true",
+        help="Shorten stored vectors larger than OPENAI_EMBEDDING_DIMENSIONS instead of re-embedding them.",
+    )
+    args = parser.parse_args()
+
     # Initialize settings
     settings = Settings()
 
-    insert_embeddings()
+    instrumentation = get_instrumentation()
+    try:
+        with instrumentation.stage("insert_embeddings"):
+            insert_embeddings(truncate=args.truncate)
+    finally:
+        instrumentation.finish_run("insert_embeddings", settings.metrics_dir)
@@ -0,0 +1,265 @@
+import itertools
+import json
+import math
+import os
+import random
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import UTC, datetime
+from typing import Any
+
+from loguru import logger
+from pydantic import BaseModel, Field
+
+# List prices in USD per million prompt / completion tokens, used to estimate the cost of a run
+MODEL_PRICES: dict[str, tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+    "text-embedding-3-small": (0.02, 0.0),
+    "text-embedding-3-large": (0.13, 0.0),
+}
+
+UNTRACKED_STAGE = "untracked"
+
+# Number of durations kept per stage and model to estimate latency percentiles
+SAMPLE_SIZE = 2048
+
+
+def percentile(values: list[float], q: float) -> float:
+    """
+    Compute a percentile with linear interpolation between the closest ranks.
+
+    Args:
+        values (list[float]): Observed values.
+        q (float): Percentile between 0 and 100.
+
+    Returns:
+        float: The percentile, or 0.0 when there are no values.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float | None:
+    """Estimate the cost of token usage in USD from `MODEL_PRICES`, or None for an unknown model."""
+    prices = next(
+        (MODEL_PRICES[name] for name in sorted(MODEL_PRICES, key=len, reverse=True) if model.startswith(name)), None
+    )
+    if prices is None:
+        return None
+    return (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1_000_000
+
+
+class DurationSample(BaseModel):
+    """
+    Count and total of observed durations, with a bounded uniform sample of them for percentiles.
+
+    The sample is kept by reservoir sampling: the first `SAMPLE_SIZE` durations are kept,
+    then each new one replaces a random kept one with probability `SAMPLE_SIZE / count`.
+    """
+
+    count: int = 0
+    total: float = 0.0
+    values: list[float] = Field(default_factory=list)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if len(self.values) < SAMPLE_SIZE:
+            self.values.append(value)
+        elif (slot := random.randrange(self.count)) < SAMPLE_SIZE:
+            self.values[slot] = value
+
+
+class ModelMetrics(BaseModel):
+    calls: int = 0
+    cache_hits: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latencies: DurationSample = Field(default_factory=DurationSample)
+
+
+class Instrumentation:
+    """
+    Per-stage, per-model record of the LLM calls of a run.
+
+    Code runs inside named stages (`with instrumentation.stage("summarize"):`); every call
+    made through the LLM gateway is recorded under the innermost stage of its thread or
+    task, and the model it used. Stages are tracked in a context variable, so concurrent
+    stages do not see each other; a thread that entered no stage, e.g. a pool worker, records
+    under the stage most recently entered in the process. Stages also record the duration of
+    each time they run, e.g. of every query of the RAG path, keeping a bounded sample of them.
+    `log_summary` prints a table of calls, tokens, estimated cost and p50/p95/p99 latency,
+    and `write_report` saves the same figures as JSON. Use `get_instrumentation` to get the
+    shared instance.
+    """
+
+    def __init__(self) -> None:
+        self.metrics: dict[tuple[str, str], ModelMetrics] = {}
+        self.stage_durations: dict[str, DurationSample] = {}
+        # stages of the current thread or task, innermost last
+        self._stages: ContextVar[tuple[str, ...]] = ContextVar("stages", default=())
+        # stages open in any thread by entry id, for threads that entered none
+        self._open_stages: dict[int, str] = {}
+        self._stage_ids = itertools.count()
+        self._lock = threading.Lock()
+
+    @property
+    def current_stage(self) -> str:
+        with self._lock:
+            return self._current_stage()
+
+    def _current_stage(self) -> str:
+        stages = self._stages.get()
+        if stages:
+            return stages[-1]
+        return self._open_stages[max(self._open_stages)] if self._open_stages else UNTRACKED_STAGE
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Record the calls made in the block under stage `name`, and the wall time of the block."""
+        token = self._stages.set((*self._stages.get(), name))
+        with self._lock:
+            stage_id = next(self._stage_ids)
+            self._open_stages[stage_id] = name
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._stages.reset(token)
+            with self._lock:
+                del self._open_stages[stage_id]
+                self.stage_durations.setdefault(name, DurationSample()).add(time.perf_counter() - start)
+
+    def _metrics(self, model: str) -> ModelMetrics:
+        key = (self._current_stage(), model)
+        if key not in self.metrics:
+            self.metrics[key] = ModelMetrics()
+        return self.metrics[key]
+
+    def record_call(self, model: str, latency: float, prompt_tokens: int = 0, completion_tokens: int = 0) -> None:
+        """
+        Record one API call under the current stage.
+
+        Args:
+            model (str): Model of the call.
+            latency (float): Duration of the call in seconds, retries excluded.
+            prompt_tokens (int): Prompt tokens reported by the API.
+            completion_tokens (int): Completion tokens reported by the API.
+        """
+        with self._lock:
+            metrics = self._metrics(model)
+            metrics.calls += 1
+            metrics.prompt_tokens += prompt_tokens
+            metrics.completion_tokens += completion_tokens
+            metrics.latencies.add(latency)
+
+    def record_cache_hit(self, model: str) -> None:
+        """Record a request answered from the LLM response cache under the current stage."""
+        with self._lock:
+            self._metrics(model).cache_hits += 1
+
+    def report(self) -> dict[str, Any]:
+        """
+        Summarize the recorded calls per stage and model.
+
+        Returns:
+            dict[str, Any]: Per stage, its number of runs, total wall time and run time
+            percentiles and, per model, the call and cache hit counts, token counts, estimated
+            cost in USD and call latency percentiles. Times are in seconds.
+        """
+        with self._lock:
+            items = sorted(self.metrics.items())
+            stage_durations = {name: durations.model_copy(deep=True) for name, durations in self.stage_durations.items()}
+            items = [(key, metrics.model_copy(deep=True)) for key, metrics in items]
+
+        stages: dict[str, Any] = {
+            name: {
+                "runs": durations.count,
+                "wall_seconds": round(durations.total, 3),
+                "run_p50": round(percentile(durations.values, 50), 3),
+                "run_p95": round(percentile(durations.values, 95), 3),
+                "run_p99": round(percentile(durations.values, 99), 3),
+                "models": {},
+            }
+            for name, durations in stage_durations.items()
+        }
+        for (stage, model), metrics in items:
+            stages.setdefault(stage, {"wall_seconds": None, "models": {}})["models"][model] = {
+                "calls": metrics.calls,
+                "cache_hits": metrics.cache_hits,
+                "prompt_tokens": metrics.prompt_tokens,
+                "completion_tokens": metrics.completion_tokens,
+                "cost_usd": estimate_cost(model, metrics.prompt_tokens, metrics.completion_tokens),
+                "latency_p50": round(percentile(metrics.latencies.values, 50), 3),
+                "latency_p95": round(percentile(metrics.latencies.values, 95), 3),
+                "latency_p99": round(percentile(metrics.latencies.values, 99), 3),
+            }
+        return {"generated_at": datetime.now(UTC).isoformat(), "stages": stages}
+
+    def log_summary(self) -> None:
+        """Log the report as a table: one row per stage with its wall time, followed by one row per model."""
+        row = "{:<22} {:>8} {:<24} {:>6} {:>6} {:>9} {:>8} {:>8} {:>7} {:>7} {:>7}".format
+        header = row("stage", "wall s", "model", "calls", "cached", "prompt", "compl.", "cost $", "p50 s", "p95 s", "p99 s")
+        lines = [header, "-" * len(header)]
+        for stage, data in self.report()["stages"].items():
+            wall = data["wall_seconds"]
+            lines.append(row(stage, "-" if wall is None else f"{wall:.1f}", *[""] * 9))
+            for model, m in data["models"].items():
+                cost = "-" if m["cost_usd"] is None else f"{m['cost_usd']:.4f}"
+                lines.append(
+                    row(
+                        "",
+                        "",
+                        model,
+                        m["calls"],
+                        m["cache_hits"],
+                        m["prompt_tokens"],
+                        m["completion_tokens"],
+                        cost,
+                        m["latency_p50"],
+                        m["latency_p95"],
+                        m["latency_p99"],
+                    )
+                )
+        logger.info("📊 Run metrics\n" + "\n".join(lines))
+
+    def write_report(self, path: str) -> None:
+        """Write the report as JSON to `path`."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+        logger.info(f"Metrics report saved to {path}")
+
+    def finish_run(self, name: str, metrics_dir: str) -> str:
+        """
+        Log the summary table and write the JSON report of a run as `<metrics_dir>/<name>-<timestamp>.json`.
+
+        Args:
+            name (str): Name of the run, e.g. the pipeline or script.
+            metrics_dir (str): Directory of the reports.
+
+        Returns:
+            str: Path of the JSON report.
+        """
+        path = os.path.join(metrics_dir, f"{name}-{datetime.now(UTC):%Y%m%dT%H%M%S}.json")
+        self.log_summary()
+        self.write_report(path)
+        return path
+
+
+_instrumentation = Instrumentation()
+
+
+def get_instrumentation() -> Instrumentation:
+    """Return the process-wide instrumentation."""
+    return _instrumentation
@@ -0,0 +1,126 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Any
+
+from loguru import logger
+
+from src.configs.settings import Settings
+from src.utils.hashing import fingerprint
+
+
+class LLMResponseCache:
+    """
+    Disk-backed cache of LLM completions, stored in a SQLite database.
+
+    Responses are keyed by model, messages, max_tokens and temperature, so any change to the
+    prompt or its parameters is a miss. The cache holds at most `max_entries` responses and
+    evicts the least recently used ones beyond that; with `ttl_seconds`, older responses
+    are treated as missing and removed when read.
+
+    Args:
+        path (str): Path of the SQLite database file.
+        max_entries (int): Maximum number of cached responses.
+        ttl_seconds (float | None): Lifetime of a cached response, or None to keep responses until evicted.
+    """
+
+    def __init__(self, path: str, max_entries: int = 50_000, ttl_seconds: float | None = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, model TEXT, response TEXT, created_at REAL, accessed_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+        self._conn.commit()
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "LLMResponseCache | None":
+        """Build the cache configured by the `llm_cache_*` settings, or None when it is disabled."""
+        if not settings.llm_cache_enabled:
+            return None
+        return cls(settings.llm_cache_path, settings.llm_cache_max_entries, settings.llm_cache_ttl_seconds)
+
+    @staticmethod
+    def request_key(model: str, messages: list[dict[str, str]], max_tokens: int | None, temperature: float | None) -> str:
+        """Return the cache key of a chat completion request."""
+        return fingerprint(model, messages, max_tokens, temperature)
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key: str) -> str | None:
+        """
+        Read a cached response and mark it as recently used.
+
+        Args:
+            key (str): Key of the request, from `request_key`.
+
+        Returns:
+            str | None: The cached response, or None if it is missing or expired.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return str(row[0])
+
+    def put(self, key: str, model: str, response: str) -> None:
+        """
+        Store a response, evicting the least recently used ones beyond `max_entries`.
+
+        Args:
+            key (str): Key of the request, from `request_key`.
+            model (str): Model that wrote the response.
+            response (str): Content of the completion.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, model, response, now, now),
+            )
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            row: Any = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        return int(row[0])
+
+    def log_stats(self) -> None:
+        """Log the hits, misses and hit ratio of the cache."""
+        logger.info(
+            f"LLM response cache: {self.hits} hits, {self.misses} misses ({self.hit_ratio:.0%} hit ratio), "
+            f"{len(self)} entries in {self.path}"
+        )
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
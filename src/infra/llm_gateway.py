@@ -0,0 +1,328 @@
+import random
+import re
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+import httpx
+import openai
+from loguru import logger
+from openai import OpenAI
+from opik.integrations.openai import track_openai
+from pydantic import BaseModel
+
+from src.configs.settings import Settings
+from src.infra.instrumentation import get_instrumentation
+from src.infra.llm_cache import LLMResponseCache
+
+RESET_PATTERN = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+RESET_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+# Errors worth retrying: rate limits, timeouts, dropped connections and server errors
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError, openai.InternalServerError)
+
+# Embedding models accepting a `dimensions` argument (shortened, Matryoshka-style embeddings)
+SHORTENABLE_EMBEDDING_MODELS = ("text-embedding-3",)
+
+
+class LLMGatewayStats(BaseModel):
+    calls: int = 0
+    retries: int = 0
+    failures: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency_seconds: float = 0.0
+
+    @property
+    def mean_latency(self) -> float:
+        return self.latency_seconds / self.calls if self.calls else 0.0
+
+
+def parse_reset(value: str | None) -> float | None:
+    """
+    Parse a rate-limit reset duration such as "1s", "6m0s" or "20ms" into seconds.
+
+    Args:
+        value (str | None): Value of an `x-ratelimit-reset-*` header.
+
+    Returns:
+        float | None: The duration in seconds, or None if the header is missing or malformed.
+    """
+    if not value:
+        return None
+    parts = RESET_PATTERN.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * RESET_UNITS[unit] for amount, unit in parts)
+
+
+class RateBudget:
+    """
+    Request and token budget of the API key, kept up to date from the rate-limit response headers.
+
+    Before a call, `wait` blocks until the current window has enough requests and tokens
+    left for it; after a call, `update` records what the API reports as remaining.
+    Until the first response arrives the budget is unknown and calls are not delayed.
+    """
+
+    def __init__(self) -> None:
+        self.remaining_requests: int | None = None
+        self.remaining_tokens: int | None = None
+        self.requests_reset_at = 0.0
+        self.tokens_reset_at = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self, estimated_tokens: int) -> None:
+        """Block until the budget allows one more request of about `estimated_tokens` tokens, then reserve it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now >= self.requests_reset_at:
+                    self.remaining_requests = None
+                if now >= self.tokens_reset_at:
+                    self.remaining_tokens = None
+
+                requests_ok = self.remaining_requests is None or self.remaining_requests > 0
+                tokens_ok = self.remaining_tokens is None or self.remaining_tokens >= estimated_tokens
+                if requests_ok and tokens_ok:
+                    if self.remaining_requests is not None:
+                        self.remaining_requests -= 1
+                    if self.remaining_tokens is not None:
+                        self.remaining_tokens -= estimated_tokens
+                    return
+
+                wait = max(
+                    0.0 if requests_ok else self.requests_reset_at - now,
+                    0.0 if tokens_ok else self.tokens_reset_at - now,
+                )
+
+            logger.info(f"LLM rate budget exhausted, waiting {wait:.1f}s")
+            time.sleep(wait)
+
+    def update(self, headers: httpx.Headers) -> None:
+        """Record the remaining budget reported by the rate-limit headers of a response."""
+        with self._lock:
+            now = time.monotonic()
+            if (requests := headers.get("x-ratelimit-remaining-requests")) is not None:
+                self.remaining_requests = int(requests)
+                self.requests_reset_at = now + (parse_reset(headers.get("x-ratelimit-reset-requests")) or 0.0)
+            if (tokens := headers.get("x-ratelimit-remaining-tokens")) is not None:
+                self.remaining_tokens = int(tokens)
+                self.tokens_reset_at = now + (parse_reset(headers.get("x-ratelimit-reset-tokens")) or 0.0)
+
+
+class LLMGateway:
+    """
+    Process-wide access point to the OpenAI API.
+
+    Wraps one pooled client shared by every caller, retries transient errors with exponential
+    backoff and full jitter, paces requests with the rate-limit headers the API returns, and
+    counts calls, tokens, retries and latency. Use `get_llm_gateway` to get the shared instance.
+
+    Args:
+        client (OpenAI | None): Client to use. Defaults to a pooled client built from the settings.
+        max_retries (int): Retries of a failing call before its error is raised.
+        base_delay (float): Backoff delay before the first retry, in seconds.
+        max_delay (float): Upper bound of the backoff delay, in seconds.
+        max_connections (int): Size of the HTTP connection pool.
+        cache (LLMResponseCache | None): Cache serving repeated chat completions. Defaults to no cache.
+    """
+
+    def __init__(
+        self,
+        client: OpenAI | None = None,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        max_connections: int = 32,
+        cache: LLMResponseCache | None = None,
+    ):
+        settings = Settings()
+        self.client = client or OpenAI(
+            api_key=settings.openai_api_key,
+            # retries are handled here, so that they are counted and share the rate budget
+            max_retries=0,
+            http_client=httpx.Client(
+                limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+                timeout=httpx.Timeout(120.0, connect=10.0),
+            ),
+        )
+        self.llm_model = settings.openai_llm_model
+        self.embedding_model = settings.openai_embedding_model
+        self.embedding_dimensions = settings.openai_embedding_dimensions
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.cache = cache
+        self.budget = RateBudget()
+        self.stats = LLMGatewayStats()
+        self._stats_lock = threading.Lock()
+        self._tracked_client: OpenAI | None = None
+
+    @property
+    def tracked_client(self) -> OpenAI:
+        """A copy of the client with Opik tracing, sharing its connection pool."""
+        if self._tracked_client is None:
+            self._tracked_client = track_openai(self.client.with_options())
+        return self._tracked_client
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        retry_after = None
+        if isinstance(error, openai.APIStatusError):
+            retry_after = error.response.headers.get("retry-after")
+        if retry_after is not None:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    def _call(self, request: Callable[[], Any], model: str, estimated_tokens: int, raw: bool = True) -> Any:
+        """Run an API request with budgeting, retries and counters, and return the parsed response."""
+        for attempt in range(self.max_retries + 1):
+            self.budget.wait(estimated_tokens)
+            start = time.perf_counter()
+            try:
+                response = request()
+            except RETRYABLE_ERRORS as e:
+                if isinstance(e, openai.APIStatusError):
+                    self.budget.update(e.response.headers)
+                if attempt == self.max_retries:
+                    with self._stats_lock:
+                        self.stats.failures += 1
+                    raise
+                delay = self._backoff(attempt, e)
+                with self._stats_lock:
+                    self.stats.retries += 1
+                logger.warning(
+                    f"LLM call failed ({type(e).__name__}), retry {attempt + 1}/{self.max_retries} in {delay:.1f}s"
+                )
+                time.sleep(delay)
+                continue
+            except Exception:
+                with self._stats_lock:
+                    self.stats.failures += 1
+                raise
+
+            if raw:
+                self.budget.update(response.headers)
+                response = response.parse()
+
+            latency = time.perf_counter() - start
+            usage = getattr(response, "usage", None)
+            prompt_tokens = (usage.prompt_tokens or 0) if usage is not None else 0
+            completion_tokens = (getattr(usage, "completion_tokens", 0) or 0) if usage is not None else 0
+            with self._stats_lock:
+                self.stats.calls += 1
+                self.stats.latency_seconds += latency
+                self.stats.prompt_tokens += prompt_tokens
+                self.stats.completion_tokens += completion_tokens
+            get_instrumentation().record_call(model, latency, prompt_tokens, completion_tokens)
+            return response
+        raise AssertionError("unreachable")
+
+    def chat(
+        self,
+        messages: list[dict[str, str]],
+        model: str | None = None,
+        max_tokens: int | None = None,
+        temperature: float | None = None,
+        tracked: bool = False,
+        use_cache: bool = True,
+    ) -> str:
+        """
+        Send a chat completion request, or answer it from the response cache.
+
+        Args:
+            messages (list[dict[str, str]]): Chat messages.
+            model (str | None): Model name. Defaults to `openai_llm_model` from the settings.
+            max_tokens (int | None): Maximum tokens of the completion.
+            temperature (float | None): Sampling temperature.
+            tracked (bool): Whether to trace the call in Opik.
+            use_cache (bool): Whether to read and write the response cache for this request.
+
+        Returns:
+            str: The content of the completion.
+        """
+        model = model or self.llm_model
+        cache = self.cache if use_cache else None
+        key = LLMResponseCache.request_key(model, messages, max_tokens, temperature) if cache is not None else ""
+        if cache is not None and (cached := cache.get(key)) is not None:
+            get_instrumentation().record_cache_hit(model)
+            return cached
+
+        kwargs: dict[str, Any] = {"model": model, "messages": messages}
+        if max_tokens is not None:
+            kwargs["max_tokens"] = max_tokens
+        if temperature is not None:
+            kwargs["temperature"] = temperature
+
+        estimated_tokens = sum(len(m["content"]) for m in messages) // 4 + (max_tokens or 0)
+        if tracked:
+            # the traced client patches `create`, so its rate-limit headers are not read
+            response = self._call(
+                lambda: self.tracked_client.chat.completions.create(**kwargs), model, estimated_tokens, raw=False
+            )
+        else:
+            response = self._call(
+                lambda: self.client.chat.completions.with_raw_response.create(**kwargs), model, estimated_tokens
+            )
+
+        content: str = response.choices[0].message.content or ""
+        if cache is not None and content:
+            cache.put(key, model, content)
+        return content
+
+    def embed(
+        self, texts: str | list[str], model: str | None = None, tracked: bool = False, dimensions: int | None = None
+    ) -> list[list[float]]:
+        """
+        Embed one or more texts with one request.
+
+        Args:
+            texts (str | list[str]): Text or texts to embed.
+            model (str | None): Embedding model. Defaults to `openai_embedding_model` from the settings.
+            tracked (bool): Whether to send the request through the Opik-traced client.
+            dimensions (int | None): Size of the embeddings, for models returning shortened embeddings.
+                Defaults to `openai_embedding_dimensions` from the settings.
+
+        Returns:
+            list[list[float]]: One embedding per text, in order.
+        """
+        model = model or self.embedding_model
+        kwargs: dict[str, Any] = {"input": texts, "model": model}
+        if model.startswith(SHORTENABLE_EMBEDDING_MODELS):
+            kwargs["dimensions"] = dimensions or self.embedding_dimensions
+        estimated_tokens = sum(len(text) for text in ([texts] if isinstance(texts, str) else texts)) // 4
+        if tracked:
+            response = self._call(
+                lambda: self.tracked_client.embeddings.create(**kwargs), model, estimated_tokens, raw=False
+            )
+        else:
+            response = self._call(lambda: self.client.embeddings.with_raw_response.create(**kwargs), model, estimated_tokens)
+        return [item.embedding for item in response.data]
+
+    def log_stats(self) -> None:
+        """Log the call, token, retry and latency counters, and the response cache hit ratio."""
+        stats = self.stats
+        logger.info(
+            f"LLM gateway: {stats.calls} calls, {stats.retries} retries, {stats.failures} failures, "
+            f"{stats.prompt_tokens} prompt / {stats.completion_tokens} completion tokens, "
+            f"{stats.mean_latency:.2f}s mean latency"
+        )
+        if self.cache is not None:
+            self.cache.log_stats()
+
+
+_gateway: LLMGateway | None = None
+_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Return the process-wide LLM gateway, creating it on first use with the configured response cache."""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = LLMGateway(cache=LLMResponseCache.from_settings(Settings()))
+        return _gateway
@@ -0,0 +1,335 @@
+import os
+from typing import Any
+
+import numpy as np
+from bson import json_util
+from loguru import logger
+from pymongo.collection import Collection
+
+from src.infra.vector_encoding import decode_vector
+
+# Fields returned with each search result, as projected by the Atlas search
+RESULT_FIELDS = ("_id", "team", "summary_type", "summary_text", "source_url")
+
+# Fields kept per vector to detect changes when syncing with the collection
+STATE_PROJECTION = {"_id": 1, "text_hash": 1, "dimensions": 1}
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """
+    Scale each row to unit length, so that dot products are cosine similarities.
+
+    Args:
+        vectors (np.ndarray): Matrix of vectors, one per row.
+
+    Returns:
+        np.ndarray: The normalized float32 matrix.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def state_of(vector: dict[str, Any]) -> tuple[Any, Any]:
+    """Return what identifies the content of a stored vector: its text hash and size."""
+    return vector.get("text_hash"), vector.get("dimensions")
+
+
+class ExactVectorIndex:
+    """
+    In-process exact cosine search over a float32 matrix of the summary vectors.
+
+    Rows are normalized once, so a search is one matrix-vector product and a partial sort.
+    The index has the `vector_search` interface of `MongoVectorSearchClient`; scores are
+    mapped to [0, 1] like Atlas cosine scores. It persists to a `.npy` matrix, loaded
+    memory-mapped, and a JSON file of the result fields.
+
+    Args:
+        vectors (np.ndarray): Matrix of the vectors, one per row.
+        records (list[dict[str, Any]]): Result fields of each vector, plus its text hash and size.
+    """
+
+    def __init__(self, vectors: np.ndarray, records: list[dict[str, Any]]):
+        if len(vectors) != len(records):
+            raise ValueError(f"Got {len(vectors)} vectors for {len(records)} records")
+        self.vectors = vectors if len(vectors) else np.zeros((0, 0), dtype=np.float32)
+        self.records = records
+        self.build()
+
+    def build(self) -> None:
+        """Prepare the search structures after the vectors changed. Exact search needs none."""
+
+    @classmethod
+    def from_collection(cls, collection: Collection, dimensions: int | None = None, **kwargs: Any) -> "ExactVectorIndex":
+        """
+        Build the index from every vector of the collection.
+
+        Args:
+            collection (Collection): The vector collection.
+            dimensions (int | None): Size of the indexed vectors, see `sync`.
+            **kwargs (Any): Options of the index class.
+
+        Returns:
+            ExactVectorIndex: The index.
+        """
+        index = cls(np.zeros((0, 0), dtype=np.float32), [], **kwargs)
+        index.sync(collection, dimensions)
+        return index
+
+    def sync(self, collection: Collection, dimensions: int | None = None) -> int:
+        """
+        Bring the index up to date with the collection, fetching only new or changed vectors.
+
+        Vectors are compared by text hash and size with one projected query; removed vectors
+        are dropped, and only the changed ones are read with their embedding.
+
+        All vectors of an index have one size. With `dimensions`, vectors of another size, e.g.
+        not yet re-embedded during a change of embedding size, are left out with a warning
+        until `insert_embeddings` replaces them.
+
+        Args:
+            collection (Collection): The vector collection.
+            dimensions (int | None): Size of the indexed vectors. Defaults to the size of the
+                vectors already indexed, or of the first fetched one.
+
+        Returns:
+            int: The number of vectors added or replaced.
+
+        Raises:
+            ValueError: If a changed vector is stored as a bit vector, which has no cosine, or
+                if vectors of several sizes are found and `dimensions` is not given.
+        """
+        stored = {vector["_id"]: state_of(vector) for vector in collection.find({}, STATE_PROJECTION)}
+        if dimensions is not None and self.records and self.vectors.shape[1] != dimensions:
+            # the embedding size changed: every vector is fetched again
+            self.records, self.vectors = [], np.zeros((0, 0), dtype=np.float32)
+        kept = [i for i, record in enumerate(self.records) if stored.get(record["_id"], ()) == state_of(record)]
+        kept_ids = {self.records[i]["_id"] for i in kept}
+        changed_ids = [vector_id for vector_id in stored if vector_id not in kept_ids]
+        if not changed_ids and len(kept) == len(self.records):
+            return 0
+
+        records = [self.records[i] for i in kept]
+        rows = [np.asarray(self.vectors[kept], dtype=np.float32)] if kept else []
+        added = 0
+        if changed_ids:
+            projection = {field: 1 for field in (*RESULT_FIELDS, *STATE_PROJECTION, "embedding", "vector_encoding")}
+            changed = list(collection.find({"_id": {"$in": changed_ids}}, projection))
+            if any(vector.get("vector_encoding") == "packed_bit" for vector in changed):
+                raise ValueError("Bit vectors cannot be searched by cosine; store float or int8 vectors")
+            embeddings = [decode_vector(vector["embedding"]) for vector in changed]
+
+            size = dimensions or (self.vectors.shape[1] if kept else len(embeddings[0]) if embeddings else 0)
+            sizes = {len(embedding) for embedding in embeddings} - {size}
+            if sizes and dimensions is None:
+                raise ValueError(
+                    f"Found vectors of sizes {sorted(sizes | {size})}; pass the configured embedding dimensions "
+                    "to index only the vectors of that size"
+                )
+            if sizes:
+                skipped = sum(len(embedding) != size for embedding in embeddings)
+                logger.warning(
+                    f"Left {skipped} vectors of sizes {sorted(sizes)} out of the {size}-dimensional index; "
+                    "re-embed them with `make insert-embeddings`"
+                )
+
+            matching = [i for i, embedding in enumerate(embeddings) if len(embedding) == size]
+            records += [{field: changed[i].get(field) for field in (*RESULT_FIELDS, *STATE_PROJECTION)} for i in matching]
+            if matching:
+                rows.append(normalize_rows(np.array([embeddings[i] for i in matching])))
+            added = len(matching)
+
+        self.vectors = np.concatenate(rows) if rows else np.zeros((0, 0), dtype=np.float32)
+        self.records = records
+        self.build()
+        logger.info(f"Synced the vector index: {added} new or changed, {len(kept)} unchanged, {len(self.records)} vectors.")
+        return added
+
+    def save(self, path: str) -> None:
+        """
+        Persist the index to `<path>.npy` and `<path>.json`.
+
+        Args:
+            path (str): Path prefix of the index files.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # written aside then renamed, as the current matrix may be memory-mapped from the target file
+        with open(f"{path}.npy.tmp", "wb") as f:
+            np.save(f, self.vectors)
+        with open(f"{path}.json.tmp", "w", encoding="utf-8") as f:
+            f.write(json_util.dumps(self.records))
+        os.replace(f"{path}.npy.tmp", f"{path}.npy")
+        os.replace(f"{path}.json.tmp", f"{path}.json")
+
+    @classmethod
+    def load(cls, path: str, **kwargs: Any) -> "ExactVectorIndex":
+        """
+        Load a persisted index, memory-mapping its matrix.
+
+        Args:
+            path (str): Path prefix of the index files.
+            **kwargs (Any): Options of the index class.
+
+        Returns:
+            ExactVectorIndex: The index.
+        """
+        with open(f"{path}.json", encoding="utf-8") as f:
+            records = json_util.loads(f.read())
+        return cls(np.load(f"{path}.npy", mmap_mode="r"), records, **kwargs)
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        """Return whether an index is persisted at `path`."""
+        return os.path.exists(f"{path}.npy") and os.path.exists(f"{path}.json")
+
+    def search(self, query: np.ndarray, limit: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Find the rows closest to a normalized query.
+
+        Args:
+            query (np.ndarray): Normalized query vector.
+            limit (int): Number of rows to return.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Row indexes and cosine similarities, best first.
+        """
+        scores = self.vectors @ query
+        top = np.argpartition(-scores, limit - 1)[:limit] if limit < len(scores) else np.arange(len(scores))
+        top = top[np.argsort(-scores[top])]
+        return top, scores[top]
+
+    def vector_search(
+        self,
+        collection_name: str,
+        index_name: str,
+        attr_name: str,
+        embedding_vector: list,
+        limit: int = 3,
+    ) -> list:
+        """
+        Return the summaries closest to the query vector, shaped like the Atlas search results.
+
+        The collection, index and attribute names are accepted for compatibility and ignored.
+
+        Args:
+            collection_name (str): Name of the vector collection.
+            index_name (str): Name of the vector search index.
+            attr_name (str): Document attribute path holding the embedding vector.
+            embedding_vector (list): Query embedding vector.
+            limit (int): Max number of results to return.
+
+        Returns:
+            list: Matching documents with search scores.
+        """
+        if not self.records or limit <= 0:
+            return []
+        if len(embedding_vector) != self.vectors.shape[1]:
+            raise ValueError(f"Query has {len(embedding_vector)} dimensions, the index {self.vectors.shape[1]}")
+
+        query = normalize_rows(np.array([embedding_vector]))[0]
+        rows, scores = self.search(query, min(limit, len(self.records)))
+        return [
+            {field: self.records[row].get(field) for field in RESULT_FIELDS} | {"search_score": (1 + float(score)) / 2}
+            for row, score in zip(rows, scores, strict=True)
+        ]
+
+    def close_connection(self) -> None:
+        """Nothing to close: the index is in process."""
+
+
+class HnswVectorIndex(ExactVectorIndex):
+    """
+    Approximate in-process search with an HNSW graph (hnswlib), for corpora too large to scan.
+
+    The graph is rebuilt when the vectors change, and persisted next to the matrix as
+    `<path>.hnsw`, from which `load` reads it back instead of rebuilding it. Requires the
+    optional `hnswlib` package.
+
+    Args:
+        vectors (np.ndarray): Matrix of the vectors, one per row.
+        records (list[dict[str, Any]]): Result fields of each vector, plus its text hash and size.
+        m (int): Number of graph links per vector.
+        ef_construction (int): Size of the candidate list while building the graph.
+        ef_search (int): Size of the candidate list while searching; higher is slower and more exact.
+        graph_path (str | None): Persisted graph to load instead of building one.
+    """
+
+    def __init__(
+        self,
+        vectors: np.ndarray,
+        records: list[dict[str, Any]],
+        m: int = 16,
+        ef_construction: int = 200,
+        ef_search: int = 64,
+        graph_path: str | None = None,
+    ):
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.graph_path = graph_path
+        self.graph: Any = None
+        super().__init__(vectors, records)
+
+    def build(self) -> None:
+        """Build the HNSW graph over the current vectors."""
+        try:
+            import hnswlib
+        except ImportError as e:
+            raise ImportError(
+                "The 'hnsw' vector backend requires the optional hnswlib package: install it with "
+                "`uv sync --extra hnsw` or `pip install hnswlib`, or set VECTOR_BACKEND=exact"
+            ) from e
+
+        if not self.records:
+            self.graph = None
+            return
+        self.graph = hnswlib.Index(space="ip", dim=self.vectors.shape[1])
+        if self.graph_path and os.path.exists(self.graph_path):
+            self.graph.load_index(self.graph_path, max_elements=len(self.records))
+            # later changes rebuild the graph
+            self.graph_path = None
+        else:
+            self.graph.init_index(max_elements=len(self.records), ef_construction=self.ef_construction, M=self.m)
+            self.graph.add_items(np.asarray(self.vectors), np.arange(len(self.records)))
+        self.graph.set_ef(self.ef_search)
+
+    def save(self, path: str) -> None:
+        """
+        Persist the index to `<path>.npy`, `<path>.json` and `<path>.hnsw`.
+
+        Args:
+            path (str): Path prefix of the index files.
+        """
+        super().save(path)
+        if self.graph is not None:
+            self.graph.save_index(f"{path}.hnsw")
+
+    @classmethod
+    def load(cls, path: str, **kwargs: Any) -> "ExactVectorIndex":
+        """
+        Load a persisted index, memory-mapping its matrix and reading its graph.
+
+        Args:
+            path (str): Path prefix of the index files.
+            **kwargs (Any): Options of the index class.
+
+        Returns:
+            ExactVectorIndex: The index.
+        """
+        return super().load(path, graph_path=f"{path}.hnsw", **kwargs)
+
+    def search(self, query: np.ndarray, limit: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Find the rows approximately closest to a normalized query.
+
+        Args:
+            query (np.ndarray): Normalized query vector.
+            limit (int): Number of rows to return.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Row indexes and cosine similarities, best first.
+        """
+        self.graph.set_ef(max(self.ef_search, limit))
+        labels, distances = self.graph.knn_query(query, k=limit)
+        # inner product distance is 1 - similarity
+        return labels[0], 1 - distances[0]
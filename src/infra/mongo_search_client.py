@@ -1,6 +1,9 @@
 from pymongo import MongoClient
 from pymongo.mongo_client import MongoClient as MongoClientType
 
+from src.configs.settings import VectorEncoding
+from src.infra.vector_encoding import encode_vector
+
 
 class MongoVectorSearchClient:
     """
@@ -17,9 +20,11 @@ class MongoVectorSearchClient:
         List[Any]: List of matching documents with search scores.
     """
 
-    def __init__(self, connection_uri: str, db_name: str):
+    def __init__(self, connection_uri: str, db_name: str, vector_encoding: VectorEncoding = "array"):
         self.mongodb_client: MongoClientType = MongoClient(connection_uri)
         self.database = self.mongodb_client[db_name]
+        # query vectors are encoded like the stored ones, as Atlas requires for quantized vectors
+        self.vector_encoding = vector_encoding
 
     def vector_search(
         self, collection_name: str, index_name: str, attr_name: str, embedding_vector: list, limit: int = 3
@@ -31,7 +36,7 @@ class MongoVectorSearchClient:
                     "$vectorSearch": {
                         "index": index_name,
                         "path": attr_name,
-                        "queryVector": embedding_vector,
+                        "queryVector": encode_vector(embedding_vector, self.vector_encoding),
                         "numCandidates": 50,
                         "limit": limit,
                     }
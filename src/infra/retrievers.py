@@ -0,0 +1,81 @@
+from typing import Protocol
+
+from loguru import logger
+from pymongo import MongoClient
+from pymongo.mongo_client import MongoClient as MongoClientType
+
+from src.configs.settings import Settings
+from src.infra.mongo_search_client import MongoVectorSearchClient
+
+
+class VectorRetriever(Protocol):
+    """Interface of the vector search backends: Atlas `$vectorSearch` or an in-process index."""
+
+    def vector_search(
+        self, collection_name: str, index_name: str, attr_name: str, embedding_vector: list, limit: int = 3
+    ) -> list: ...
+
+    def close_connection(self) -> None: ...
+
+
+def sync_local_vector_index(settings: Settings) -> VectorRetriever:
+    """
+    Load the persisted in-process index, bring it up to date with the vector collection and save it.
+
+    Args:
+        settings (Settings): Settings with the backend, the index path and the MongoDB connection.
+
+    Returns:
+        VectorRetriever: The synced index.
+    """
+    from src.infra.local_vector_index import ExactVectorIndex, HnswVectorIndex
+
+    index_cls = HnswVectorIndex if settings.vector_backend == "hnsw" else ExactVectorIndex
+    client: MongoClientType = MongoClient(settings.mongodb_uri)
+    try:
+        collection = client[settings.mongodb_database][settings.mongodb_collection_index]
+        if index_cls.exists(settings.vector_index_path):
+            index = index_cls.load(settings.vector_index_path)
+            index.sync(collection, settings.openai_embedding_dimensions)
+        else:
+            index = index_cls.from_collection(collection, settings.openai_embedding_dimensions)
+    finally:
+        client.close()
+
+    index.save(settings.vector_index_path)
+    logger.info(f"Saved the {settings.vector_backend} vector index to {settings.vector_index_path}")
+    return index
+
+
+def get_vector_retriever(settings: Settings) -> VectorRetriever:
+    """
+    Open the vector search backend selected by `vector_backend` in the settings.
+
+    "atlas" queries MongoDB Atlas. "exact" and "hnsw" search in process: a persisted index is
+    loaded without connecting to MongoDB, and built from the vector collection otherwise.
+    Refresh a persisted index with `make sync-vector-index`.
+
+    Args:
+        settings (Settings): Application settings.
+
+    Returns:
+        VectorRetriever: The backend.
+    """
+    if settings.vector_backend == "atlas":
+        return MongoVectorSearchClient(
+            connection_uri=settings.mongodb_uri,
+            db_name=settings.mongodb_database,
+            vector_encoding=settings.vector_encoding,
+        )
+
+    # numpy and hnswlib are only loaded for the in-process backends
+    from src.infra.local_vector_index import ExactVectorIndex, HnswVectorIndex
+
+    index_cls = HnswVectorIndex if settings.vector_backend == "hnsw" else ExactVectorIndex
+    if index_cls.exists(settings.vector_index_path):
+        return index_cls.load(settings.vector_index_path)
+    return sync_local_vector_index(settings)
+
+
+if __name__ == "__main__":
+    sync_local_vector_index(Settings())
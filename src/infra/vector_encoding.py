@@ -0,0 +1,133 @@
+import math
+from typing import Any
+
+from bson.binary import Binary, BinaryVectorDtype
+
+from src.configs.settings import VectorEncoding, VectorQuantization
+
+INT8_MAX = 127
+
+
+def quantize_int8(vector: list[float]) -> list[int]:
+    """
+    Scale a vector into int8 values by its largest absolute component.
+
+    The scale is per vector, so cosine similarity is preserved up to rounding.
+
+    Args:
+        vector (list[float]): Embedding.
+
+    Returns:
+        list[int]: Components in [-127, 127].
+    """
+    scale = max((abs(x) for x in vector), default=0.0) or 1.0
+    return [round(x / scale * INT8_MAX) for x in vector]
+
+
+def pack_bits(vector: list[float]) -> list[int]:
+    """
+    Keep the sign of each component as one bit, packed eight per byte, most significant bit first.
+
+    Args:
+        vector (list[float]): Embedding.
+
+    Returns:
+        list[int]: Packed bytes; the last one is zero-padded.
+    """
+    packed = []
+    for start in range(0, len(vector), 8):
+        byte = 0
+        for offset, x in enumerate(vector[start : start + 8]):
+            if x > 0:
+                byte |= 1 << (7 - offset)
+        packed.append(byte)
+    return packed
+
+
+def truncate_vector(vector: list[float], dimensions: int) -> list[float]:
+    """
+    Shorten an embedding to its first `dimensions` components and scale it back to unit length.
+
+    For text-embedding-3 models this matches the embedding requested with `dimensions`.
+
+    Args:
+        vector (list[float]): Full-precision embedding.
+        dimensions (int): Number of components to keep.
+
+    Returns:
+        list[float]: The shortened, normalized embedding.
+    """
+    shortened = vector[:dimensions]
+    norm = math.sqrt(sum(x * x for x in shortened)) or 1.0
+    return [x / norm for x in shortened]
+
+
+def encode_vector(vector: list[float], encoding: VectorEncoding) -> list[float] | Binary:
+    """
+    Encode an embedding for storage or for a `$vectorSearch` query.
+
+    - "array": a BSON array of doubles, about 13 bytes per dimension.
+    - "float32": a packed float32 BSON vector, 4 bytes per dimension.
+    - "int8": a scalar-quantized int8 BSON vector, 1 byte per dimension.
+    - "packed_bit": a sign-quantized BSON bit vector, 1 bit per dimension.
+
+    Args:
+        vector (list[float]): Embedding.
+        encoding (VectorEncoding): Storage format.
+
+    Returns:
+        list[float] | Binary: The encoded vector.
+    """
+    if encoding == "float32":
+        return Binary.from_vector(vector, BinaryVectorDtype.FLOAT32)
+    if encoding == "int8":
+        return Binary.from_vector(quantize_int8(vector), BinaryVectorDtype.INT8)
+    if encoding == "packed_bit":
+        return Binary.from_vector(pack_bits(vector), BinaryVectorDtype.PACKED_BIT, padding=-len(vector) % 8)
+    return vector
+
+
+def decode_vector(value: Any) -> list[float]:
+    """
+    Read a stored embedding back as a list of numbers, whatever its encoding.
+
+    Quantized vectors come back as their int8 values, or as their packed bytes for bit vectors.
+
+    Args:
+        value (Any): Stored `embedding` field.
+
+    Returns:
+        list[float]: The vector components.
+    """
+    if isinstance(value, Binary):
+        return list(value.as_vector().data)
+    return list(value)
+
+
+def vector_index_field(
+    encoding: VectorEncoding, quantization: VectorQuantization, num_dimensions: int, path: str = "embedding"
+) -> dict[str, Any]:
+    """
+    Build the Atlas Vector Search field definition matching how vectors are stored.
+
+    Bit vectors are compared with the euclidean (Hamming) distance, which Atlas requires for
+    them. Automatic index-side quantization only applies to full-precision vectors.
+
+    Args:
+        encoding (VectorEncoding): Storage format of the vectors.
+        quantization (VectorQuantization): Index-side quantization of full-precision vectors.
+        num_dimensions (int): Number of dimensions of the embeddings.
+        path (str): Document field holding the vectors.
+
+    Returns:
+        dict[str, Any]: The field definition.
+    """
+    field: dict[str, Any] = {
+        "type": "vector",
+        "numDimensions": num_dimensions,
+        "path": path,
+        "similarity": "euclidean" if encoding == "packed_bit" else "cosine",
+    }
+    if quantization != "none" and encoding in ("array", "float32"):
+        field["quantization"] = quantization
+    return field
@@ -1,9 +1,11 @@
 from zenml import pipeline
 
 from src.configs.settings import Settings
-from src.steps.etl.crawl_step import crawl_step
-from src.steps.etl.mongo_ingest_step import mongo_ingest_step
+from src.steps.etl.crawl_step import crawl_cache_key, crawl_step, fetch_crawl_revisions
+from src.steps.etl.mongo_ingest_step import ingest_cache_key, mongo_ingest_step
 from src.steps.etl.parse_step import parse_step
+from src.steps.etl.streaming_etl_step import streaming_etl_step
+from src.utils.hashing import fingerprint
 
 settings = Settings()
 settings.load_yaml()
@@ -13,13 +15,36 @@ settings.load_yaml()
 def etl_pipeline() -> None:
     """
     ETL pipeline for crawling, parsing, and ingesting team data.
+
+    With `etl.mode: streaming` the three stages run in a single step over fixed-size
+    batches instead of passing the whole corpus between steps as artifacts.
+
+    Steps are cached on fingerprints of their inputs: the crawl on the teams, crawler
+    settings, page revisions and crawled files, the ingest on its documents, MongoDB
+    target and the documents already stored there. A re-run with nothing changed is
+    skipped; use `etl_pipeline.with_options(enable_cache=False)` to force one.
+
+    The cache keys are computed when the pipeline is compiled, before any step runs: unless
+    `crawler.refresh_mode` is "skip_existing", building the pipeline queries the MediaWiki
+    API for the revision ids of every page. They are passed on to the crawl, which does not
+    fetch them again. It also reads the content hash of every document of the MongoDB
+    collection, in one projected query.
     """
     if settings.yaml_config is None:
         raise ValueError("YAML configuration not loaded")
 
-    crawled_data = crawl_step(config=settings.yaml_config)
+    config = settings.yaml_config
+    revisions = fetch_crawl_revisions(config)
+    crawl_key = crawl_cache_key(config, revisions)
+    ingest_key = ingest_cache_key(settings, config.ingest)
+
+    if config.etl.mode == "streaming":
+        streaming_etl_step(config=config, revisions=revisions, cache_key=fingerprint(crawl_key, ingest_key))
+        return
+
+    crawled_data = crawl_step(config=config, revisions=revisions, cache_key=crawl_key)
     parsed_docs = parse_step(crawled_data=crawled_data)
-    mongo_ingest_step(documents=parsed_docs)
+    mongo_ingest_step(documents=parsed_docs, ingest_config=config.ingest, cache_key=ingest_key)
 
 
 if __name__ == "__main__":
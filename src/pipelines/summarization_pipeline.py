@@ -1,18 +1,27 @@
 from zenml import pipeline
 
 from src.configs.settings import Settings
-from src.steps.generate_summaries.generate_summaries_step import summarize_step
+from src.steps.generate_summaries.generate_summaries_step import summarize_cache_key, summarize_step
 
 
 @pipeline
 def summarization_pipeline() -> None:
     """
     Pipeline to generate summaries using the summarize_step.
+
+    The step is cached on a fingerprint of the prompt templates, the model and the stored
+    documents, so a re-run is skipped unless one of them changed. With `SUMMARY_MODE=batch`
+    the summaries are written through OpenAI Batch API jobs.
     """
     summarize_step(
         mongodb_uri=settings.mongodb_uri,
         mongodb_database=settings.mongodb_database,
         mongodb_collection=settings.mongodb_collection,
+        cache_key=summarize_cache_key(
+            settings.mongodb_uri, settings.mongodb_database, settings.mongodb_collection, settings.openai_llm_model
+        ),
+        max_workers=settings.summary_max_workers,
+        mode=settings.summary_mode,
     )
 
 
@@ -1,18 +1,20 @@
+import threading
+
 import opik
 from loguru import logger
-from openai import OpenAI
-from opik.integrations.openai import track_openai
 
 from src.configs.prompts import QUERY_PROMPT
 from src.configs.settings import Settings
-from src.infra.mongo_search_client import MongoVectorSearchClient
+from src.infra.embeddings import BatchEmbedder
+from src.infra.instrumentation import get_instrumentation
+from src.infra.llm_gateway import LLMGateway, get_llm_gateway
+from src.infra.retrievers import VectorRetriever, get_vector_retriever
 
 
 @opik.track(name="get_embedding")
-def get_query_embedding(query: str, client: OpenAI, model: str) -> list:
+def get_query_embedding(query: str, gateway: LLMGateway, model: str, dimensions: int | None = None) -> list:
     """Extract embedding generation into a separate tracked function."""
-    embedding_response = client.embeddings.create(input=query, model=model)
-    return embedding_response.data[0].embedding
+    return gateway.embed(query, model=model, tracked=True, dimensions=dimensions)[0]
 
 
 @opik.track(name="prepare_context")
@@ -23,28 +25,28 @@ def prepare_context_from_results(results: list) -> str:
 
 
 @opik.track(name="generate_answer")
-def generate_answer(prompt: str, client: OpenAI, model: str) -> str:
+def generate_answer(prompt: str, gateway: LLMGateway, model: str) -> str:
     """Extract answer generation into a separate tracked function."""
-    response = client.chat.completions.create(model=model, messages=[{"role": "user", "content": prompt}])
-    return response.choices[0].message.content or ""
-
-
-@opik.track(name="rag_query_pipeline")
-def answer_query_with_context(query: str, limit: int = 3) -> str:
-    """Main RAG pipeline with comprehensive Opik tracing."""
-    settings = Settings()
-
-    # Initialize OpenAI client with Opik tracking
-    openai_client = OpenAI(api_key=settings.openai_api_key)
-    openai_client = track_openai(openai_client)
-
-    vector_client = MongoVectorSearchClient(connection_uri=settings.mongodb_uri, db_name=settings.mongodb_database)
-
-    try:
-        # Get embedding for query (tracked)
-        query_vec = get_query_embedding(query, openai_client, settings.openai_embedding_model)
-
-        # Search in MongoDB vector index (tracked)
+    return gateway.chat(messages=[{"role": "user", "content": prompt}], model=model, tracked=True)
+
+
+@opik.track(name="get_embeddings")
+def get_query_embeddings(queries: list[str], embedder: BatchEmbedder) -> list[list[float]]:
+    """Embed several queries with batched requests."""
+    return embedder.embed(queries, tracked=True)
+
+
+def search_and_answer(
+    query: str,
+    query_vec: list[float],
+    gateway: LLMGateway,
+    vector_client: VectorRetriever,
+    settings: Settings,
+    limit: int,
+) -> str:
+    """Retrieve the summaries closest to an embedded query and answer it from them."""
+    # Search the vector index (tracked)
+    with get_instrumentation().stage("vector_search"):
         results = vector_client.vector_search(
             collection_name=settings.mongodb_collection_index,
             index_name=settings.mongodb_collection_index_name,
@@ -53,22 +55,123 @@ def answer_query_with_context(query: str, limit: int = 3) -> str:
             limit=limit,
         )
 
-        # Prepare context for prompt (tracked)
-        context = prepare_context_from_results(results)
+    # Prepare context for prompt (tracked)
+    context = prepare_context_from_results(results)
+
+    # Create the final prompt
+    prompt = QUERY_PROMPT.format(context=context, query=query)
+
+    # Get answer from the chat completion (tracked)
+    return generate_answer(prompt, gateway, settings.openai_llm_model)
+
+
+class RagService:
+    """
+    Answer queries from the summary vectors, reusing warm clients for the life of the process.
+
+    Settings are read once, and the LLM gateway's pooled OpenAI client and the vector search
+    backend (a pooled MongoDB client, or an in-process index) are kept open across queries,
+    so a query only pays for its embedding, search and completion requests. Close the
+    service, or use it as a context manager, to release the vector search connection.
+
+    Args:
+        settings (Settings | None): Application settings. Defaults to reading them from the environment.
+        gateway (LLMGateway | None): Gateway sending the OpenAI requests. Defaults to the shared gateway.
+        vector_client (VectorRetriever | None): Vector search backend, closed with the service.
+            Defaults to the backend selected by `vector_backend`.
+    """
+
+    def __init__(
+        self,
+        settings: Settings | None = None,
+        gateway: LLMGateway | None = None,
+        vector_client: VectorRetriever | None = None,
+    ):
+        self.settings = settings or Settings()
+        # Shared LLM gateway; its calls are traced with Opik
+        self.gateway = gateway or get_llm_gateway()
+        self.vector_client = vector_client or get_vector_retriever(self.settings)
+        self.embedder = BatchEmbedder(
+            self.gateway,
+            model=self.settings.openai_embedding_model,
+            dimensions=self.settings.openai_embedding_dimensions,
+        )
+
+    @opik.track(name="rag_query_pipeline")
+    def answer(self, query: str, limit: int = 3) -> str:
+        """
+        Main RAG pipeline with comprehensive Opik tracing.
+
+        Args:
+            query (str): Question to answer.
+            limit (int): Number of summaries retrieved as context.
+
+        Returns:
+            str: The answer.
+        """
+        with get_instrumentation().stage("rag_query"):
+            # Get embedding for query (tracked)
+            query_vec = get_query_embedding(
+                query, self.gateway, self.settings.openai_embedding_model, self.settings.openai_embedding_dimensions
+            )
+            return search_and_answer(query, query_vec, self.gateway, self.vector_client, self.settings, limit)
 
-        # Create the final prompt
-        prompt = QUERY_PROMPT.format(context=context, query=query)
+    @opik.track(name="rag_multi_query_pipeline")
+    def answer_many(self, queries: list[str], limit: int = 3) -> list[str]:
+        """
+        RAG pipeline for several queries, embedding all of them with batched requests.
 
-        # Get answer from OpenAI chat completion (tracked)
-        answer = generate_answer(prompt, openai_client, settings.openai_llm_model)
+        Args:
+            queries (list[str]): Questions to answer.
+            limit (int): Number of summaries retrieved as context per question.
+
+        Returns:
+            list[str]: One answer per question, in order.
+        """
+        with get_instrumentation().stage("rag_query"):
+            query_vecs = get_query_embeddings(queries, self.embedder)
+            return [
+                search_and_answer(query, query_vec, self.gateway, self.vector_client, self.settings, limit)
+                for query, query_vec in zip(queries, query_vecs, strict=True)
+            ]
+
+    def close(self) -> None:
+        """Close the vector search connection."""
+        self.vector_client.close_connection()
+
+    def __enter__(self) -> "RagService":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+_rag_service: RagService | None = None
+_rag_service_lock = threading.Lock()
+
+
+def get_rag_service() -> RagService:
+    """Return the process-wide RAG service, creating it on first use."""
+    global _rag_service
+    with _rag_service_lock:
+        if _rag_service is None:
+            _rag_service = RagService()
+        return _rag_service
+
+
+def answer_query_with_context(query: str, limit: int = 3) -> str:
+    """Answer a query with the process-wide RAG service."""
+    return get_rag_service().answer(query, limit)
 
-        return answer
 
-    finally:
-        vector_client.close_connection()
+def answer_queries_with_context(queries: list[str], limit: int = 3) -> list[str]:
+    """Answer several queries with the process-wide RAG service."""
+    return get_rag_service().answer_many(queries, limit)
 
 
 if __name__ == "__main__":
     q = "When did Atlético Madrid last win La Liga?"
-    answer = answer_query_with_context(q)
-    logger.info(f"Answer: {answer}")
+    with RagService() as service:
+        answer = service.answer(q)
+        logger.info(f"Answer: {answer}")
+        get_instrumentation().finish_run("rag_query", service.settings.metrics_dir)
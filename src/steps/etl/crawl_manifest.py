@@ -0,0 +1,51 @@
+import json
+import os
+from datetime import UTC, datetime
+
+from loguru import logger
+from pydantic import BaseModel, Field
+
+
+class ManifestEntry(BaseModel):
+    page_title: str
+    revid: int | None = None
+    section_fingerprints: dict[str, str] = Field(default_factory=dict)
+    crawled_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+
+
+class CrawlManifest:
+    """
+    Local record of the revision and section fingerprints of every crawled page.
+
+    The manifest is stored as a JSON file mapping team names to `ManifestEntry` objects,
+    so a re-crawl can tell which pages (and which of their sections) changed since the last run.
+
+    Args:
+        path (str): Location of the JSON manifest file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: dict[str, ManifestEntry] = {}
+
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.entries = {team: ManifestEntry.model_validate(entry) for team, entry in data.items()}
+            logger.info(f"Loaded crawl manifest with {len(self.entries)} entries from {path}")
+
+    def get(self, team: str) -> ManifestEntry | None:
+        """Return the manifest entry of a team, if it was crawled before."""
+        return self.entries.get(team)
+
+    def update(self, team: str, entry: ManifestEntry) -> None:
+        """Record the latest crawl of a team."""
+        self.entries[team] = entry
+
+    def save(self) -> None:
+        """Write the manifest to disk."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        data = {team: entry.model_dump(mode="json") for team, entry in self.entries.items()}
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        logger.info(f"Saved crawl manifest with {len(self.entries)} entries to {self.path}")
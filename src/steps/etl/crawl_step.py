@@ -1,69 +1,288 @@
 import os
+import uuid
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime
 
 from loguru import logger
 from zenml import step
 
-from src.configs.settings import CrawledDoc, YamlConfig
-from src.steps.etl.wikipedia_crawler import extract_wikipedia_page
+from src.configs.settings import CrawledDoc, CrawlerConfig, Team, YamlConfig
+from src.steps.etl.crawl_manifest import CrawlManifest, ManifestEntry
+from src.steps.etl.document_store import DocumentStore
+from src.steps.etl.http_cache import HttpCache
+from src.steps.etl.rate_limiter import RateLimiter
+from src.steps.etl.wikipedia_client import WikipediaApiClient
+from src.steps.etl.wikipedia_crawler import extract_wikipedia_page, get_page_revisions, refresh_wikipedia_page
+from src.utils.hashing import fingerprint, sha256_text
 
 
-@step(enable_cache=False)
-def crawl_step(config: YamlConfig) -> list[CrawledDoc]:
+def crawl_team(
+    team: Team,
+    output_dir: str,
+    crawler_config: CrawlerConfig,
+    client: WikipediaApiClient,
+    manifest: CrawlManifest,
+    revisions: dict[str, int],
+    store: DocumentStore | None = None,
+) -> CrawledDoc | None:
     """
-    ZenML pipeline step: Extracts Wikipedia articles and stores them as text files.
+    Crawl a single team's Wikipedia article, or reuse the stored copy when it is up to date.
+
+    Args:
+        team (Team): Team to crawl.
+        output_dir (str): Directory holding the article text files.
+        crawler_config (CrawlerConfig): Crawler settings.
+        client (WikipediaApiClient): Shared API client.
+        manifest (CrawlManifest): Manifest of previous crawls, updated in place.
+        revisions (dict[str, int]): Latest revision id per page slug.
+        store (DocumentStore | None): Document store used instead of text files, if configured.
+
+    Returns:
+        CrawledDoc | None: The crawled document, or None if no content could be extracted.
+    """
+    logger.info(f"📘 Extracting: {team.name}")
+    page_title = team.url.split("/wiki/")[-1]
+    file_path = os.path.join(output_dir, team.filename)
+    refresh_mode = crawler_config.refresh_mode
+    entry = manifest.get(team.name)
+    revid = revisions.get(page_title)
+
+    previous_text: str | None = None
+    if store:
+        previous_text = store.read_team(team.name)
+    elif os.path.exists(file_path):
+        with open(file_path, encoding="utf-8") as f:
+            previous_text = f.read()
+
+    # ✅ Skip if the document already exists and is still current
+    if previous_text is not None:
+        unchanged = entry is not None and revid is not None and entry.revid == revid
+        if refresh_mode == "skip_existing" or (refresh_mode == "incremental" and unchanged):
+            logger.info(f"✅ Wikipedia content already exists for {team.name}, skipping.")
+            return CrawledDoc(
+                team=team.name,
+                url=team.url,
+                filename=team.filename,
+                content=previous_text,
+                timestamp=datetime.now(UTC),
+                metadata=team.metadata or {},
+                content_hash=sha256_text(previous_text),
+            )
+
+    out_path = None if store else file_path
+    fingerprints: dict[str, str] = {}
+    if crawler_config.extract_mode == "sections" and refresh_mode == "incremental":
+        refreshed = refresh_wikipedia_page(
+            page_title,
+            out_path,
+            entry.section_fingerprints if entry else None,
+            max_workers=crawler_config.max_workers,
+            client=client,
+            cleaner=crawler_config.html_cleaner,
+            previous_text=previous_text,
+        )
+        content, fingerprints = refreshed if refreshed else (None, {})
+    else:
+        content = extract_wikipedia_page(
+            page_title,
+            out_path,
+            max_workers=crawler_config.max_workers,
+            client=client,
+            mode=crawler_config.extract_mode,
+            cleaner=crawler_config.html_cleaner,
+        )
+
+    if not content:
+        logger.warning(f"No content for {team.name} / {page_title}")
+        return None
+
+    content_hash = store.put(team.name, content, revid=revid) if store else sha256_text(content)
+    manifest.update(team.name, ManifestEntry(page_title=page_title, revid=revid, section_fingerprints=fingerprints))
+    return CrawledDoc(
+        team=team.name,
+        url=team.url,
+        filename=team.filename,
+        content=content,
+        timestamp=datetime.now(UTC),
+        metadata=team.metadata or {},
+        content_hash=content_hash,
+    )
+
+
+def fetch_crawl_revisions(config: YamlConfig) -> dict[str, int] | None:
+    """
+    Fetch the latest revision id of every configured page, when the refresh mode uses them.
+
+    The ids are fetched once by the pipeline, in batched metadata requests, and passed both
+    to `crawl_cache_key` and to the crawl step, so the pages are not queried twice.
 
     Args:
         config (YamlConfig): Parsed YAML configuration.
 
     Returns:
-        List[CrawledDoc]: Cleaned documents for downstream use.
+        dict[str, int] | None: Revision id per page slug, or None with `refresh_mode: skip_existing`.
     """
-    output_dir = config.output_dir
-    os.makedirs(output_dir, exist_ok=True)
-    logger.info(f"Output directory: {output_dir}")
+    crawler_config = config.crawler
+    if crawler_config.refresh_mode == "skip_existing":
+        return None
 
-    results: list[CrawledDoc] = []
+    client = WikipediaApiClient(
+        rate_limiter=RateLimiter(rate=crawler_config.requests_per_second, burst=crawler_config.burst),
+        cache=HttpCache(crawler_config.http_cache_dir, crawler_config.http_cache_mode),
+    )
+    try:
+        return get_page_revisions([team.url.split("/wiki/")[-1] for team in config.teams], client=client)
+    finally:
+        client.close()
 
-    for team in config.teams:
-        logger.info(f"📘 Extracting: {team.name}")
-        page_title = team.url.split("/wiki/")[-1]
-        file_path = os.path.join(output_dir, team.filename)
 
-        # ✅ Skip if file already exists
+def crawl_output_state(config: YamlConfig) -> list[str | None]:
+    """
+    Return the content hash of every team's crawled document, or None where it is missing.
+
+    Text files are hashed; with the document store, the indexed hash is used if its blob exists.
+
+    Args:
+        config (YamlConfig): Parsed YAML configuration.
+
+    Returns:
+        list[str | None]: One hash per team, in config order.
+    """
+    if config.crawler.storage == "store":
+        store = DocumentStore(config.crawler.store_dir)
+        return [store.current_hash(team.name) for team in config.teams]
+
+    hashes: list[str | None] = []
+    for team in config.teams:
+        file_path = os.path.join(config.output_dir, team.filename)
         if os.path.exists(file_path):
-            logger.info(f"✅ Wikipedia content already exists for {team.name}, skipping.")
             with open(file_path, encoding="utf-8") as f:
-                content: str | None = f.read()
-            results.append(
-                CrawledDoc(
-                    team=team.name,
-                    url=team.url,
-                    filename=team.filename,
-                    content=content or "",
-                    timestamp=datetime.now(UTC),
-                    metadata=team.metadata or {},
-                )
-            )
-            continue
+                hashes.append(sha256_text(f.read()))
+        else:
+            hashes.append(None)
+    return hashes
+
+
+def crawl_cache_key(config: YamlConfig, revisions: dict[str, int] | None = None) -> str:
+    """
+    Fingerprint the inputs of a crawl, used as the ZenML cache key of the crawl steps.
 
+    The key covers the team list, the output directory, the crawler settings and the hash
+    of every team's crawled document, so a cached crawl is not reused once an output file or
+    stored document was removed or edited. With `crawler.refresh_mode: incremental` it also
+    covers the latest revision id of every page, so a cached crawl is only reused while no
+    article changed. "full" refreshes, and incremental ones whose revision ids could not all
+    be fetched, get a unique key and always run.
+
+    Args:
+        config (YamlConfig): Parsed YAML configuration.
+        revisions (dict[str, int] | None): Revision id per page slug, from `fetch_crawl_revisions`.
+
+    Returns:
+        str: The cache key.
+    """
+    crawler_config = config.crawler
+    uncached = f"uncached-{uuid.uuid4().hex}"
+    if crawler_config.refresh_mode == "full":
+        return uncached
+
+    page_revisions: dict[str, int] = {}
+    if crawler_config.refresh_mode == "incremental":
+        page_revisions = revisions or {}
+        if len(page_revisions) < len(config.teams):
+            logger.warning("Could not fetch every revision id, the crawl will not be cached")
+            return uncached
+
+    return fingerprint(config.teams, config.output_dir, crawler_config, page_revisions, crawl_output_state(config))
+
+
+def iter_crawled_docs(
+    config: YamlConfig, batch_size: int | None = None, revisions: dict[str, int] | None = None
+) -> Iterator[CrawledDoc]:
+    """
+    Crawl the configured teams and yield their documents in config order.
+
+    Teams are crawled in parallel by `crawler.team_workers` threads. All of them share one
+    API client whose token-bucket limiter keeps the total request rate within
+    `crawler.requests_per_second`, however many workers run. A failing team is logged and
+    skipped without affecting the others.
+
+    With `crawler.refresh_mode: incremental`, the latest revision id of every page is fetched
+    in one cheap metadata request, unless given, and only pages whose revision changed since
+    the last crawl are re-crawled; in "sections" mode only their changed sections are refetched.
+
+    Teams are submitted `batch_size` at a time, so at most one batch of documents is held
+    in memory before it is consumed. The manifest and the document store index are saved
+    once the generator is exhausted or closed.
+
+    Args:
+        config (YamlConfig): Parsed YAML configuration.
+        batch_size (int | None): Number of teams crawled per batch. Defaults to all teams at once.
+        revisions (dict[str, int] | None): Revision id per page slug, from `fetch_crawl_revisions`.
+            Fetched here when not given and the refresh mode needs them.
+
+    Yields:
+        CrawledDoc: Cleaned documents, one per successfully crawled team.
+    """
+    output_dir = config.output_dir
+    os.makedirs(output_dir, exist_ok=True)
+    logger.info(f"Output directory: {output_dir}")
+
+    crawler_config = config.crawler
+    client = WikipediaApiClient(
+        rate_limiter=RateLimiter(rate=crawler_config.requests_per_second, burst=crawler_config.burst),
+        pool_size=crawler_config.max_workers * crawler_config.team_workers,
+        cache=HttpCache(crawler_config.http_cache_dir, crawler_config.http_cache_mode),
+    )
+    manifest = CrawlManifest(os.path.join(output_dir, crawler_config.manifest_file))
+    store = DocumentStore(crawler_config.store_dir) if crawler_config.storage == "store" else None
+
+    def crawl_isolated(team: Team) -> CrawledDoc | None:
         try:
-            content = extract_wikipedia_page(page_title, file_path)
-            if content:
-                results.append(
-                    CrawledDoc(
-                        team=team.name,
-                        url=team.url,
-                        filename=team.filename,
-                        content=content,
-                        timestamp=datetime.now(UTC),
-                        metadata=team.metadata or {},
-                    )
-                )
-            else:
-                logger.warning(f"No content for {team.name} / {page_title}")
+            return crawl_team(team, output_dir, crawler_config, client, manifest, page_revisions, store)
         except Exception as e:
             logger.error(f"❌ Failed to extract {team.name}: {e}")
+            return None
+
+    try:
+        page_revisions = revisions or {}
+        if revisions is None and crawler_config.refresh_mode != "skip_existing":
+            page_titles = [team.url.split("/wiki/")[-1] for team in config.teams]
+            page_revisions = get_page_revisions(page_titles, client=client)
+
+        batch_size = batch_size or max(1, len(config.teams))
+        with ThreadPoolExecutor(max_workers=max(1, crawler_config.team_workers)) as executor:
+            for start in range(0, len(config.teams), batch_size):
+                # map() keeps the results in config order
+                batch = config.teams[start : start + batch_size]
+                yield from (doc for doc in executor.map(crawl_isolated, batch) if doc)
+    finally:
+        client.close()
+        manifest.save()
+        if store:
+            store.save_index()
+        if client.cache and client.cache.mode != "passthrough":
+            logger.info(f"HTTP cache ({client.cache.mode}): {client.cache.hits} hits, {client.cache.misses} misses")
+
 
+@step(enable_cache=True)
+def crawl_step(config: YamlConfig, revisions: dict[str, int] | None = None, cache_key: str = "") -> list[CrawledDoc]:
+    """
+    ZenML pipeline step: Extracts Wikipedia articles and stores them as text files, or in the
+    content-addressed document store when `crawler.storage` is "store".
+
+    See `iter_crawled_docs` for how teams are crawled and refreshed. The step is cached on
+    `cache_key`, computed by `crawl_cache_key`.
+
+    Args:
+        config (YamlConfig): Parsed YAML configuration.
+        revisions (dict[str, int] | None): Revision id per page slug, from `fetch_crawl_revisions`.
+        cache_key (str): Fingerprint of the crawl inputs.
+
+    Returns:
+        List[CrawledDoc]: Cleaned documents for downstream use.
+    """
+    results = list(iter_crawled_docs(config, revisions=revisions))
     logger.success(f"🧾 Done. Crawled {len(results)} documents.")
     return results
@@ -0,0 +1,154 @@
+import contextlib
+import gzip
+import io
+import json
+import os
+import tempfile
+import threading
+from datetime import UTC, datetime
+from typing import IO
+
+from loguru import logger
+from pydantic import BaseModel, Field
+
+from src.utils.hashing import sha256_text
+
+
+class StoredDocument(BaseModel):
+    team: str
+    content_hash: str
+    revid: int | None = None
+    size: int
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+
+
+class DocumentStore:
+    """
+    Content-addressed, gzip-compressed store for crawled articles.
+
+    Each article body is written once as `objects/<hash[:2]>/<hash>.txt.gz`, named after the
+    SHA-256 of its text, so unchanged documents are never rewritten and identical bodies are
+    stored once. `index.json` maps every team to the hash and revision of its current document.
+
+    Args:
+        root (str): Directory holding the blobs and the index.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.index_path = os.path.join(root, "index.json")
+        self.index: dict[str, StoredDocument] = {}
+        self._lock = threading.Lock()
+
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.index = {team: StoredDocument.model_validate(entry) for team, entry in data.items()}
+            logger.info(f"Loaded document store index with {len(self.index)} documents from {root}")
+
+    def _blob_path(self, content_hash: str) -> str:
+        return os.path.join(self.root, "objects", content_hash[:2], f"{content_hash}.txt.gz")
+
+    def get_entry(self, team: str) -> StoredDocument | None:
+        """Return the index entry of a team's current document, if any."""
+        return self.index.get(team)
+
+    def current_hash(self, team: str) -> str | None:
+        """Return the content hash of a team's current document if its blob exists, without reading it."""
+        entry = self.get_entry(team)
+        return entry.content_hash if entry and os.path.exists(self._blob_path(entry.content_hash)) else None
+
+    def put(self, team: str, content: str, revid: int | None = None) -> str:
+        """
+        Store a team's document and point the index at it.
+
+        The blob is only written if no document with the same hash exists yet.
+
+        Args:
+            team (str): Team the document belongs to.
+            content (str): Full article text.
+            revid (int | None): Wikipedia revision id the text was crawled from.
+
+        Returns:
+            str: The content hash of the document.
+        """
+        content_hash = sha256_text(content)
+        path = self._blob_path(content_hash)
+
+        if os.path.exists(path):
+            logger.info(f"Document for {team} unchanged ({content_hash[:12]}), not rewritten")
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # write to a temporary file first so readers never see a partial blob
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+            logger.success(f"Stored document for {team} ({content_hash[:12]}, {len(content)} chars)")
+
+        with self._lock:
+            self.index[team] = StoredDocument(team=team, content_hash=content_hash, revid=revid, size=len(content))
+        return content_hash
+
+    def open(self, content_hash: str) -> IO[str]:
+        """
+        Open a stored document as a lazily decompressed text stream.
+
+        Args:
+            content_hash (str): Hash of the document.
+
+        Returns:
+            IO[str]: A text stream; decompression happens as it is read.
+        """
+        return io.TextIOWrapper(gzip.open(self._blob_path(content_hash), "rb"), encoding="utf-8")
+
+    def read(self, content_hash: str) -> str:
+        """
+        Read a stored document in full.
+
+        Args:
+            content_hash (str): Hash of the document.
+
+        Returns:
+            str: The document text.
+        """
+        with self.open(content_hash) as f:
+            return f.read()
+
+    def read_team(self, team: str) -> str | None:
+        """
+        Read a team's current document, treating a missing or corrupt blob as a cache miss.
+
+        A blob that cannot be read, or whose text no longer matches its hash, is removed along
+        with the team's index entry, so the next crawl fetches the article again and rewrites it.
+
+        Args:
+            team (str): Team whose document to read.
+
+        Returns:
+            str | None: The document text, or None if the team has no readable document.
+        """
+        entry = self.get_entry(team)
+        if entry is None:
+            return None
+        try:
+            content = self.read(entry.content_hash)
+            if sha256_text(content) != entry.content_hash:
+                raise ValueError("content does not match its hash")
+            return content
+        except (OSError, EOFError, UnicodeDecodeError, ValueError) as e:
+            logger.warning(f"Stored document for {team} ({entry.content_hash[:12]}) is unreadable, re-crawling: {e}")
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self._blob_path(entry.content_hash))
+            with self._lock:
+                self.index.pop(team, None)
+            return None
+
+    def save_index(self) -> None:
+        """Write the team index to disk."""
+        os.makedirs(self.root, exist_ok=True)
+        with self._lock:
+            data = {team: entry.model_dump(mode="json") for team, entry in self.index.items()}
+        with open(self.index_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        logger.info(f"Saved document store index with {len(data)} documents to {self.index_path}")
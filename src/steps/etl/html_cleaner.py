@@ -0,0 +1,179 @@
+import re
+from collections.abc import Callable
+from html.parser import HTMLParser
+
+from bs4 import BeautifulSoup, Tag
+from bs4.builder import HTMLTreeBuilder
+from bs4.dammit import EntitySubstitution, UnicodeDammit
+
+from src.configs.settings import HtmlCleaner
+
+WHITESPACE_PATTERN = re.compile(r"\s{2,}")
+CHARREF_PATTERN = re.compile(r"(x[0-9a-f]+|[0-9]+)(.*)", re.IGNORECASE | re.DOTALL)
+
+# Elements removed together with their content
+DROPPED_TAGS = {"script", "style"}
+DROPPED_CLASSES = {"sup": "reference"}
+
+# Elements whose strings BeautifulSoup does not return from get_text() (script, style, template, rt, rp)
+HIDDEN_STRING_TAGS = set(HTMLTreeBuilder.DEFAULT_STRING_CONTAINERS)
+VOID_TAGS = set(HTMLTreeBuilder.DEFAULT_EMPTY_ELEMENT_TAGS or ())
+
+
+def clean_html_bs4(html: str) -> str:
+    """
+    Clean section HTML with BeautifulSoup by removing scripts, styles, references, and hyperlinks.
+
+    Args:
+        html (str): Rendered HTML of one or more Wikipedia sections.
+
+    Returns:
+        str: Plain text with whitespace runs collapsed to single spaces.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+
+    # Remove <script> / <style> blocks
+    for tag in soup(["script", "style"]):
+        tag.decompose()
+
+    # Remove citation superscripts <sup class="reference">[1]</sup>
+    for ref in soup.select("sup.reference"):
+        ref.decompose()
+
+    # Unwrap hyperlinks but keep their visible text
+    for a in soup.find_all("a"):
+        if isinstance(a, Tag):
+            a.unwrap()
+
+    # Extract plain text
+    text = soup.get_text(separator=" ").strip()
+
+    # Collapse multiple whitespace
+    return WHITESPACE_PATTERN.sub(" ", text)
+
+
+class _TextExtractor(HTMLParser):
+    """
+    Single-pass HTML-to-text converter reproducing `clean_html_bs4` without building a tree.
+
+    It tracks the stack of open elements the way BeautifulSoup's html.parser builder does, and
+    splits text into strings at the same boundaries (every tag, comment or declaration), so
+    joining the kept strings with spaces gives the same result as `get_text(separator=" ")`.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=False)
+        # (tag name, dropped with its content, strings hidden from get_text)
+        self.stack: list[tuple[str, bool, bool]] = []
+        self.closed_void_tags: list[str] = []
+        self.strings: list[str] = []
+        self.buffer: list[str] = []
+
+    def flush(self) -> None:
+        if self.buffer:
+            if not (self.stack and self.stack[-1][2]):
+                self.strings.append("".join(self.buffer))
+            self.buffer = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]], close_void: bool = True) -> None:
+        self.flush()
+        dropped_class = DROPPED_CLASSES.get(tag)
+        # like BeautifulSoup, the last of repeated attributes wins
+        classes = (dict(attrs).get("class") or "").split()
+        dropped = tag in DROPPED_TAGS or (dropped_class is not None and dropped_class in classes)
+        parent_dropped, parent_hidden = self.stack[-1][1:] if self.stack else (False, False)
+        self.stack.append((tag, parent_dropped or dropped, parent_hidden or dropped or tag in HIDDEN_STRING_TAGS))
+
+        if close_void and tag in VOID_TAGS:
+            self.pop_to(tag)
+            self.closed_void_tags.append(tag)
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        self.handle_starttag(tag, attrs, close_void=False)
+        # "<br/>" closes itself, it is not the end tag expected after an earlier "<br>"
+        self.handle_endtag(tag, check_already_closed=False)
+
+    def handle_endtag(self, tag: str, check_already_closed: bool = True) -> None:
+        if check_already_closed and tag in self.closed_void_tags:
+            self.closed_void_tags.remove(tag)
+            return
+        self.flush()
+        self.pop_to(tag)
+
+    def pop_to(self, tag: str) -> None:
+        for i in range(len(self.stack) - 1, -1, -1):
+            if self.stack[i][0] == tag:
+                del self.stack[i:]
+                return
+
+    def handle_data(self, data: str) -> None:
+        self.buffer.append(data)
+
+    def handle_charref(self, name: str) -> None:
+        match = CHARREF_PATTERN.match(name)
+        if match is None:
+            self.buffer.append(name)
+            return
+        number, extra = match.groups()
+        base = 16 if number[0] in "xX" else 10
+        self.buffer.append(UnicodeDammit.numeric_character_reference(int(number.lstrip("xX"), base))[0] + extra)
+
+    def handle_entityref(self, name: str) -> None:
+        character = EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name)
+        self.buffer.append(character if character is not None else f"&{name}")
+
+    def handle_comment(self, data: str) -> None:
+        self.flush()
+
+    def handle_decl(self, decl: str) -> None:
+        self.flush()
+
+    def handle_pi(self, data: str) -> None:
+        self.flush()
+
+    def unknown_decl(self, data: str) -> None:
+        self.flush()
+        # CDATA sections are kept as text unless they sit inside a dropped element
+        if data.upper().startswith("CDATA[") and not (self.stack and self.stack[-1][1]):
+            self.strings.append(data[len("CDATA[") :])
+
+
+def clean_html_streaming(html: str) -> str:
+    """
+    Clean section HTML in a single streaming pass, without building a document tree.
+
+    Produces the same text as `clean_html_bs4`: scripts, styles and citation superscripts
+    are dropped with their content, hyperlinks keep their visible text.
+
+    Args:
+        html (str): Rendered HTML of one or more Wikipedia sections.
+
+    Returns:
+        str: Plain text with whitespace runs collapsed to single spaces.
+    """
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    parser.flush()
+    return WHITESPACE_PATTERN.sub(" ", " ".join(parser.strings).strip())
+
+
+HTML_CLEANERS: dict[str, Callable[[str], str]] = {
+    "bs4": clean_html_bs4,
+    "streaming": clean_html_streaming,
+}
+
+
+def get_html_cleaner(name: HtmlCleaner) -> Callable[[str], str]:
+    """
+    Return the HTML cleaning function registered under `name`.
+
+    Args:
+        name (HtmlCleaner): Cleaner backend, either "bs4" or "streaming".
+
+    Returns:
+        Callable[[str], str]: Function turning section HTML into plain text.
+    """
+    if name not in HTML_CLEANERS:
+        raise ValueError(f"Unknown HTML cleaner '{name}'. Available: {sorted(HTML_CLEANERS)}")
+    return HTML_CLEANERS[name]
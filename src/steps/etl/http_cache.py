@@ -0,0 +1,85 @@
+import gzip
+import json
+import os
+import tempfile
+from typing import Any
+
+import requests
+
+from src.configs.settings import HttpCacheMode
+from src.utils.hashing import sha256_text
+
+
+class HttpCacheMiss(requests.exceptions.RequestException):
+    """Raised in replay mode when a request has no recorded response."""
+
+
+class HttpCache:
+    """
+    On-disk cache of JSON API responses keyed by request URL and parameters.
+
+    Responses are stored as gzip-compressed JSON files named after the SHA-256 of the request,
+    sharded into sub-directories by the first two hex characters. The mode decides how the
+    cache is used:
+
+    - "record": every request hits the network and its response is written to the cache.
+    - "replay": responses are only read from the cache; a missing one raises `HttpCacheMiss`.
+    - "passthrough": the cache is neither read nor written.
+
+    Args:
+        cache_dir (str): Directory holding the cached responses.
+        mode (HttpCacheMode): How the cache is used.
+    """
+
+    def __init__(self, cache_dir: str, mode: HttpCacheMode = "passthrough"):
+        self.cache_dir = cache_dir
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def request_key(url: str, params: dict[str, str]) -> str:
+        """Return the cache key of a request, independent of parameter order."""
+        return sha256_text(url + "?" + json.dumps(params, sort_keys=True, ensure_ascii=False))
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json.gz")
+
+    def load(self, url: str, params: dict[str, str]) -> dict[str, Any] | None:
+        """
+        Read a recorded response.
+
+        Args:
+            url (str): Request URL.
+            params (dict[str, str]): Query parameters of the request.
+
+        Returns:
+            dict[str, Any] | None: The recorded JSON body, or None if the request was never recorded.
+        """
+        path = self._path(self.request_key(url, params))
+        if not os.path.exists(path):
+            self.misses += 1
+            return None
+
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            record = json.load(f)
+        self.hits += 1
+        return dict(record["body"])
+
+    def store(self, url: str, params: dict[str, str], body: dict[str, Any]) -> None:
+        """
+        Record a response, replacing any previous recording of the same request.
+
+        Args:
+            url (str): Request URL.
+            params (dict[str, str]): Query parameters of the request.
+            body (dict[str, Any]): Decoded JSON body of the response.
+        """
+        path = self._path(self.request_key(url, params))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # write to a temporary file first so concurrent readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt", encoding="utf-8") as f:
+            json.dump({"url": url, "params": params, "body": body}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
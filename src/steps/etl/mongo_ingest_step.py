@@ -1,23 +1,178 @@
+import time
+import uuid
+from datetime import UTC, datetime
 from typing import Any
 
 from loguru import logger
-from pymongo import MongoClient
+from pydantic import BaseModel
+from pymongo import MongoClient, UpdateOne
+from pymongo.collection import Collection
 from zenml import step
 
-from src.configs.settings import Settings
+from src.configs.settings import IngestConfig, Settings
+from src.utils.hashing import fingerprint, sha256_text
 
 
-@step(enable_cache=False)
-def mongo_ingest_step(documents: list[dict[str, Any]]) -> None:
+class IngestStats(BaseModel):
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+    seconds: float = 0.0
+
+    @property
+    def docs_per_second(self) -> float:
+        total = self.inserted + self.updated + self.skipped
+        return total / self.seconds if self.seconds else 0.0
+
+
+def ingest_per_document(
+    collection: Collection[dict[str, Any]], documents: list[dict[str, Any]], query_fields: list[str]
+) -> IngestStats:
+    """
+    Insert or update documents one at a time, comparing the stored content in Python.
+
+    Args:
+        collection (Collection): Target MongoDB collection.
+        documents (list[dict[str, Any]]): Documents from `parse_step`.
+        query_fields (list[str]): Fields identifying a document.
+
+    Returns:
+        IngestStats: Insert, update and skip counts.
+    """
+    stats = IngestStats()
+    for doc in documents:
+        query = {field: doc[field] for field in query_fields}
+        existing = collection.find_one(query)
+
+        if existing:
+            if existing.get("content") != doc["content"]:
+                collection.update_one(query, {"$set": doc | {"updated_at": datetime.now(UTC)}})
+                stats.updated += 1
+                logger.success(f"Updated document for query: {query}")
+            else:
+                stats.skipped += 1
+                logger.info(f"No change for query: {query} — skipping update")
+        else:
+            collection.insert_one(doc | {"updated_at": datetime.now(UTC)})
+            stats.inserted += 1
+            logger.success(f"Inserted new document for query: {query}")
+    return stats
+
+
+def ingest_bulk(
+    collection: Collection[dict[str, Any]], documents: list[dict[str, Any]], query_fields: list[str], batch_size: int = 500
+) -> IngestStats:
+    """
+    Upsert documents in unordered `bulk_write` batches, skipping those whose content hash is unchanged.
+
+    Each batch costs two round-trips: one `find` projecting only the query fields and the
+    stored `content_hash`, and one `bulk_write` of upserts for new or changed documents.
+    Article bodies are only sent when they changed and are never read back. Written
+    documents get an `updated_at` timestamp, the watermark used by the incremental sync.
+
+    Args:
+        collection (Collection): Target MongoDB collection.
+        documents (list[dict[str, Any]]): Documents from `parse_step`.
+        query_fields (list[str]): Fields identifying a document.
+        batch_size (int): Number of documents per batch.
+
+    Returns:
+        IngestStats: Insert, update and skip counts.
+    """
+    stats = IngestStats()
+    projection = {field: 1 for field in query_fields} | {"content_hash": 1, "_id": 0}
+
+    for start in range(0, len(documents), batch_size):
+        batch = documents[start : start + batch_size]
+        queries = [{field: doc[field] for field in query_fields} for doc in batch]
+
+        stored_hashes = {
+            tuple(existing.get(field) for field in query_fields): existing.get("content_hash")
+            for existing in collection.find({"$or": queries}, projection)
+        }
+
+        operations = []
+        for doc, query in zip(batch, queries, strict=True):
+            content_hash = doc.get("content_hash") or sha256_text(doc["content"])
+            if stored_hashes.get(tuple(query.values())) == content_hash:
+                stats.skipped += 1
+                continue
+            changes = doc | {"content_hash": content_hash, "updated_at": datetime.now(UTC)}
+            operations.append(UpdateOne(query, {"$set": changes}, upsert=True))
+
+        if operations:
+            result = collection.bulk_write(operations, ordered=False)
+            stats.inserted += result.upserted_count
+            stats.updated += result.matched_count
+
+        logger.info(f"Batch {start // batch_size + 1}: {len(operations)} upserts, {len(batch) - len(operations)} unchanged")
+    return stats
+
+
+def collection_state(collection: Collection[dict[str, Any]], query_fields: list[str]) -> list[list[Any]]:
+    """
+    Read the identity and content hash of every stored document, with one projected query.
+
+    Args:
+        collection (Collection): Target MongoDB collection.
+        query_fields (list[str]): Fields identifying a document.
+
+    Returns:
+        list[list[Any]]: The query field values and content hash of each document, sorted.
+    """
+    projection = {field: 1 for field in query_fields} | {"content_hash": 1, "_id": 0}
+    state = [[doc.get(field) for field in (*query_fields, "content_hash")] for doc in collection.find({}, projection)]
+    return sorted(state, key=str)
+
+
+def ingest_cache_key(settings: Settings, ingest_config: IngestConfig) -> str:
+    """
+    Fingerprint the target, settings and stored content of an ingest, the ZenML cache key of the ingest steps.
+
+    The key covers the content hash of every stored document, so a cached ingest is not
+    reused once the collection was changed by anything else, e.g. a document was deleted.
+
+    Args:
+        settings (Settings): Application settings holding the MongoDB target.
+        ingest_config (IngestConfig): Ingest mode and batch size.
+
+    Returns:
+        str: The cache key.
+    """
+    target = [settings.mongodb_uri, settings.mongodb_database, settings.mongodb_collection, settings.mongodb_query_fields]
+    if not settings.mongodb_uri:
+        return f"uncached-{uuid.uuid4().hex}"
+
+    client: MongoClient = MongoClient(settings.mongodb_uri)
+    try:
+        collection = client[settings.mongodb_database][settings.mongodb_collection]
+        state = collection_state(collection, settings.mongodb_query_fields)
+    finally:
+        client.close()
+    return fingerprint(target, ingest_config, state)
+
+
+@step(enable_cache=True)
+def mongo_ingest_step(
+    documents: list[dict[str, Any]], ingest_config: IngestConfig | None = None, cache_key: str = ""
+) -> None:
     """
     Insert or update documents in the MongoDB collection.
 
+    In "bulk" mode (the default) unchanged documents are detected by their content hash and
+    the rest are upserted in unordered batches; "per_document" keeps the original
+    find-then-write loop.
+
     Args:
         documents: Output list from `parse_step`, each containing at least
                    `team`, `source_url`, `content`, `timestamp` and `metadata` keys.
+        ingest_config: Ingest mode and batch size. Defaults to bulk mode.
+        cache_key: Fingerprint of the MongoDB target, from `ingest_cache_key`. With the
+                   input documents it decides whether a previous run can be reused.
     """
     settings = Settings()
     mongodb_uri = settings.mongodb_uri
+    ingest_config = ingest_config or IngestConfig()
 
     if not mongodb_uri:
         raise ValueError("`mongodb_uri` not provided in .env file")
@@ -27,19 +182,18 @@ def mongo_ingest_step(documents: list[dict[str, Any]]) -> None:
     collection = db[settings.mongodb_collection]
 
     try:
-        for doc in documents:
-            query = {field: doc[field] for field in settings.mongodb_query_fields}
-            existing = collection.find_one(query)
-
-            if existing:
-                if existing.get("content") != doc["content"]:
-                    collection.update_one(query, {"$set": doc})
-                    logger.success(f"Updated document for query: {query}")
-                else:
-                    logger.info(f"No change for query: {query} — skipping update")
-            else:
-                collection.insert_one(doc)
-                logger.success(f"Inserted new document for query: {query}")
+        start = time.perf_counter()
+        if ingest_config.mode == "bulk":
+            stats = ingest_bulk(collection, documents, settings.mongodb_query_fields, ingest_config.batch_size)
+        else:
+            stats = ingest_per_document(collection, documents, settings.mongodb_query_fields)
+        stats.seconds = time.perf_counter() - start
+
+        logger.success(
+            f"Ingested {len(documents)} documents ({ingest_config.mode}): {stats.inserted} inserted, "
+            f"{stats.updated} updated, {stats.skipped} skipped in {stats.seconds:.2f}s "
+            f"({stats.docs_per_second:.1f} docs/s)"
+        )
     finally:
         client.close()
         logger.info("MongoDB connection closed")
@@ -4,9 +4,30 @@ from loguru import logger
 from zenml import step
 
 from src.configs.settings import CrawledDoc
+from src.utils.hashing import sha256_text
 
 
-@step(enable_cache=False)
+def parse_document(team: CrawledDoc) -> dict[str, Any]:
+    """
+    Convert a crawled document into the dictionary stored in MongoDB.
+
+    Args:
+        team: Crawled document of one team.
+
+    Returns:
+        The document dictionary with its source URL, metadata and content hash.
+    """
+    return {
+        "team": team.team,
+        "source_url": team.url,
+        "content": team.content,
+        "timestamp": team.timestamp.isoformat(),
+        "metadata": team.metadata,
+        "content_hash": team.content_hash or sha256_text(team.content),
+    }
+
+
+@step(enable_cache=True)
 def parse_step(crawled_data: list[CrawledDoc]) -> list[dict[str, Any]]:
     """
     Parses crawled content and adds metadata.
@@ -22,15 +43,7 @@ def parse_step(crawled_data: list[CrawledDoc]) -> list[dict[str, Any]]:
     for team in crawled_data:
         logger.info(f"Parsing content for: {team.team}")
 
-        docs.append(
-            {
-                "team": team.team,
-                "source_url": team.url,
-                "content": team.content,
-                "timestamp": team.timestamp.isoformat(),
-                "metadata": team.metadata,
-            }
-        )
+        docs.append(parse_document(team))
 
     logger.success(f"Parsed {len(docs)} documents.")
     return docs
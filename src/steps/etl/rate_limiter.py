@@ -0,0 +1,44 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Thread-safe token-bucket rate limiter.
+
+    Tokens are refilled continuously at `rate` tokens per second up to `burst`. Each call to
+    `acquire` consumes one token, blocking until one is available. A single instance can be
+    shared by any number of worker threads to cap their combined request rate.
+
+    Args:
+        rate (float): Sustained number of acquisitions allowed per second.
+        burst (int): Maximum number of acquisitions that may happen back to back.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("`rate` must be greater than 0")
+        if burst < 1:
+            raise ValueError("`burst` must be at least 1")
+
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available, then consume it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait = (1 - self._tokens) / self.rate
+
+            time.sleep(wait)
@@ -0,0 +1,63 @@
+import time
+from typing import Any
+
+from loguru import logger
+from pymongo import MongoClient
+from zenml import step
+
+from src.configs.settings import Settings, YamlConfig
+from src.steps.etl.crawl_step import iter_crawled_docs
+from src.steps.etl.mongo_ingest_step import IngestStats, ingest_bulk
+from src.steps.etl.parse_step import parse_document
+
+
+@step(enable_cache=True)
+def streaming_etl_step(config: YamlConfig, revisions: dict[str, int] | None = None, cache_key: str = "") -> None:
+    """
+    ZenML pipeline step: Crawls, parses and ingests the teams in fixed-size batches.
+
+    Unlike the crawl → parse → ingest steps, no list of documents is materialized as an
+    artifact: each batch of `etl.batch_size` teams is crawled, parsed and bulk-upserted
+    before the next one is crawled, so peak memory depends on the batch size rather than
+    on the size of the corpus.
+
+    Args:
+        config (YamlConfig): Parsed YAML configuration.
+        revisions (dict[str, int] | None): Revision id per page slug, from `fetch_crawl_revisions`.
+        cache_key (str): Fingerprint of the crawl inputs and the MongoDB target.
+    """
+    settings = Settings()
+    if not settings.mongodb_uri:
+        raise ValueError("`mongodb_uri` not provided in .env file")
+
+    client: MongoClient = MongoClient(settings.mongodb_uri)
+    collection = client[settings.mongodb_database][settings.mongodb_collection]
+
+    stats = IngestStats()
+    batch: list[dict[str, Any]] = []
+
+    def flush() -> None:
+        batch_stats = ingest_bulk(collection, batch, settings.mongodb_query_fields, config.ingest.batch_size)
+        stats.inserted += batch_stats.inserted
+        stats.updated += batch_stats.updated
+        stats.skipped += batch_stats.skipped
+        batch.clear()
+
+    try:
+        start = time.perf_counter()
+        for doc in iter_crawled_docs(config, batch_size=config.etl.batch_size, revisions=revisions):
+            batch.append(parse_document(doc))
+            if len(batch) >= config.etl.batch_size:
+                flush()
+        if batch:
+            flush()
+        stats.seconds = time.perf_counter() - start
+
+        logger.success(
+            f"🧾 Streamed {stats.inserted + stats.updated + stats.skipped} documents: {stats.inserted} inserted, "
+            f"{stats.updated} updated, {stats.skipped} skipped in {stats.seconds:.2f}s "
+            f"({stats.docs_per_second:.1f} docs/s)"
+        )
+    finally:
+        client.close()
+        logger.info("MongoDB connection closed")
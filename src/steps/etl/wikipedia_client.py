@@ -0,0 +1,77 @@
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.steps.etl.http_cache import HttpCache, HttpCacheMiss
+from src.steps.etl.rate_limiter import RateLimiter
+
+WIKIPEDIA_API_URL = "https://en.wikipedia.org/w/api.php"
+USER_AGENT = "llm-observability-opik/0.1 (https://github.com/benitomartin/llm-observability-opik)"
+
+
+class WikipediaApiClient:
+    """
+    Thin MediaWiki API client sharing one keep-alive connection pool and one rate limiter.
+
+    Args:
+        rate_limiter (RateLimiter | None): Limiter applied before every network request. None disables limiting.
+        pool_size (int): Maximum number of pooled keep-alive connections to the API host.
+        timeout (float): Timeout in seconds for each HTTP request.
+        cache (HttpCache | None): Response cache used to record or replay API calls.
+    """
+
+    def __init__(
+        self,
+        rate_limiter: RateLimiter | None = None,
+        pool_size: int = 16,
+        timeout: float = 30.0,
+        cache: HttpCache | None = None,
+    ):
+        self.rate_limiter = rate_limiter
+        self.timeout = timeout
+        self.cache = cache
+
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": USER_AGENT})
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, params: dict[str, str]) -> dict[str, Any]:
+        """
+        Send a GET request to the MediaWiki API and return the decoded JSON body.
+
+        In replay mode the response is read from the cache without touching the network;
+        in record mode the live response is written to the cache.
+
+        Args:
+            params (dict[str, str]): Query parameters of the API call.
+
+        Returns:
+            dict[str, Any]: The decoded JSON response.
+
+        Raises:
+            requests.exceptions.RequestException: If the request fails or returns an error status.
+            HttpCacheMiss: In replay mode, if the request was never recorded.
+        """
+        if self.cache is not None and self.cache.mode == "replay":
+            cached = self.cache.load(WIKIPEDIA_API_URL, params)
+            if cached is None:
+                raise HttpCacheMiss(f"No recorded response for {params}")
+            return cached
+
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+
+        response = self.session.get(WIKIPEDIA_API_URL, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        body = dict(response.json())
+
+        if self.cache is not None and self.cache.mode == "record":
+            self.cache.store(WIKIPEDIA_API_URL, params, body)
+        return body
+
+    def close(self) -> None:
+        """Close the pooled HTTP connections."""
+        self.session.close()
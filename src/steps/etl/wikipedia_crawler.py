@@ -1,31 +1,59 @@
 import os
 import re
-import time
+from concurrent.futures import ThreadPoolExecutor
+from html import unescape
+from typing import Any
 
 import requests
-from bs4 import BeautifulSoup, Tag
+from bs4 import BeautifulSoup
 from loguru import logger
 
+from src.configs.settings import ExtractMode, HtmlCleaner
+from src.steps.etl.html_cleaner import get_html_cleaner
+from src.steps.etl.rate_limiter import RateLimiter
+from src.steps.etl.wikipedia_client import WikipediaApiClient
+from src.utils.hashing import sha256_text
 
-def get_wikipedia_toc(page_title: str) -> list | None:
+# Start of a section heading, including the `<div class="mw-heading">` wrapper used by newer parser output
+HEADING_PATTERN = re.compile(r'(?:<div class="mw-heading\b[^"]*"[^>]*>\s*)?<h[1-6]\b', re.IGNORECASE)
+ANCHOR_PATTERN = re.compile(r'\bid="([^"]*)"')
+
+# Wikitext heading line, e.g. "== History ==" (level = number of "=" signs)
+WIKITEXT_HEADING_PATTERN = re.compile(r"^(={1,6})(.+?)\1[ \t]*$", re.MULTILINE)
+WIKITEXT_COMMENT_PATTERN = re.compile(r"<!--.*?-->", re.DOTALL)
+
+SECTION_SEPARATOR = "\n\n" + "-" * 60 + "\n"
+NO_CONTENT = "[No content available]"
+
+_default_client: WikipediaApiClient | None = None
+
+
+def get_default_client() -> WikipediaApiClient:
+    """Return the process-wide MediaWiki API client, creating it on first use."""
+    global _default_client
+    if _default_client is None:
+        _default_client = WikipediaApiClient()
+    return _default_client
+
+
+def get_wikipedia_toc(page_title: str, client: WikipediaApiClient | None = None) -> list | None:
     """
     Fetch the Table of Contents (TOC) for a given Wikipedia page using the MediaWiki API.
 
     Args:
         page_title (str): The title (slug) of the Wikipedia page, e.g. "Real_Madrid_CF".
+        client (WikipediaApiClient | None): API client to use. Defaults to the shared client.
 
     Returns:
         list | None: A list of sections with metadata if successful, None if the page or sections are not found or on error.
     """
-    url = "https://en.wikipedia.org/w/api.php"
+    client = client or get_default_client()
     params = {"action": "parse", "format": "json", "prop": "sections", "page": page_title, "redirects": "true"}
 
     logger.info(f"Requesting TOC for Wikipedia page: '{page_title}'")
 
     try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        data = response.json()
+        data = client.get(params)
 
         if "parse" in data and "sections" in data["parse"]:
             logger.success(f"Retrieved {len(data['parse']['sections'])} sections from '{page_title}'")
@@ -42,7 +70,23 @@ def get_wikipedia_toc(page_title: str) -> list | None:
         return None
 
 
-def get_clean_section_content(page_title: str, section_index: str) -> str | None:
+def clean_section_html(html: str, cleaner: HtmlCleaner = "bs4") -> str:
+    """
+    Clean a section's HTML by removing scripts, styles, references, and hyperlinks, then return plain text.
+
+    Args:
+        html (str): Rendered HTML of one or more Wikipedia sections.
+        cleaner (HtmlCleaner): Cleaning backend, "bs4" or the single-pass "streaming" parser.
+
+    Returns:
+        str: Plain text with whitespace runs collapsed to single spaces.
+    """
+    return get_html_cleaner(cleaner)(html)
+
+
+def get_clean_section_content(
+    page_title: str, section_index: str, client: WikipediaApiClient | None = None, cleaner: HtmlCleaner = "bs4"
+) -> str | None:
     """
     Fetch a specific section of a Wikipedia page, clean its HTML content by removing scripts,
     styles, references, and hyperlinks, then return plain text.
@@ -50,11 +94,13 @@ def get_clean_section_content(page_title: str, section_index: str) -> str | None
     Args:
         page_title (str): Wikipedia page slug, e.g. "Real_Madrid_CF".
         section_index (str): Section index identifier as returned by the MediaWiki API, e.g. "15".
+        client (WikipediaApiClient | None): API client to use. Defaults to the shared client.
+        cleaner (HtmlCleaner): HTML cleaning backend.
 
     Returns:
         str | None: Clean plain-text content of the section or None if fetching/parsing fails.
     """
-    url = "https://en.wikipedia.org/w/api.php"
+    client = client or get_default_client()
     params = {
         "action": "parse",
         "format": "json",
@@ -67,67 +113,177 @@ def get_clean_section_content(page_title: str, section_index: str) -> str | None
     # logger.debug(f"Requesting section {section_index} of '{page_title}'")
 
     try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        data = response.json()
+        data = client.get(params)
 
         if "parse" not in data or "text" not in data["parse"]:
             logger.warning(f"No text found for {page_title} section {section_index}")
             return None
 
         html = data["parse"]["text"]["*"]
-        soup = BeautifulSoup(html, "html.parser")
+        return clean_section_html(html, cleaner)
+
+    except requests.exceptions.RequestException as http_err:
+        logger.error(f"HTTP error for {page_title} sec {section_index}: {http_err}")
+    except (KeyError, ValueError) as parse_err:
+        logger.error(f"Parse error for {page_title} sec {section_index}: {parse_err}")
+    except Exception as e:
+        logger.exception(f"Unexpected error on {page_title} sec {section_index}: {e}")
 
-        # Remove <script> / <style> blocks
-        for tag in soup(["script", "style"]):
-            tag.decompose()
+    return None
 
-        # Remove citation superscripts <sup class="reference">[1]</sup>
-        for ref in soup.select("sup.reference"):
-            ref.decompose()
 
-        # Unwrap hyperlinks but keep their visible text
-        for a in soup.find_all("a"):
-            if isinstance(a, Tag):
-                a.unwrap()
+def get_wikipedia_page(page_title: str, client: WikipediaApiClient | None = None) -> dict[str, Any] | None:
+    """
+    Fetch the whole parsed HTML of a Wikipedia page together with its TOC in a single API call.
 
-        # Extract plain text
-        text = soup.get_text(separator=" ").strip()
+    Args:
+        page_title (str): Wikipedia page slug, e.g. "Real_Madrid_CF".
+        client (WikipediaApiClient | None): API client to use. Defaults to the shared client.
 
-        # Collapse multiple whitespace
-        text = re.sub(r"\s{2,}", " ", text)
+    Returns:
+        dict[str, Any] | None: A dict with `sections` (TOC entries) and `html` (full page HTML),
+        or None if the page could not be fetched.
+    """
+    client = client or get_default_client()
+    params = {"action": "parse", "format": "json", "prop": "text|sections", "page": page_title, "redirects": "true"}
 
-        # logger.success(f"✓ Cleaned section {section_index} of '{page_title}' "
-        #                f"({len(text)} chars)")
-        return text
+    logger.info(f"Requesting full page for Wikipedia page: '{page_title}'")
 
-    except requests.exceptions.RequestException as http_err:
-        logger.error(f"HTTP error for {page_title} sec {section_index}: {http_err}")
+    try:
+        data = client.get(params)
+
+        if "parse" not in data or "text" not in data["parse"]:
+            logger.warning(f"No text found for page '{page_title}'")
+            return None
+
+        sections = list(data["parse"].get("sections", []))
+        logger.success(f"Retrieved full page with {len(sections)} sections from '{page_title}'")
+        return {"sections": sections, "html": data["parse"]["text"]["*"]}
+
+    except requests.exceptions.RequestException as req_err:
+        logger.error(f"HTTP error while fetching page '{page_title}': {req_err}")
     except (KeyError, ValueError) as parse_err:
-        logger.error(f"Parse error for {page_title} sec {section_index}: {parse_err}")
+        logger.error(f"Parse error for page '{page_title}': {parse_err}")
     except Exception as e:
-        logger.exception(f"Unexpected error on {page_title} sec {section_index}: {e}")
+        logger.exception(f"Unexpected error while getting page '{page_title}': {e}")
 
     return None
 
 
-def extract_wikipedia_page(page_title: str, out_path: str, sleep: float = 0.3) -> str | None:
+def split_page_sections(html: str, sections: list) -> list[str | None]:
     """
-    Extract the full content of a Wikipedia page, including its TOC and all sections,
-    clean the text content, and save the combined output to a file.
+    Split the full HTML of a page into per-section HTML fragments using the heading hierarchy.
+
+    Each fragment starts at the section heading and runs until the next section of the same or
+    a higher level, so it contains its subsections, mirroring what the API returns when a single
+    section is requested. Reference lists are dropped because a single-section request only
+    renders the citations of that section.
+
+    Args:
+        html (str): Full page HTML as returned by `get_wikipedia_page`.
+        sections (list): TOC entries of the page.
+
+    Returns:
+        list[str | None]: One HTML fragment per TOC entry, or None where the heading was not found.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    for ref_list in soup.select("ol.references"):
+        ref_list.decompose()
+    html = str(soup)
+
+    # Offsets of every heading in the page, keyed by its anchor id
+    heading_offsets: dict[str, int] = {}
+    for match in HEADING_PATTERN.finditer(html):
+        heading_end = html.find("</h", match.end())
+        anchor = ANCHOR_PATTERN.search(html, match.start(), heading_end if heading_end != -1 else len(html))
+        if anchor:
+            heading_offsets.setdefault(unescape(anchor.group(1)), match.start())
+
+    starts = [heading_offsets.get(sec.get("anchor", "")) for sec in sections]
+
+    fragments: list[str | None] = []
+    for i, (sec, start) in enumerate(zip(sections, starts, strict=True)):
+        if start is None:
+            fragments.append(None)
+            continue
+
+        level = int(sec["level"])
+        end = len(html)
+        for next_sec, next_start in zip(sections[i + 1 :], starts[i + 1 :], strict=True):
+            if next_start is not None and int(next_sec["level"]) <= level:
+                end = next_start
+                break
+
+        fragments.append(html[start:end])
+
+    return fragments
+
+
+def fetch_sections_separately(
+    page_title: str, max_workers: int, client: WikipediaApiClient, cleaner: HtmlCleaner = "bs4"
+) -> tuple[list, list[str | None]] | None:
+    """
+    Fetch the TOC and then every section with its own API call, concurrently.
 
     Args:
         page_title (str): Wikipedia page slug to extract.
-        out_path (str): Path to save the extracted text file.
-        sleep (float): Delay in seconds between fetching individual sections to avoid API rate limits.
+        max_workers (int): Maximum number of sections fetched at the same time.
+        client (WikipediaApiClient): API client to use.
+        cleaner (HtmlCleaner): HTML cleaning backend.
 
     Returns:
-        str | None: The full extracted text content if successful, None otherwise.
+        tuple[list, list[str | None]] | None: TOC entries and cleaned section texts in TOC order.
     """
-    sections = get_wikipedia_toc(page_title)
+    sections = get_wikipedia_toc(page_title, client=client)
     if not sections:
         return None
 
+    # fetch sections concurrently; map() yields results in TOC order
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        section_texts = list(
+            executor.map(
+                lambda sec: get_clean_section_content(page_title, sec["index"], client=client, cleaner=cleaner), sections
+            )
+        )
+    return sections, section_texts
+
+
+def fetch_sections_from_full_page(
+    page_title: str, client: WikipediaApiClient, cleaner: HtmlCleaner = "bs4"
+) -> tuple[list, list[str | None]] | None:
+    """
+    Fetch the whole page in one API call and split it into sections locally.
+
+    Args:
+        page_title (str): Wikipedia page slug to extract.
+        client (WikipediaApiClient): API client to use.
+        cleaner (HtmlCleaner): HTML cleaning backend.
+
+    Returns:
+        tuple[list, list[str | None]] | None: TOC entries and cleaned section texts in TOC order.
+    """
+    page = get_wikipedia_page(page_title, client=client)
+    if not page or not page["sections"]:
+        return None
+
+    sections = page["sections"]
+    fragments = split_page_sections(page["html"], sections)
+    section_texts = [clean_section_html(fragment, cleaner) if fragment is not None else None for fragment in fragments]
+    return sections, section_texts
+
+
+def render_wikipedia_page(page_title: str, sections: list, section_texts: list[str | None]) -> str:
+    """
+    Render the TOC and the cleaned sections of a page into the plain-text article layout.
+
+    Args:
+        page_title (str): Wikipedia page slug.
+        sections (list): TOC entries of the page.
+        section_texts (list[str | None]): Cleaned text of each section, in TOC order.
+
+    Returns:
+        str: The full article text.
+    """
     content_lines: list[str] = [
         f"WIKIPEDIA ARTICLE: {page_title}",
         "=" * 80,
@@ -143,20 +299,305 @@ def extract_wikipedia_page(page_title: str, out_path: str, sleep: float = 0.3) -
 
     content_lines += ["", "FULL CONTENT", "=" * 80, ""]
 
-    # fetch each section
-    for _, sec in enumerate(sections, start=1):
-        header_marker = "#" * int(sec["level"])
-        content_lines.append(f"{header_marker} {sec['line']}\n")
+    # write each section
+    for sec, section_text in zip(sections, section_texts, strict=True):
+        content_lines.append(f"{section_heading(sec)}\n")
 
-        section_text = get_clean_section_content(page_title, sec["index"])
-        content_lines.append(section_text or "[No content available]")
+        content_lines.append(section_text or NO_CONTENT)
         content_lines += ["", "-" * 60, ""]
-        time.sleep(sleep)
 
-    full_text = "\n".join(content_lines)
+    return "\n".join(content_lines)
 
+
+def extract_wikipedia_page(
+    page_title: str,
+    out_path: str | None,
+    sleep: float = 0.3,
+    max_workers: int = 4,
+    client: WikipediaApiClient | None = None,
+    mode: ExtractMode = "sections",
+    cleaner: HtmlCleaner = "bs4",
+) -> str | None:
+    """
+    Extract the full content of a Wikipedia page, including its TOC and all sections,
+    clean the text content, and save the combined output to a file.
+
+    In "sections" mode the TOC and every section are fetched with separate API calls, run
+    concurrently by up to `max_workers` threads over a pooled keep-alive session. In "full_page"
+    mode the parsed page is fetched once and split into sections locally. Both modes write
+    sections in TOC order with the same layout.
+
+    Args:
+        page_title (str): Wikipedia page slug to extract.
+        out_path (str | None): Path to save the extracted text file. None skips writing.
+        sleep (float): Minimum delay in seconds between API requests when no `client` is given.
+        max_workers (int): Maximum number of sections fetched at the same time.
+        client (WikipediaApiClient | None): Shared API client carrying the connection pool and
+            rate limiter. If None, a client limited to one request every `sleep` seconds is used.
+        mode (ExtractMode): Extraction engine, either "sections" or "full_page".
+        cleaner (HtmlCleaner): HTML cleaning backend, "bs4" or the single-pass "streaming" parser.
+
+    Returns:
+        str | None: The full extracted text content if successful, None otherwise.
+    """
+    owns_client = client is None
+    if client is None:
+        rate_limiter = RateLimiter(rate=1 / sleep) if sleep > 0 else None
+        client = WikipediaApiClient(rate_limiter=rate_limiter, pool_size=max_workers)
+
+    try:
+        if mode == "full_page":
+            extracted = fetch_sections_from_full_page(page_title, client, cleaner)
+        else:
+            extracted = fetch_sections_separately(page_title, max_workers, client, cleaner)
+    finally:
+        if owns_client:
+            client.close()
+
+    if extracted is None:
+        return None
+
+    sections, section_texts = extracted
+    full_text = render_wikipedia_page(page_title, sections, section_texts)
+    if out_path:
+        save_wikipedia_page(full_text, out_path)
+    return full_text
+
+
+def save_wikipedia_page(full_text: str, out_path: str) -> None:
+    """
+    Write a rendered article to disk.
+
+    Args:
+        full_text (str): The rendered article text.
+        out_path (str): Path of the text file to write.
+    """
     os.makedirs(os.path.dirname(out_path), exist_ok=True)
     with open(out_path, "w", encoding="utf-8") as f:
         f.write(full_text)
     logger.success(f"Saved → {out_path}  ({len(full_text)} chars)")
-    return full_text
+
+
+def get_page_revisions(page_titles: list[str], client: WikipediaApiClient | None = None) -> dict[str, int]:
+    """
+    Fetch the latest revision id of many pages with one metadata request per 50 titles.
+
+    Args:
+        page_titles (list[str]): Wikipedia page slugs, e.g. ["Real_Madrid_CF", "FC_Porto"].
+        client (WikipediaApiClient | None): API client to use. Defaults to the shared client.
+
+    Returns:
+        dict[str, int]: Latest revision id per requested page slug. Pages that could not be
+        resolved are left out.
+    """
+    client = client or get_default_client()
+    revisions: dict[str, int] = {}
+
+    for i in range(0, len(page_titles), 50):
+        batch = page_titles[i : i + 50]
+        params = {
+            "action": "query",
+            "format": "json",
+            "formatversion": "2",
+            "prop": "revisions",
+            "rvprop": "ids",
+            "titles": "|".join(batch),
+            "redirects": "true",
+        }
+
+        try:
+            data = client.get(params)
+        except requests.exceptions.RequestException as req_err:
+            logger.error(f"HTTP error while fetching revisions for {len(batch)} pages: {req_err}")
+            continue
+
+        query = data.get("query", {})
+        aliases = {item["from"]: item["to"] for item in query.get("normalized", []) + query.get("redirects", [])}
+        page_revids = {
+            page["title"]: page["revisions"][0]["revid"] for page in query.get("pages", []) if page.get("revisions")
+        }
+
+        for title in batch:
+            # follow title normalization, then redirects
+            resolved, seen = title, set()
+            while resolved in aliases and resolved not in seen:
+                seen.add(resolved)
+                resolved = aliases[resolved]
+            if resolved in page_revids:
+                revisions[title] = int(page_revids[resolved])
+
+    logger.info(f"Retrieved revision ids for {len(revisions)}/{len(page_titles)} pages")
+    return revisions
+
+
+def get_wikipedia_outline(page_title: str, client: WikipediaApiClient | None = None) -> dict[str, Any] | None:
+    """
+    Fetch the TOC and the raw wikitext of a Wikipedia page in a single API call.
+
+    Args:
+        page_title (str): Wikipedia page slug, e.g. "Real_Madrid_CF".
+        client (WikipediaApiClient | None): API client to use. Defaults to the shared client.
+
+    Returns:
+        dict[str, Any] | None: A dict with `sections` (TOC entries) and `wikitext`, or None on error.
+    """
+    client = client or get_default_client()
+    params = {"action": "parse", "format": "json", "prop": "sections|wikitext", "page": page_title, "redirects": "true"}
+
+    logger.info(f"Requesting outline for Wikipedia page: '{page_title}'")
+
+    try:
+        data = client.get(params)
+
+        if "parse" not in data or "sections" not in data["parse"]:
+            logger.warning(f"No 'sections' found for page '{page_title}'")
+            return None
+
+        return {"sections": list(data["parse"]["sections"]), "wikitext": data["parse"]["wikitext"]["*"]}
+
+    except requests.exceptions.RequestException as req_err:
+        logger.error(f"HTTP error while fetching outline for '{page_title}': {req_err}")
+    except (KeyError, ValueError) as parse_err:
+        logger.error(f"Parse error for outline of '{page_title}': {parse_err}")
+    except Exception as e:
+        logger.exception(f"Unexpected error while getting outline for '{page_title}': {e}")
+
+    return None
+
+
+def section_fingerprints(wikitext: str, sections: list) -> dict[str, str]:
+    """
+    Fingerprint every section of a page from its wikitext.
+
+    A section's fingerprint covers its heading and body up to the next section of the same or
+    a higher level, i.e. the same span a single-section API call renders. Sections transcluded
+    from templates (index "T-n") have no fingerprint and are always refetched.
+
+    Args:
+        wikitext (str): Raw wikitext of the page.
+        sections (list): TOC entries of the page.
+
+    Returns:
+        dict[str, str]: SHA-256 fingerprint per section index, in TOC order.
+    """
+    wikitext = WIKITEXT_COMMENT_PATTERN.sub("", wikitext)
+    headings = [(match.start(), len(match.group(1))) for match in WIKITEXT_HEADING_PATTERN.finditer(wikitext)]
+
+    fingerprints: dict[str, str] = {}
+    for sec in sections:
+        index = str(sec.get("index", ""))
+        if not index.isdigit() or int(index) > len(headings):
+            continue
+
+        position = int(index) - 1
+        start, level = headings[position]
+        end = next((offset for offset, lvl in headings[position + 1 :] if lvl <= level), len(wikitext))
+        fingerprints[index] = sha256_text(wikitext[start:end])
+
+    return fingerprints
+
+
+def section_heading(sec: dict[str, Any]) -> str:
+    """Return the heading line `render_wikipedia_page` writes for a TOC entry, e.g. "## History"."""
+    return f"{'#' * int(sec['level'])} {sec['line']}"
+
+
+def heading_keys(headings: list[str]) -> list[tuple[str, int]]:
+    """Key each heading by its text and its occurrence among identical headings, in order."""
+    seen: dict[str, int] = {}
+    keys = []
+    for heading in headings:
+        seen[heading] = seen.get(heading, 0) + 1
+        keys.append((heading, seen[heading]))
+    return keys
+
+
+def parse_rendered_sections(full_text: str) -> list[tuple[str, str]]:
+    """
+    Recover the headings and cleaned section texts from an article written by `render_wikipedia_page`.
+
+    Args:
+        full_text (str): The rendered article text.
+
+    Returns:
+        list[tuple[str, str]]: The heading line and text of each section, in TOC order.
+    """
+    _, _, body = full_text.partition("FULL CONTENT\n" + "=" * 80 + "\n\n")
+    sections: list[tuple[str, str]] = []
+    for block in body.split(SECTION_SEPARATOR)[:-1]:
+        heading, _, text = block.lstrip("\n").partition("\n\n")
+        sections.append((heading.rstrip("\n"), text))
+    return sections
+
+
+def refresh_wikipedia_page(
+    page_title: str,
+    out_path: str | None,
+    previous_fingerprints: dict[str, str] | None = None,
+    max_workers: int = 4,
+    client: WikipediaApiClient | None = None,
+    cleaner: HtmlCleaner = "bs4",
+    previous_text: str | None = None,
+) -> tuple[str, dict[str, str]] | None:
+    """
+    Re-crawl a page section by section, refetching only the sections whose wikitext changed.
+
+    A section is unchanged when its fingerprint was recorded on the last crawl; its text is
+    then copied from the previous article, matched by heading (and occurrence, for repeated
+    headings) rather than by position, so sections without a fingerprint, such as transcluded
+    ones, do not prevent reuse. The previous text is `previous_text` if given, else the file at `out_path`. Without previous
+    fingerprints every section is fetched.
+
+    Args:
+        page_title (str): Wikipedia page slug to extract.
+        out_path (str | None): Path of the article file to read from and write to. None skips writing.
+        previous_fingerprints (dict[str, str] | None): Section fingerprints recorded on the last crawl.
+        max_workers (int): Maximum number of sections fetched at the same time.
+        client (WikipediaApiClient | None): API client to use. Defaults to the shared client.
+        cleaner (HtmlCleaner): HTML cleaning backend.
+        previous_text (str | None): Previously crawled article text, used instead of reading `out_path`.
+
+    Returns:
+        tuple[str, dict[str, str]] | None: The full article text and the new section fingerprints,
+        or None if the page could not be fetched.
+    """
+    client = client or get_default_client()
+    outline = get_wikipedia_outline(page_title, client=client)
+    if not outline or not outline["sections"]:
+        return None
+
+    sections = outline["sections"]
+    fingerprints = section_fingerprints(outline["wikitext"], sections)
+
+    # Map fingerprints of the previous crawl to the section texts written back then
+    if previous_text is None and out_path and os.path.exists(out_path):
+        with open(out_path, encoding="utf-8") as f:
+            previous_text = f.read()
+
+    section_texts: list[str | None] = [None] * len(sections)
+    if previous_fingerprints and previous_text:
+        previous_sections = parse_rendered_sections(previous_text)
+        previous_keys = heading_keys([heading for heading, _ in previous_sections])
+        previous_by_heading = {key: text for key, (_, text) in zip(previous_keys, previous_sections, strict=True)}
+        current_keys = heading_keys([section_heading(sec) for sec in sections])
+        unchanged = set(previous_fingerprints.values())
+        for i, (sec, key) in enumerate(zip(sections, current_keys, strict=True)):
+            fingerprint = fingerprints.get(str(sec["index"]))
+            text = previous_by_heading.get(key)
+            if fingerprint in unchanged and text and text != NO_CONTENT:
+                section_texts[i] = text
+
+    stale = [i for i, text in enumerate(section_texts) if text is None]
+    logger.info(f"Refreshing '{page_title}': {len(stale)} changed, {len(sections) - len(stale)} unchanged sections")
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        fetched = executor.map(
+            lambda i: get_clean_section_content(page_title, sections[i]["index"], client=client, cleaner=cleaner), stale
+        )
+        for i, text in zip(stale, fetched, strict=True):
+            section_texts[i] = text
+
+    full_text = render_wikipedia_page(page_title, sections, section_texts)
+    if out_path:
+        save_wikipedia_page(full_text, out_path)
+    return full_text, fingerprints
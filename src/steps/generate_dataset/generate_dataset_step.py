@@ -2,11 +2,12 @@ import json
 import os
 
 from loguru import logger
-from openai import OpenAI
 from zenml import step
 
 from src.configs.settings import Settings, YamlConfig
-from src.infra.mongo_search_client import MongoVectorSearchClient
+from src.infra.instrumentation import get_instrumentation
+from src.infra.llm_gateway import get_llm_gateway
+from src.infra.retrievers import get_vector_retriever
 from src.steps.generate_dataset.questions import answer_query_with_context, questions
 
 
@@ -26,16 +27,20 @@ def generate_qa_dataset(config: YamlConfig) -> list[dict[str, str]]:
     logger.info(f"Output directory: {eval_dir}")
 
     settings = Settings()
-    openai_client = OpenAI(api_key=settings.openai_api_key)
-    vector_client = MongoVectorSearchClient(connection_uri=settings.mongodb_uri, db_name=settings.mongodb_database)
+    gateway = get_llm_gateway()
+    vector_client = get_vector_retriever(settings)
 
+    instrumentation = get_instrumentation()
     qa_pairs = []
-    for q in questions:
-        logger.info(f"Generating answer for question: {q}")
-        answer = answer_query_with_context(openai_client, vector_client, settings, q)
-        qa_pairs.append({"input": q, "expected_output": answer})
+    with instrumentation.stage("generate_qa_dataset"):
+        for q in questions:
+            logger.info(f"Generating answer for question: {q}")
+            answer = answer_query_with_context(gateway, vector_client, settings, q)
+            qa_pairs.append({"input": q, "expected_output": answer})
 
     vector_client.close_connection()
+    gateway.log_stats()
+    instrumentation.finish_run("generate_qa_dataset", settings.metrics_dir)
 
     # Save dataset
     output_path = os.path.join(eval_dir, eval_dataset)
@@ -1,8 +1,7 @@
-from typing import Any
-
 from src.configs.prompts import QUERY_PROMPT
 from src.configs.settings import Settings
-from src.infra.mongo_search_client import MongoVectorSearchClient
+from src.infra.llm_gateway import LLMGateway
+from src.infra.retrievers import VectorRetriever
 
 questions = [
     "When was Real Madrid CF founded?",
@@ -19,11 +18,12 @@ questions = [
 
 
 def answer_query_with_context(
-    openai_client: Any, vector_client: MongoVectorSearchClient, settings: Settings, query: str, limit: int = 3
+    gateway: LLMGateway, vector_client: VectorRetriever, settings: Settings, query: str, limit: int = 3
 ) -> str:
     # Get embedding for query
-    embedding_response = openai_client.embeddings.create(input=query, model=settings.openai_embedding_model)
-    query_vec = embedding_response.data[0].embedding
+    query_vec = gateway.embed(query, model=settings.openai_embedding_model, dimensions=settings.openai_embedding_dimensions)[
+        0
+    ]
 
     # Vector search in MongoDB
     results = vector_client.vector_search(
@@ -39,8 +39,4 @@ def answer_query_with_context(
     prompt = QUERY_PROMPT.format(context=context, query=query)
 
     # Get LLM response
-    response = openai_client.chat.completions.create(
-        model=settings.openai_llm_judge_model, messages=[{"role": "user", "content": prompt}]
-    )
-
-    return response.choices[0].message.content or ""
+    return gateway.chat(messages=[{"role": "user", "content": prompt}], model=settings.openai_llm_judge_model)
@@ -0,0 +1,166 @@
+import json
+import os
+import time
+import uuid
+from typing import Any, Final
+
+from loguru import logger
+from openai import OpenAI
+from pydantic import BaseModel
+
+from src.infra.instrumentation import get_instrumentation
+from src.infra.llm_cache import LLMResponseCache
+
+BATCH_ENDPOINT: Final = "/v1/chat/completions"
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+class BatchRequest(BaseModel):
+    custom_id: str
+    system_msg: str
+    user_msg: str
+    max_tokens: int
+
+    @property
+    def messages(self) -> list[dict[str, str]]:
+        return [{"role": "system", "content": self.system_msg}, {"role": "user", "content": self.user_msg}]
+
+
+class BatchJobRunner:
+    """
+    Run chat completion requests as one job of the OpenAI Batch API.
+
+    The requests are written to a JSONL job file, uploaded and submitted to the batch
+    endpoint; the job is then polled until it ends and its output file is read back.
+    Requests already in the LLM response cache are answered from it and not submitted,
+    and the results of a job are added to the cache, so batch and online runs share it.
+
+    Args:
+        client (OpenAI): OpenAI client, or any client with the same `files` and `batches` API.
+        model (str): Model answering the requests.
+        job_dir (str): Directory the job files are written to.
+        poll_interval (float): Interval between status checks of the job, in seconds.
+        temperature (float): Sampling temperature of every request.
+        cache (LLMResponseCache | None): Response cache to read and fill.
+    """
+
+    def __init__(
+        self,
+        client: OpenAI,
+        model: str,
+        job_dir: str,
+        poll_interval: float = 30.0,
+        temperature: float = 0.3,
+        cache: LLMResponseCache | None = None,
+    ):
+        self.client = client
+        self.model = model
+        self.job_dir = job_dir
+        self.poll_interval = poll_interval
+        self.temperature = temperature
+        self.cache = cache
+        self.jobs = 0
+
+    def _cache_key(self, request: BatchRequest) -> str:
+        return LLMResponseCache.request_key(self.model, request.messages, request.max_tokens, self.temperature)
+
+    def write_job_file(self, requests: list[BatchRequest], path: str) -> None:
+        """
+        Write requests to a JSONL file in the Batch API input format.
+
+        Args:
+            requests (list[BatchRequest]): Requests of the job.
+            path (str): Path of the job file.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            for request in requests:
+                body = {
+                    "model": self.model,
+                    "messages": request.messages,
+                    "max_tokens": request.max_tokens,
+                    "temperature": self.temperature,
+                }
+                line = {"custom_id": request.custom_id, "method": "POST", "url": BATCH_ENDPOINT, "body": body}
+                f.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+    @staticmethod
+    def parse_output(text: str) -> dict[str, dict[str, Any] | None]:
+        """
+        Read the responses of a Batch API output file.
+
+        Args:
+            text (str): Content of the output file, one JSON result per line.
+
+        Returns:
+            dict[str, dict[str, Any] | None]: Chat completion body per custom id, None for failed requests.
+        """
+        bodies: dict[str, dict[str, Any] | None] = {}
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            result = json.loads(line)
+            response = result.get("response") or {}
+            if response.get("status_code") == 200:
+                bodies[result["custom_id"]] = response["body"]
+            else:
+                logger.warning(f"Batch request {result['custom_id']} failed: {result.get('error')}")
+                bodies[result["custom_id"]] = None
+        return bodies
+
+    def run(self, requests: list[BatchRequest]) -> dict[str, str | None]:
+        """
+        Answer requests from the cache, submitting the others as one batch job and waiting for it.
+
+        Args:
+            requests (list[BatchRequest]): Requests with unique custom ids.
+
+        Returns:
+            dict[str, str | None]: Completion content per custom id, None for failed requests.
+        """
+        results: dict[str, str | None] = {}
+        pending: list[BatchRequest] = []
+        for request in requests:
+            cached = self.cache.get(self._cache_key(request)) if self.cache is not None else None
+            if cached is not None:
+                results[request.custom_id] = cached
+                get_instrumentation().record_cache_hit(self.model)
+            else:
+                pending.append(request)
+        if not pending:
+            return results
+
+        path = os.path.join(self.job_dir, f"summaries-{uuid.uuid4().hex[:12]}.jsonl")
+        self.write_job_file(pending, path)
+        with open(path, "rb") as f:
+            input_file = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(input_file_id=input_file.id, endpoint=BATCH_ENDPOINT, completion_window="24h")
+        self.jobs += 1
+        start = time.perf_counter()
+        logger.info(f"📦 Submitted batch {batch.id} with {len(pending)} requests ({len(results)} cached)")
+
+        while batch.status not in TERMINAL_STATUSES:
+            time.sleep(self.poll_interval)
+            batch = self.client.batches.retrieve(batch.id)
+            logger.info(f"⏳ Batch {batch.id}: {batch.status}")
+
+        if batch.status != "completed":
+            logger.error(f"❌ Batch {batch.id} ended with status {batch.status}")
+        # expired and cancelled batches still return the requests they completed
+        bodies = self.parse_output(self.client.files.content(batch.output_file_id).text) if batch.output_file_id else {}
+        # each request waited for the whole job
+        latency = time.perf_counter() - start
+
+        instrumentation = get_instrumentation()
+        for request in pending:
+            body = bodies.get(request.custom_id)
+            content = body["choices"][0]["message"]["content"] if body else None
+            results[request.custom_id] = content
+            if body:
+                usage = body.get("usage") or {}
+                instrumentation.record_call(
+                    self.model, latency, usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+                )
+            if content and self.cache is not None:
+                self.cache.put(self._cache_key(request), self.model, content)
+        return results
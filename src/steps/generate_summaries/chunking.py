@@ -0,0 +1,164 @@
+import re
+import threading
+from collections.abc import Callable
+from functools import lru_cache
+
+from loguru import logger
+
+from src.utils.hashing import sha256_text
+
+SECTION_HEADER_PATTERN = re.compile(r"^(?=#{1,6} )", re.MULTILINE)
+PARAGRAPH_PATTERN = re.compile(r"(?<=\n\n)")
+FALLBACK_ENCODING = "o200k_base"
+
+
+def rough_token_count(text: str) -> int:
+    """
+    Estimate the number of tokens in the given text.
+
+    This function uses a rough heuristic of approximately
+    1 token per 0.75 words to estimate token count.
+
+    Args:
+        text: The input text string to estimate tokens for.
+
+    Returns:
+        An integer representing the estimated number of tokens.
+    """
+
+    return int(len(text.split()) / 0.75)  #  ≈1 token per 0.75 words
+
+
+@lru_cache(maxsize=8)
+def get_token_counter(model: str) -> Callable[[str], int]:
+    """
+    Return a function counting tokens with the tokenizer of `model`.
+
+    Falls back to `rough_token_count` when the tokenizer cannot be loaded, e.g. when its
+    vocabulary cannot be downloaded.
+
+    Args:
+        model: OpenAI model name.
+
+    Returns:
+        A function returning the number of tokens of a text.
+    """
+    try:
+        import tiktoken
+
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding(FALLBACK_ENCODING)
+    except Exception as e:
+        logger.warning(f"Tokenizer for {model} unavailable ({e}), estimating tokens from word counts")
+        return rough_token_count
+
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+def split_sections(text: str) -> list[str]:
+    """
+    Split an article into sections at its Markdown `#` headers, keeping each header with its body.
+
+    Args:
+        text: Article text as written by the crawler.
+
+    Returns:
+        The non-empty sections, in order. Text before the first header is its own section.
+    """
+    return [section for section in SECTION_HEADER_PATTERN.split(text) if section.strip()]
+
+
+class SectionChunker:
+    """
+    Pack whole article sections into chunks that fit a token budget.
+
+    Sections are added greedily to the current chunk while it stays within `max_tokens`;
+    a section that does not fit on its own is split into paragraphs, then into word windows.
+    Token counts are cached per section, so the same article summarized with several prompt
+    variants is only tokenized once.
+
+    Args:
+        max_tokens: Token budget of a chunk.
+        count_tokens: Function returning the number of tokens of a text.
+    """
+
+    def __init__(self, max_tokens: int, count_tokens: Callable[[str], int]):
+        self.max_tokens = max_tokens
+        self.count_tokens = count_tokens
+        self._token_counts: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def tokens(self, text: str) -> int:
+        """Return the cached token count of a piece of text."""
+        key = sha256_text(text)
+        with self._lock:
+            count = self._token_counts.get(key)
+        if count is None:
+            count = self.count_tokens(text)
+            with self._lock:
+                self._token_counts[key] = count
+        return count
+
+    def _units(self, text: str) -> list[str]:
+        """Split text into sections, breaking sections over the budget into paragraphs, then word windows."""
+        units: list[str] = []
+        for section in split_sections(text):
+            if self.tokens(section) <= self.max_tokens:
+                units.append(section)
+                continue
+
+            for paragraph in PARAGRAPH_PATTERN.split(section):
+                if self.tokens(paragraph) <= self.max_tokens:
+                    units.append(paragraph)
+                    continue
+
+                units += self._word_windows(paragraph)
+        return units
+
+    def _word_windows(self, text: str) -> list[str]:
+        """Cut an oversized paragraph into word windows sized from its token density, halving any that still overflow."""
+        words = text.split()
+        window = max(1, int(len(words) * self.max_tokens / self.tokens(text) * 0.9))
+        windows: list[str] = []
+        for i in range(0, len(words), window):
+            piece = " ".join(words[i : i + window]) + " "
+            if self.tokens(piece) > self.max_tokens and window > 1:
+                middle = i + window // 2
+                windows += self._word_windows(" ".join(words[i:middle]))
+                windows += self._word_windows(" ".join(words[middle : i + window]))
+            else:
+                windows.append(piece)
+        return windows
+
+    def chunk(self, text: str) -> list[str]:
+        """
+        Split an article into chunks of whole sections within the token budget.
+
+        Sections are only broken up when they exceed the budget on their own; their pieces
+        are then packed like sections, so a chunk can end with the start of a long section.
+
+        Args:
+            text: Article text with `#` section headers.
+
+        Returns:
+            The chunks, in article order. A text within the budget is returned as one chunk.
+        """
+        if self.tokens(text) <= self.max_tokens:
+            return [text]
+
+        chunks: list[str] = []
+        current: list[str] = []
+        current_tokens = 0
+        for unit in self._units(text):
+            unit_tokens = self.tokens(unit)
+            if current and current_tokens + unit_tokens > self.max_tokens:
+                chunks.append("".join(current))
+                current, current_tokens = [], 0
+            current.append(unit)
+            current_tokens += unit_tokens
+
+        if current:
+            chunks.append("".join(current))
+        return chunks
@@ -1,61 +1,392 @@
 import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Any
 
 from loguru import logger
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
+from pymongo.collection import Collection
 from zenml import step
 
 from src.configs.prompts import SUMMARY_VARIANTS
-from src.steps.generate_summaries.helpers import summarize_content
+from src.configs.settings import Settings, SummaryMode
+from src.infra.instrumentation import get_instrumentation
+from src.infra.llm_gateway import get_llm_gateway
+from src.steps.generate_summaries.batch import BatchJobRunner, BatchRequest
+from src.steps.generate_summaries.helpers import get_summarizer, summarize_content
+from src.steps.generate_summaries.map_reduce import (
+    COMBINE_PROMPT,
+    COMBINE_SYSTEM_MSG,
+    MAP_PROMPT,
+    MAP_SYSTEM_MSG,
+    PARTIAL_SEPARATOR,
+    REDUCE_SYSTEM_MSG,
+    MapReduceSummarizer,
+)
+from src.utils.hashing import fingerprint
 
+SUMMARY_PROJECTION = {"_id": 1, "team": 1, "content": 1, "content_hash": 1, "summaries": 1, "summaries_content_hash": 1}
 
-@step(enable_cache=False)
+
+def summaries_are_stale(doc: dict[str, Any]) -> bool:
+    """
+    Return whether a document's summaries were written for an older version of its content.
+
+    Summaries written before content hashes were tracked are considered current.
+
+    Args:
+        doc (dict[str, Any]): Team document with `content_hash` and `summaries_content_hash`.
+
+    Returns:
+        bool: True if the summaries must be regenerated.
+    """
+    summarized_hash = doc.get("summaries_content_hash")
+    return summarized_hash is not None and summarized_hash != doc.get("content_hash")
+
+
+def plan_summaries(d: dict[str, Any]) -> tuple[dict[str, str], list[str]]:
+    """
+    Decide which summaries of a team document to keep and which variants to (re)write.
+
+    Args:
+        d (dict[str, Any]): Team document, projected with `SUMMARY_PROJECTION`.
+
+    Returns:
+        tuple[dict[str, str], list[str]]: The summaries to keep and the variants to write.
+    """
+    team = d["team"]
+    existing_summaries = d.get("summaries", {})
+
+    if not d["content"].strip():
+        logger.warning(f"⚠️ Skipping empty content for {team}")
+        return existing_summaries.copy(), []
+
+    stale = summaries_are_stale(d)
+    if stale:
+        logger.info(f"🔄 Content of {team} changed, regenerating its summaries")
+
+    summaries = {} if stale else existing_summaries.copy()  # Start with current summaries
+    variants = []
+    for variant in SUMMARY_VARIANTS:
+        existing = summaries.get(variant)
+        if existing and existing.strip():
+            logger.info(f"✅ Skipping existing summary for {team} [{variant}]")
+        else:
+            variants.append(variant)
+    return summaries, variants
+
+
+def summarize_variant(d: dict[str, Any], variant: str) -> str | None:
+    """
+    Write one summary variant of a team document.
+
+    Args:
+        d (dict[str, Any]): Team document, projected with `SUMMARY_PROJECTION`.
+        variant (str): Name of the summary variant in `SUMMARY_VARIANTS`.
+
+    Returns:
+        str | None: The summary, or None if summarization failed.
+    """
+    config = SUMMARY_VARIANTS[variant]
+    logger.info(f"📝 Summarizing {d['team']} [{variant}] (len={len(d['content'])} chars)")
+    return summarize_content(d["content"], d["team"], config["prompt"], config["max_tokens"])
+
+
+def summaries_update(d: dict[str, Any], summaries: dict[str, str]) -> dict[str, Any] | None:
+    """
+    Build the update saving the summaries of a team document with the content hash they were written for.
+
+    Args:
+        d (dict[str, Any]): Team document, projected with `SUMMARY_PROJECTION`.
+        summaries (dict[str, str]): All summaries of the document.
+
+    Returns:
+        dict[str, Any] | None: The update document, or None if nothing changed.
+    """
+    content_hash = d.get("content_hash")
+    if summaries != d.get("summaries", {}) or (content_hash and d.get("summaries_content_hash") != content_hash):
+        return {"$set": {"summaries": summaries, "summaries_content_hash": content_hash}}
+    return None
+
+
+def save_summaries(coll: Collection[dict[str, Any]], d: dict[str, Any], summaries: dict[str, str]) -> None:
+    """
+    Save the summaries of a team document with the content hash they were written for, if anything changed.
+
+    Args:
+        coll (Collection): Collection containing team content.
+        d (dict[str, Any]): Team document, projected with `SUMMARY_PROJECTION`.
+        summaries (dict[str, str]): All summaries of the document.
+    """
+    if update := summaries_update(d, summaries):
+        coll.update_one({"_id": d["_id"]}, update)
+        logger.info(f"📥 Updated summaries for {d['team']}")
+
+
+def summarize_document(coll: Collection[dict[str, Any]], d: dict[str, Any]) -> list[str]:
+    """
+    Write the missing summaries of one team document, or all of them if its content changed.
+
+    The summaries are saved together with the content hash they were written for.
+
+    Args:
+        coll (Collection): Collection containing team content.
+        d (dict[str, Any]): Team document, projected with `SUMMARY_PROJECTION`.
+
+    Returns:
+        list[str]: Summary variants that were (re)written.
+    """
+    summaries, variants = plan_summaries(d)
+    written: list[str] = []
+
+    for variant in variants:
+        summary = summarize_variant(d, variant)
+        if summary:
+            summaries[variant] = summary
+            written.append(variant)
+            time.sleep(0.2)
+
+    save_summaries(coll, d, summaries)
+    return written
+
+
+def summarize_documents_concurrently(coll: Collection[dict[str, Any]], docs: list[dict[str, Any]], max_workers: int) -> int:
+    """
+    Summarize documents with every (document, variant) pair running in a worker pool.
+
+    Each document is saved as soon as its last variant completes, so an interrupted run
+    only redoes the documents that were in flight.
+
+    Args:
+        coll (Collection): Collection containing team content.
+        docs (list[dict[str, Any]]): Team documents, projected with `SUMMARY_PROJECTION`.
+        max_workers (int): Number of summaries written in parallel.
+
+    Returns:
+        int: Number of documents saved with new summaries.
+    """
+    plans: dict[Any, tuple[dict[str, Any], dict[str, str]]] = {}
+    remaining: dict[Any, int] = {}
+    saved = 0
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures: dict[Future[str | None], tuple[Any, str]] = {}
+        for d in docs:
+            summaries, variants = plan_summaries(d)
+            if not variants:
+                save_summaries(coll, d, summaries)
+                continue
+
+            plans[d["_id"]] = (d, summaries)
+            remaining[d["_id"]] = len(variants)
+            for variant in variants:
+                futures[executor.submit(summarize_variant, d, variant)] = (d["_id"], variant)
+
+        for future in as_completed(futures):
+            doc_id, variant = futures[future]
+            d, summaries = plans[doc_id]
+            try:
+                summary = future.result()
+            except Exception as e:
+                logger.error(f"❌ Failed to summarize {d['team']} [{variant}]: {e}")
+                summary = None
+
+            if summary:
+                summaries[variant] = summary
+
+            remaining[doc_id] -= 1
+            if remaining[doc_id] == 0:
+                save_summaries(coll, d, summaries)
+                saved += 1
+
+    return saved
+
+
+def summarize_documents_in_batch(
+    coll: Collection[dict[str, Any]], docs: list[dict[str, Any]], runner: BatchJobRunner, summarizer: MapReduceSummarizer
+) -> int:
+    """
+    Summarize documents with batch jobs, one per map-reduce stage, and save the summaries in bulk.
+
+    The first job holds the direct summaries of articles within the chunk budget and the
+    chunk summaries of longer ones; chunk summaries are shared by all variants of an article,
+    as in the online map stage. Partials that overflow the budget are combined in further
+    jobs, and a last job writes the variant summaries of the long articles.
+
+    Args:
+        coll (Collection): Collection containing team content.
+        docs (list[dict[str, Any]]): Team documents, projected with `SUMMARY_PROJECTION`.
+        runner (BatchJobRunner): Runner submitting the jobs.
+        summarizer (MapReduceSummarizer): Summarizer whose chunker and map settings are used.
+
+    Returns:
+        int: Number of documents saved with new summaries.
+    """
+    plans: list[tuple[dict[str, Any], dict[str, str], list[str]]] = [(d, *plan_summaries(d)) for d in docs]
+
+    def final_request(n: int, variant: str, content: str) -> BatchRequest:
+        d = plans[n][0]
+        config = SUMMARY_VARIANTS[variant]
+        return BatchRequest(
+            custom_id=f"{n}/{variant}",
+            system_msg=REDUCE_SYSTEM_MSG,
+            user_msg=config["prompt"].format(team=d["team"], content=content),
+            max_tokens=config["max_tokens"],
+        )
+
+    # first job: direct summaries of short articles, chunk summaries of long ones
+    requests: list[BatchRequest] = []
+    chunked: dict[int, list[str]] = {}
+    for n, (d, _, variants) in enumerate(plans):
+        if not variants:
+            continue
+        chunks = summarizer.chunker.chunk(d["content"])
+        if len(chunks) == 1:
+            requests += [final_request(n, variant, chunks[0]) for variant in variants]
+            continue
+        chunked[n] = [f"{n}/map/{i}" for i in range(len(chunks))]
+        requests += [
+            BatchRequest(
+                custom_id=custom_id,
+                system_msg=MAP_SYSTEM_MSG,
+                user_msg=MAP_PROMPT.format(team=d["team"], content=chunk),
+                max_tokens=summarizer.map_max_tokens,
+            )
+            for custom_id, chunk in zip(chunked[n], chunks, strict=True)
+        ]
+    results = runner.run(requests)
+    partials = {n: [p for custom_id in ids if (p := results.get(custom_id))] for n, ids in chunked.items()}
+
+    # combine jobs, until the partials of every long article fit the budget
+    level = 0
+    while overflowing := [n for n, parts in partials.items() if summarizer.overflows(parts)]:
+        level += 1
+        combine_ids: dict[int, list[str]] = {}
+        requests = []
+        for n in overflowing:
+            groups = summarizer.group(partials[n])
+            combine_ids[n] = [f"{n}/combine{level}/{i}" for i in range(len(groups))]
+            requests += [
+                BatchRequest(
+                    custom_id=custom_id,
+                    system_msg=COMBINE_SYSTEM_MSG,
+                    user_msg=COMBINE_PROMPT.format(team=plans[n][0]["team"], content=PARTIAL_SEPARATOR.join(group)),
+                    max_tokens=summarizer.map_max_tokens,
+                )
+                for custom_id, group in zip(combine_ids[n], groups, strict=True)
+            ]
+        combined = runner.run(requests)
+        for n, ids in combine_ids.items():
+            partials[n] = [p for custom_id in ids if (p := combined.get(custom_id))]
+
+    # last job: variant summaries of the long articles
+    requests = [
+        final_request(n, variant, PARTIAL_SEPARATOR.join(parts))
+        for n, parts in partials.items()
+        if parts
+        for variant in plans[n][2]
+    ]
+    results |= runner.run(requests)
+
+    operations = []
+    for n, (d, summaries, variants) in enumerate(plans):
+        for variant in variants:
+            if summary := results.get(f"{n}/{variant}"):
+                summaries[variant] = summary
+        if update := summaries_update(d, summaries):
+            operations.append(UpdateOne({"_id": d["_id"]}, update))
+
+    if operations:
+        coll.bulk_write(operations, ordered=False)
+    logger.success(f"📥 Saved summaries of {len(operations)} documents from {runner.jobs} batch jobs")
+    return len(operations)
+
+
+def summarize_cache_key(mongodb_uri: str, mongodb_database: str, mongodb_collection: str, llm_model: str) -> str:
+    """
+    Fingerprint the inputs of a summarization run, used as the ZenML cache key of `summarize_step`.
+
+    The key covers the prompt templates, the model name and the content hash of every
+    document together with the summary variants it already has, read with one projected query.
+
+    Args:
+        mongodb_uri (str): MongoDB connection URI.
+        mongodb_database (str): Database name.
+        mongodb_collection (str): Collection name containing team content.
+        llm_model (str): Model used to write the summaries.
+
+    Returns:
+        str: The cache key.
+    """
+    mongo: MongoClient = MongoClient(mongodb_uri)
+    coll = mongo[mongodb_database][mongodb_collection]
+    try:
+        documents = sorted(
+            (d["team"], d.get("content_hash"), d.get("summaries_content_hash"), sorted(d.get("summaries", {})))
+            for d in coll.find({}, {"_id": 0, "team": 1, "content_hash": 1, "summaries": 1, "summaries_content_hash": 1})
+        )
+    finally:
+        mongo.close()
+
+    if any(content_hash is None for _, content_hash, _, _ in documents):
+        logger.warning("Some documents have no content hash, the summarization will not be cached")
+        return f"uncached-{uuid.uuid4().hex}"
+    return fingerprint(SUMMARY_VARIANTS, llm_model, mongodb_uri, mongodb_database, mongodb_collection, documents)
+
+
+@step(enable_cache=True)
 def summarize_step(
     mongodb_uri: str,
     mongodb_database: str,
     mongodb_collection: str,
+    cache_key: str = "",
+    max_workers: int = 1,
+    mode: SummaryMode = "online",
 ) -> None:
     """
     Summarize team content documents from a MongoDB collection.
     Updates each document by adding summaries to the 'summaries' field.
 
+    With `max_workers` above 1, summaries of all documents and variants are written
+    concurrently and each document is saved as soon as it is complete. In "batch" mode
+    the requests are submitted as OpenAI Batch API jobs instead, which trades latency for
+    throughput and cost on large backfills.
+
     Args:
         mongodb_uri (str): MongoDB connection URI.
         mongodb_database (str): Database name.
         mongodb_collection (str): Collection name containing team content.
+        cache_key (str): Fingerprint of the prompts, model and documents, from `summarize_cache_key`.
+        max_workers (int): Number of summaries written in parallel.
+        mode (SummaryMode): "online" for synchronous requests, "batch" for batch jobs.
     """
     mongo: MongoClient = MongoClient(mongodb_uri)
     coll = mongo[mongodb_database][mongodb_collection]
 
-    docs = list(coll.find({}, {"_id": 1, "team": 1, "content": 1, "summaries": 1}))
+    docs = list(coll.find({}, SUMMARY_PROJECTION))
     logger.info(f"📄 Documents fetched: {len(docs)}")
 
-    for d in docs:
-        team = d["team"]
-        content = d["content"]
-
-        if not content.strip():
-            logger.warning(f"⚠️ Skipping empty content for {team}")
-            continue
-
-        existing_summaries = d.get("summaries", {})
-        all_summaries = existing_summaries.copy()  # Start with current summaries
-
-        for variant, config in SUMMARY_VARIANTS.items():
-            existing = existing_summaries.get(variant)
-            if existing and existing.strip():
-                logger.info(f"✅ Skipping existing summary for {team} [{variant}]")
-                continue
-
-            logger.info(f"📝 Summarizing {team} [{variant}] (len={len(content)} chars)")
-            summary = summarize_content(content, team, config["prompt"], config["max_tokens"])
-
-            if summary:
-                all_summaries[variant] = summary
-                time.sleep(0.2)
-
-        # Update MongoDB document if there are any changes
-        if all_summaries != existing_summaries:
-            coll.update_one({"_id": d["_id"]}, {"$set": {"summaries": all_summaries}})
-            logger.info(f"📥 Updated summaries for {team}")
-
-    mongo.close()
+    settings = Settings()
+    instrumentation = get_instrumentation()
+    try:
+        with instrumentation.stage("summarize"):
+            if mode == "batch":
+                gateway = get_llm_gateway()
+                runner = BatchJobRunner(
+                    gateway.client,
+                    settings.openai_llm_model,
+                    settings.summary_batch_dir,
+                    poll_interval=settings.summary_batch_poll_seconds,
+                    cache=gateway.cache,
+                )
+                summarize_documents_in_batch(coll, docs, runner, get_summarizer())
+            elif max_workers > 1:
+                saved = summarize_documents_concurrently(coll, docs, max_workers)
+                logger.success(f"Summarized {saved} documents with {max_workers} workers")
+            else:
+                for d in docs:
+                    summarize_document(coll, d)
+    finally:
+        mongo.close()
+        get_llm_gateway().log_stats()
+        instrumentation.finish_run("summarize", settings.metrics_dir)
@@ -1,92 +1,111 @@
-from typing import cast
+import threading
 
-import openai
 from loguru import logger
 
 from src.configs.settings import Settings
+from src.infra.llm_gateway import get_llm_gateway
+from src.steps.generate_summaries.chunking import SectionChunker, get_token_counter
+from src.steps.generate_summaries.map_reduce import MapReduceSummarizer
 
+CHUNK_TOKEN_BUDGET = 100_000
+
+_chunkers: dict[tuple[str, int], SectionChunker] = {}
+_summarizer: MapReduceSummarizer | None = None
+_summarizer_lock = threading.Lock()
 
-def rough_token_count(text: str) -> int:
-    """
-    Estimate the number of tokens in the given text.
 
-    This function uses a rough heuristic of approximately
-    1 token per 0.75 words to estimate token count.
+def get_chunker(max_tokens: int = CHUNK_TOKEN_BUDGET, model: str | None = None) -> SectionChunker:
+    """
+    Return the shared chunker for a token budget and model, so its token count cache is reused.
 
     Args:
-        text: The input text string to estimate tokens for.
+        max_tokens: Token budget of a chunk.
+        model: Model whose tokenizer counts the tokens. Defaults to `openai_llm_model` from the settings.
 
     Returns:
-        An integer representing the estimated number of tokens.
+        The section chunker.
     """
+    model = model or Settings().openai_llm_model
+    key = (model, max_tokens)
+    if key not in _chunkers:
+        _chunkers[key] = SectionChunker(max_tokens, get_token_counter(model))
+    return _chunkers[key]
 
-    return int(len(text.split()) / 0.75)  #  ≈1 token per 0.75 words
 
-
-def split_into_chunks(text: str, max_tokens: int = 100_000) -> list[str]:
+def split_into_chunks(text: str, max_tokens: int = CHUNK_TOKEN_BUDGET) -> list[str]:
     """
     Split a large text into smaller chunks each within max token limit.
 
-    This helps to ensure that each chunk can be processed within
-    token limits of language models.
+    Tokens are counted with the model's tokenizer and whole `#` sections are packed into
+    each chunk, so chunks follow the structure of the article.
 
     Args:
         text: The input text to split into chunks.
         max_tokens: The maximum tokens allowed per chunk.
 
     Returns:
-        A list of string chunks, each approximately within the max_tokens limit.
+        A list of string chunks, each within the max_tokens limit.
     """
-    token_count = rough_token_count(text)
-    if token_count <= max_tokens:
-        return [text]
-
-    words = text.split()
-    chunk_len = int(len(words) * max_tokens / token_count)
-    return [" ".join(words[i : i + chunk_len]) for i in range(0, len(words), chunk_len)]
+    return get_chunker(max_tokens).chunk(text)
 
 
 def openai_chat(
     system_msg: str,
     user_msg: str,
-    model: str = "gpt-4o-mini",
+    model: str | None = None,
     max_tokens: int = 1_500,
     temperature: float = 0.3,
 ) -> str | None:
     """
-    Send a chat completion request to the OpenAI API with error handling.
+    Send a chat completion request through the shared LLM gateway with error handling.
+
+    Transient errors such as rate limits are retried by the gateway; an error that persists
+    after the retries is logged and turned into None.
 
     Args:
         system_msg: The system prompt to guide the model's behavior.
         user_msg: The user message content for the model to respond to.
-        model: The OpenAI model name to use (default "gpt-4o-mini").
+        model: The OpenAI model name to use. Defaults to `openai_llm_model` from the settings.
         max_tokens: Maximum tokens for the completion.
         temperature: Sampling temperature for response creativity.
 
     Returns:
         The content of the completion response as a string, or None on error.
     """
-    client = openai.OpenAI(api_key=Settings().openai_api_key)
     try:
-        resp = client.chat.completions.create(
-            model=model,
+        return get_llm_gateway().chat(
             messages=[{"role": "system", "content": system_msg}, {"role": "user", "content": user_msg}],
+            model=model,
             max_tokens=max_tokens,
             temperature=temperature,
         )
-        return cast(str, resp.choices[0].message.content)
     except Exception as err:
         logger.error(f"OpenAI error: {err}")
         return None
 
 
+def get_summarizer() -> MapReduceSummarizer:
+    """
+    Return the shared map-reduce summarizer, so chunk summaries are reused across summary variants.
+
+    Returns:
+        The map-reduce summarizer.
+    """
+    global _summarizer
+    with _summarizer_lock:
+        if _summarizer is None:
+            _summarizer = MapReduceSummarizer(openai_chat, get_chunker(), max_workers=Settings().summary_max_workers)
+        return _summarizer
+
+
 def summarize_content(content: str, team: str, prompt_template: str, max_tokens: int) -> str | None:
     """
     Summarize content about a team, handling large text by chunking.
 
     If content is small enough, it is summarized directly.
-    For larger content, it is split into chunks, each summarized,
-    and then the partial summaries are combined into a final summary.
+    For larger content, it is split into chunks that are summarized in parallel, and the
+    partial summaries are combined into the final summary with the variant's prompt.
+    Chunk summaries are cached, so the other variants of the same article reuse them.
 
     Args:
         content: The textual content to summarize.
@@ -101,29 +120,4 @@ def summarize_content(content: str, team: str, prompt_template: str, max_tokens:
         logger.warning(f"No content to summarize for team {team}")
         return None
 
-    chunks = split_into_chunks(content)
-    if len(chunks) == 1:
-        return openai_chat(
-            system_msg="You are an expert sports journalist.",
-            user_msg=prompt_template.format(team=team, content=chunks[0]),
-            max_tokens=max_tokens,
-        )
-
-    # Multi-chunk: summarize each, then combine
-    partials: list[str] = []
-    for idx, chunk in enumerate(chunks, 1):
-        logger.info(f"  ↳ Summarizing chunk {idx}/{len(chunks)} for {team}")
-        summary = openai_chat(
-            system_msg="You condense football Wikipedia sections.",
-            user_msg=f"Summarize the following part about {team}:\n\n{chunk}",
-            max_tokens=max_tokens,
-        )
-        if summary:
-            partials.append(summary)
-
-    combined = "\n\n".join(partials)
-    return openai_chat(
-        system_msg="You compile football summaries.",
-        user_msg="Combine the following parts into a cohesive summary:\n\n" + combined,
-        max_tokens=max_tokens,
-    )
+    return get_summarizer().summarize(content, team, prompt_template, max_tokens)
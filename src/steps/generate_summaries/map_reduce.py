@@ -0,0 +1,192 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from loguru import logger
+
+from src.steps.generate_summaries.chunking import SectionChunker
+from src.utils.hashing import sha256_text
+
+MAP_SYSTEM_MSG = "You condense football Wikipedia sections."
+MAP_PROMPT = "Summarize the following part about {team}:\n\n{content}"
+COMBINE_SYSTEM_MSG = "You compile football summaries."
+COMBINE_PROMPT = "Combine the following parts about {team} into a cohesive summary:\n\n{content}"
+REDUCE_SYSTEM_MSG = "You are an expert sports journalist."
+PARTIAL_SEPARATOR = "\n\n"
+
+# Called with system_msg, user_msg and max_tokens; returns None when the call fails
+ChatFunction = Callable[..., str | None]
+
+
+class MapReduceSummarizer:
+    """
+    Summarize long articles in a map stage shared by every summary variant and a variant-specific reduce.
+
+    The map stage summarizes each chunk of an article with a prompt that does not depend on
+    the variant, running the chunks in parallel. Its results are cached by prompt hash, so
+    the `default`, `recent` and `achievements` variants of an article pay for it once, even
+    when they run at the same time: a variant asking for a chunk already in flight waits
+    for it instead of requesting it again. Failed calls are not cached.
+
+    The reduce stage writes the variant's summary from the partial summaries. When the
+    partials together exceed the chunk budget, they are first combined in groups that fit,
+    level by level, and these intermediate combines are cached like the map stage.
+
+    Args:
+        chat (ChatFunction): Function sending one chat completion request.
+        chunker (SectionChunker): Chunker splitting articles and counting tokens.
+        map_max_tokens (int): Maximum tokens of a chunk summary.
+        max_workers (int): Number of chunks summarized in parallel per article.
+        max_entries (int): Number of cached partial summaries kept, least recently used first out.
+    """
+
+    def __init__(
+        self,
+        chat: ChatFunction,
+        chunker: SectionChunker,
+        map_max_tokens: int = 1_200,
+        max_workers: int = 4,
+        max_entries: int = 4_096,
+    ):
+        self.chat = chat
+        self.chunker = chunker
+        self.map_max_tokens = map_max_tokens
+        self.max_workers = max_workers
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._partials: OrderedDict[str, Future[str | None]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _complete(self, key: str, future: Future[str | None], system_msg: str, user_msg: str) -> None:
+        try:
+            summary = self.chat(system_msg=system_msg, user_msg=user_msg, max_tokens=self.map_max_tokens)
+        except Exception as e:
+            summary = None
+            logger.error(f"Partial summary failed: {e}")
+        if not summary:
+            # let a later call retry instead of caching the failure
+            with self._lock:
+                if self._partials.get(key) is future:
+                    del self._partials[key]
+        future.set_result(summary)
+
+    def _cached_calls(self, system_msg: str, user_msgs: list[str]) -> list[str]:
+        """Run variant-independent requests in parallel through the partial cache; return the successful results in order."""
+        futures: list[Future[str | None]] = []
+        pending: list[tuple[str, Future[str | None], str]] = []
+        with self._lock:
+            for user_msg in user_msgs:
+                key = sha256_text(system_msg + "\0" + user_msg)
+                future = self._partials.get(key)
+                if future is None:
+                    self.misses += 1
+                    future = Future()
+                    self._partials[key] = future
+                    pending.append((key, future, user_msg))
+                    if len(self._partials) > self.max_entries:
+                        self._partials.popitem(last=False)
+                else:
+                    self.hits += 1
+                    self._partials.move_to_end(key)
+                futures.append(future)
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(pending)))) as executor:
+                for key, future, user_msg in pending:
+                    executor.submit(self._complete, key, future, system_msg, user_msg)
+
+        results = [future.result() for future in futures]
+        return [result for result in results if result]
+
+    def map_chunks(self, chunks: list[str], team: str) -> list[str]:
+        """
+        Summarize the chunks of an article, reusing the summaries of chunks already seen.
+
+        Args:
+            chunks (list[str]): Chunks of the article.
+            team (str): Team the article is about.
+
+        Returns:
+            list[str]: Summaries of the chunks, in article order. Failed chunks are left out.
+        """
+        return self._cached_calls(MAP_SYSTEM_MSG, [MAP_PROMPT.format(team=team, content=chunk) for chunk in chunks])
+
+    def overflows(self, partials: list[str]) -> bool:
+        """Return whether partial summaries must be combined further before the final reduce."""
+        return len(partials) > 1 and self.chunker.tokens(PARTIAL_SEPARATOR.join(partials)) > self.chunker.max_tokens
+
+    def group(self, partials: list[str]) -> list[list[str]]:
+        """Pack consecutive partials into groups within the chunk budget, at least two per group."""
+        groups: list[list[str]] = []
+        current: list[str] = []
+        current_tokens = 0
+        for partial in partials:
+            tokens = self.chunker.tokens(partial)
+            if len(current) > 1 and current_tokens + tokens > self.chunker.max_tokens:
+                groups.append(current)
+                current, current_tokens = [], 0
+            current.append(partial)
+            current_tokens += tokens
+        if current:
+            groups.append(current)
+        return groups
+
+    def reduce(self, partials: list[str], team: str, prompt_template: str, max_tokens: int) -> str | None:
+        """
+        Write a summary variant from partial summaries, combining them hierarchically when they overflow.
+
+        Args:
+            partials (list[str]): Summaries of the chunks, in article order.
+            team (str): Team the article is about.
+            prompt_template (str): Prompt of the variant, with `{team}` and `{content}` placeholders.
+            max_tokens (int): Maximum tokens of the summary.
+
+        Returns:
+            str | None: The summary, or None if summarization failed.
+        """
+        level = 0
+        while self.overflows(partials):
+            level += 1
+            groups = self.group(partials)
+            logger.info(f"  ↳ Combining {len(partials)} partial summaries of {team} into {len(groups)} (level {level})")
+            partials = self._cached_calls(
+                COMBINE_SYSTEM_MSG,
+                [COMBINE_PROMPT.format(team=team, content=PARTIAL_SEPARATOR.join(group)) for group in groups],
+            )
+
+        if not partials:
+            return None
+        return self.chat(
+            system_msg=REDUCE_SYSTEM_MSG,
+            user_msg=prompt_template.format(team=team, content=PARTIAL_SEPARATOR.join(partials)),
+            max_tokens=max_tokens,
+        )
+
+    def summarize(self, content: str, team: str, prompt_template: str, max_tokens: int) -> str | None:
+        """
+        Summarize an article with the prompt of one variant.
+
+        An article within the chunk budget is summarized with a single request; a longer one
+        goes through the shared map stage and the variant's reduce.
+
+        Args:
+            content (str): Article text.
+            team (str): Team the article is about.
+            prompt_template (str): Prompt of the variant, with `{team}` and `{content}` placeholders.
+            max_tokens (int): Maximum tokens of the summary.
+
+        Returns:
+            str | None: The summary, or None if summarization failed.
+        """
+        chunks = self.chunker.chunk(content)
+        if len(chunks) == 1:
+            return self.chat(
+                system_msg=REDUCE_SYSTEM_MSG,
+                user_msg=prompt_template.format(team=team, content=chunks[0]),
+                max_tokens=max_tokens,
+            )
+
+        logger.info(f"  ↳ Summarizing {len(chunks)} chunks for {team}")
+        return self.reduce(self.map_chunks(chunks, team), team, prompt_template, max_tokens)
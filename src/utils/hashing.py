@@ -0,0 +1,40 @@
+import hashlib
+import json
+from typing import Any
+
+from pydantic import BaseModel
+
+
+def sha256_text(text: str) -> str:
+    """
+    Compute the hex SHA-256 digest of a string encoded as UTF-8.
+
+    Args:
+        text (str): The text to hash.
+
+    Returns:
+        str: The hexadecimal digest.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _to_jsonable(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Cannot fingerprint object of type {type(value).__name__}")
+
+
+def fingerprint(*parts: Any) -> str:
+    """
+    Compute a stable SHA-256 fingerprint of JSON-serializable values and pydantic models.
+
+    Dictionaries are serialized with sorted keys, so the fingerprint does not depend on
+    insertion order.
+
+    Args:
+        *parts (Any): Values to fingerprint.
+
+    Returns:
+        str: The hexadecimal digest.
+    """
+    return sha256_text(json.dumps(parts, sort_keys=True, ensure_ascii=False, default=_to_jsonable))
@@ -0,0 +1,164 @@
+import threading
+from collections.abc import Callable
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+
+from src.steps.generate_summaries import generate_summaries_step
+
+OPERATORS = {
+    "$gt": lambda a, b: a is not None and a > b,
+    "$gte": lambda a, b: a is not None and a >= b,
+    "$in": lambda a, b: a in b,
+}
+
+
+def matches(doc: dict[str, Any], query: dict[str, Any]) -> bool:
+    if "$or" in query:
+        return any(matches(doc, sub) for sub in query["$or"])
+    for field, condition in query.items():
+        if isinstance(condition, dict) and condition and all(op in OPERATORS for op in condition):
+            if not all(OPERATORS[op](doc.get(field), value) for op, value in condition.items()):
+                return False
+        elif doc.get(field) != condition:
+            return False
+    return True
+
+
+def project(doc: dict[str, Any], projection: dict[str, int] | None) -> dict[str, Any]:
+    if not projection:
+        return dict(doc)
+    return {field: doc[field] for field, keep in projection.items() if keep and field in doc}
+
+
+class FakeCursor(list[dict[str, Any]]):
+    def sort(self, field: str, direction: int = 1) -> "FakeCursor":
+        return FakeCursor(sorted(self, key=lambda doc: doc[field], reverse=direction < 0))
+
+
+class FakeCollection:
+    """In-memory stand-in for the subset of the pymongo Collection API used by the steps."""
+
+    def __init__(self, name: str = "fake") -> None:
+        self.name = name
+        self.docs: list[dict[str, Any]] = []
+        self.calls: list[str] = []
+
+    def find(self, query: dict[str, Any] | None = None, projection: dict[str, int] | None = None) -> FakeCursor:
+        self.calls.append("find")
+        return FakeCursor(project(doc, projection) for doc in self.docs if matches(doc, query or {}))
+
+    def find_one(self, query: dict[str, Any], projection: dict[str, int] | None = None) -> dict[str, Any] | None:
+        self.calls.append("find_one")
+        return next((project(doc, projection) for doc in self.docs if matches(doc, query)), None)
+
+    def insert_one(self, doc: dict[str, Any]) -> None:
+        self.calls.append("insert_one")
+        self.docs.append({"_id": len(self.docs) + 1} | doc)
+
+    def _update(self, query: dict[str, Any], update: dict[str, Any], upsert: bool = False) -> tuple[int, int]:
+        for doc in self.docs:
+            if matches(doc, query):
+                doc.update(update["$set"])
+                return 1, 0
+        if upsert:
+            self.docs.append({"_id": len(self.docs) + 1} | query | update["$set"])
+            return 0, 1
+        return 0, 0
+
+    def update_one(self, query: dict[str, Any], update: dict[str, Any], upsert: bool = False) -> None:
+        self.calls.append("update_one")
+        self._update(query, update, upsert)
+
+    def bulk_write(self, operations: list[Any], ordered: bool = True) -> SimpleNamespace:
+        self.calls.append("bulk_write")
+        matched = upserted = 0
+        for op in operations:
+            m, u = self._update(op._filter, op._doc, op._upsert)
+            matched, upserted = matched + m, upserted + u
+        return SimpleNamespace(matched_count=matched, upserted_count=upserted)
+
+
+@pytest.fixture
+def fake_collection() -> FakeCollection:
+    return FakeCollection()
+
+
+@pytest.fixture
+def make_collection() -> Callable[..., FakeCollection]:
+    """Return a factory of empty fake collections, for tests that need more than one."""
+    return FakeCollection
+
+
+@pytest.fixture
+def make_doc() -> Callable[[str, str], dict[str, Any]]:
+    """Return a factory of parsed team documents, as passed to the ingest."""
+
+    def make(team: str, content: str) -> dict[str, Any]:
+        return {"team": team, "source_url": f"https://en.wikipedia.org/wiki/{team}", "content": content, "metadata": {}}
+
+    return make
+
+
+@pytest.fixture
+def count_words() -> Callable[[str], int]:
+    """Return a token counter counting words, standing in for the model tokenizer."""
+    return lambda text: len(text.split())
+
+
+@pytest.fixture
+def make_article() -> Callable[[list[int]], str]:
+    """Return a factory of articles with one section of the given number of words each."""
+
+    def make(section_words: list[int]) -> str:
+        return "".join(f"## Section {i}\n\n" + " ".join(["word"] * n) + "\n\n" for i, n in enumerate(section_words))
+
+    return make
+
+
+@pytest.fixture
+def fake_gateway() -> MagicMock:
+    """Return a fake LLM gateway embedding each text as its length and recording the requests."""
+    gateway = MagicMock()
+    lock = threading.Lock()
+    requests: list[list[str]] = []
+
+    def embed(texts: list[str], model: str, tracked: bool, dimensions: int | None = None) -> list[list[float]]:
+        with lock:
+            requests.append(texts)
+        return [[float(len(text))] for text in texts]
+
+    gateway.embed.side_effect = embed
+    gateway.requests = requests
+    return gateway
+
+
+@pytest.fixture
+def raw_response() -> Callable[..., SimpleNamespace]:
+    """Return a factory of raw OpenAI chat completion responses, as read by the gateway."""
+
+    def make(content: str, headers: dict[str, str] | None = None) -> SimpleNamespace:
+        completion = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5),
+        )
+        return SimpleNamespace(headers=httpx.Headers(headers or {}), parse=lambda: completion)
+
+    return make
+
+
+@pytest.fixture
+def summarized(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Replace the LLM summarizer with a fake one and return the teams it was called for."""
+    calls: list[str] = []
+
+    def fake_summarize(content: str, team: str, prompt: str, max_tokens: int) -> str:
+        calls.append(team)
+        return f"summary of {content}"
+
+    monkeypatch.setattr(generate_summaries_step, "summarize_content", fake_summarize)
+    monkeypatch.setattr(generate_summaries_step.time, "sleep", lambda _: None)
+    return calls
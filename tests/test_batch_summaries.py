@@ -0,0 +1,98 @@
+import json
+from collections.abc import Callable
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, BinaryIO
+
+import pytest
+
+from src.configs.prompts import SUMMARY_VARIANTS
+from src.infra.llm_cache import LLMResponseCache
+from src.steps.generate_summaries import batch as batch_module
+from src.steps.generate_summaries.batch import BatchJobRunner, BatchRequest
+from src.steps.generate_summaries.chunking import SectionChunker
+from src.steps.generate_summaries.generate_summaries_step import summarize_documents_in_batch
+from src.steps.generate_summaries.map_reduce import MAP_SYSTEM_MSG, MapReduceSummarizer
+
+
+class FakeBatchClient:
+    """Stand-in for the OpenAI files and batches API, completing each job after one poll."""
+
+    def __init__(self) -> None:
+        self.files = SimpleNamespace(create=self._create_file, content=self._file_content)
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=self._retrieve_batch)
+        self.stored: dict[str, str] = {}
+        self.jobs: list[list[dict[str, Any]]] = []
+
+    def _create_file(self, file: BinaryIO, purpose: str) -> SimpleNamespace:
+        file_id = f"file-{len(self.stored)}"
+        self.stored[file_id] = file.read().decode("utf-8")
+        return SimpleNamespace(id=file_id)
+
+    def _file_content(self, file_id: str) -> SimpleNamespace:
+        return SimpleNamespace(text=self.stored[file_id])
+
+    def _create_batch(self, input_file_id: str, endpoint: str, completion_window: str) -> SimpleNamespace:
+        self.jobs.append([json.loads(line) for line in self.stored[input_file_id].splitlines()])
+        return SimpleNamespace(id=f"batch-{len(self.jobs) - 1}", status="validating", output_file_id=None)
+
+    def _retrieve_batch(self, batch_id: str) -> SimpleNamespace:
+        job = self.jobs[int(batch_id.split("-")[1])]
+        output = "\n".join(
+            json.dumps(
+                {
+                    "custom_id": line["custom_id"],
+                    "response": {
+                        "status_code": 200,
+                        "body": {"choices": [{"message": {"content": f"summary {line['custom_id']}"}}]},
+                    },
+                }
+            )
+            for line in job
+        )
+        output_id = f"output-{batch_id}"
+        self.stored[output_id] = output
+        return SimpleNamespace(id=batch_id, status="completed", output_file_id=output_id)
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(batch_module.time, "sleep", lambda seconds: None)
+
+
+def make_runner(tmp_path: Path, cache: LLMResponseCache | None = None) -> tuple[FakeBatchClient, BatchJobRunner]:
+    client = FakeBatchClient()
+    return client, BatchJobRunner(client, "gpt-4o-mini", str(tmp_path / "jobs"), cache=cache)  # type: ignore[arg-type]
+
+
+def test_batch_summaries_are_saved_in_bulk(
+    tmp_path: Path, fake_collection: Any, count_words: Callable[[str], int], make_article: Callable[[list[int]], str]
+) -> None:
+    collection = fake_collection
+    collection.insert_one({"team": "porto", "content": make_article([20]), "content_hash": "h1"})
+    collection.insert_one({"team": "benfica", "content": make_article([60, 60, 60]), "content_hash": "h2"})
+    summarizer = MapReduceSummarizer(lambda **_: None, SectionChunker(100, count_words))
+    client, runner = make_runner(tmp_path)
+
+    assert summarize_documents_in_batch(collection, collection.find({}), runner, summarizer) == 2
+
+    # one job for the short article and the chunks of the long one, one for the long article's variants
+    assert len(client.jobs) == 2
+    map_requests = [r for r in client.jobs[0] if r["body"]["messages"][0]["content"] == MAP_SYSTEM_MSG]
+    assert len(map_requests) == len(summarizer.chunker.chunk(make_article([60, 60, 60])))
+    assert len(client.jobs[1]) == len(SUMMARY_VARIANTS)
+    assert collection.calls.count("bulk_write") == 1 and "update_one" not in collection.calls
+    for doc in collection.docs:
+        assert set(doc["summaries"]) == set(SUMMARY_VARIANTS)
+        assert doc["summaries_content_hash"] == doc["content_hash"]
+
+
+def test_cached_requests_are_not_submitted(tmp_path: Path) -> None:
+    client, runner = make_runner(tmp_path, cache=LLMResponseCache(str(tmp_path / "cache.sqlite")))
+    requests = [BatchRequest(custom_id=str(i), system_msg="s", user_msg=f"part {i}", max_tokens=100) for i in range(3)]
+
+    first = runner.run(requests)
+    second = runner.run(requests)
+
+    assert first == second == {str(i): f"summary {i}" for i in range(3)}
+    assert len(client.jobs) == 1
@@ -0,0 +1,50 @@
+from collections.abc import Callable
+
+from src.steps.generate_summaries.chunking import SectionChunker, split_sections
+
+
+def test_sections_are_packed_whole_within_budget(
+    count_words: Callable[[str], int], make_article: Callable[[list[int]], str]
+) -> None:
+    article = make_article([30, 30, 30, 80])
+    chunks = SectionChunker(max_tokens=100, count_tokens=count_words).chunk(article)
+
+    assert "".join(chunks) == article
+    assert all(count_words(chunk) <= 100 for chunk in chunks)
+    # the first three sections fit together, the last one gets its own chunk
+    assert [chunk.count("## Section") for chunk in chunks] == [3, 1]
+    assert split_sections(chunks[0])[0].startswith("## Section 0")
+
+
+def test_oversized_sections_are_split_within_budget(
+    count_words: Callable[[str], int], make_article: Callable[[list[int]], str]
+) -> None:
+    article = make_article([10, 250, 10])
+    chunks = SectionChunker(max_tokens=100, count_tokens=count_words).chunk(article)
+
+    assert all(count_words(chunk) <= 100 for chunk in chunks)
+    assert sum(count_words(chunk) for chunk in chunks) == count_words(article)
+
+
+def test_short_text_is_one_chunk(count_words: Callable[[str], int], make_article: Callable[[list[int]], str]) -> None:
+    article = make_article([10, 10])
+    assert SectionChunker(max_tokens=100, count_tokens=count_words).chunk(article) == [article]
+
+
+def test_token_counts_are_cached_per_section(
+    count_words: Callable[[str], int], make_article: Callable[[list[int]], str]
+) -> None:
+    calls: list[str] = []
+
+    def counting(text: str) -> int:
+        calls.append(text)
+        return count_words(text)
+
+    chunker = SectionChunker(max_tokens=100, count_tokens=counting)
+    article = make_article([30, 30, 30, 80])
+    first = chunker.chunk(article)
+    n_calls = len(calls)
+
+    # summarizing the same article with another prompt variant does not tokenize it again
+    assert chunker.chunk(article) == first
+    assert len(calls) == n_calls
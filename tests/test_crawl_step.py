@@ -0,0 +1,144 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from src.configs.settings import CrawledDoc, Team, YamlConfig
+from src.steps.etl import crawl_step
+from src.steps.etl.rate_limiter import RateLimiter
+
+
+def make_config(tmp_path: Path, n_teams: int) -> YamlConfig:
+    teams = [
+        Team(name=f"team_{i}", url=f"https://en.wikipedia.org/wiki/Team_{i}", filename=f"team_{i}.md")
+        for i in range(n_teams)
+    ]
+    return YamlConfig(output_dir=str(tmp_path), eval_dir="", eval_dataset="", teams=teams)
+
+
+def make_doc(team: Team) -> CrawledDoc:
+    return CrawledDoc(
+        team=team.name, url=team.url, filename=team.filename, content="text", timestamp=datetime.now(UTC), metadata={}
+    )
+
+
+def test_iter_crawled_docs_crawls_one_batch_at_a_time(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    crawled: list[str] = []
+
+    def fake_crawl_team(team: Team, *args: Any) -> CrawledDoc:
+        crawled.append(team.name)
+        return make_doc(team)
+
+    monkeypatch.setattr(crawl_step, "crawl_team", fake_crawl_team)
+    docs = crawl_step.iter_crawled_docs(make_config(tmp_path, 5), batch_size=2)
+
+    assert next(docs).team == "team_0"
+    # the second batch is not submitted before the first one is consumed
+    assert set(crawled) <= {"team_0", "team_1"}
+
+    assert [doc.team for doc in docs] == ["team_1", "team_2", "team_3", "team_4"]
+    # the manifest is saved once the generator is exhausted
+    assert (tmp_path / ".crawl_manifest.json").exists()
+
+
+def test_crawl_cache_key_tracks_config_and_revisions(tmp_path: Path) -> None:
+    config = make_config(tmp_path, 2)
+    assert crawl_step.crawl_cache_key(config) == crawl_step.crawl_cache_key(config.model_copy(deep=True))
+
+    changed = config.model_copy(deep=True)
+    changed.crawler.extract_mode = "full_page"
+    assert crawl_step.crawl_cache_key(changed) != crawl_step.crawl_cache_key(config)
+
+    config.crawler.refresh_mode = "incremental"
+    key = crawl_step.crawl_cache_key(config, {"Team_0": 1, "Team_1": 2})
+    assert crawl_step.crawl_cache_key(config, {"Team_0": 1, "Team_1": 2}) == key
+    assert crawl_step.crawl_cache_key(config, {"Team_0": 1, "Team_1": 3}) != key
+    # missing revision ids disable the cache
+    assert crawl_step.crawl_cache_key(config, {"Team_0": 1}) != crawl_step.crawl_cache_key(config, {"Team_0": 1})
+
+    config.crawler.refresh_mode = "full"
+    assert crawl_step.crawl_cache_key(config) != crawl_step.crawl_cache_key(config)
+
+
+def test_crawl_cache_key_tracks_crawled_files(tmp_path: Path) -> None:
+    config = make_config(tmp_path, 2)
+    (tmp_path / "team_0.md").write_text("text", encoding="utf-8")
+    key = crawl_step.crawl_cache_key(config)
+
+    (tmp_path / "team_0.md").write_text("edited", encoding="utf-8")
+    edited_key = crawl_step.crawl_cache_key(config)
+    assert edited_key != key
+
+    # a deleted output is re-crawled even though skip_existing ignores revisions
+    (tmp_path / "team_0.md").unlink()
+    assert crawl_step.crawl_cache_key(config) not in {key, edited_key}
+
+
+def test_given_revisions_are_not_fetched_again(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    passed: list[dict[str, int]] = []
+
+    def fake_crawl_team(
+        team: Team, output_dir: str, crawler_config: Any, client: Any, manifest: Any, revisions: Any, store: Any
+    ) -> CrawledDoc:
+        passed.append(revisions)
+        return make_doc(team)
+
+    def fail(*args: Any, **kwargs: Any) -> dict[str, int]:
+        raise AssertionError("revisions fetched twice")
+
+    monkeypatch.setattr(crawl_step, "crawl_team", fake_crawl_team)
+    monkeypatch.setattr(crawl_step, "get_page_revisions", fail)
+    config = make_config(tmp_path, 2)
+    config.crawler.refresh_mode = "incremental"
+
+    revisions = {"Team_0": 1, "Team_1": 2}
+    assert len(list(crawl_step.iter_crawled_docs(config, revisions=revisions))) == 2
+    assert passed == [revisions, revisions]
+
+
+def test_parallel_crawl_keeps_config_order_and_skips_failing_teams(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    threads: set[str] = set()
+
+    def fake_crawl_team(team: Team, *args: Any) -> CrawledDoc:
+        threads.add(threading.current_thread().name)
+        # later teams tend to finish first
+        time.sleep(random.uniform(0, 0.02))
+        if team.name == "team_3":
+            raise RuntimeError("page gone")
+        return make_doc(team)
+
+    monkeypatch.setattr(crawl_step, "crawl_team", fake_crawl_team)
+    config = make_config(tmp_path, 8)
+    config.crawler.team_workers = 4
+
+    assert [doc.team for doc in crawl_step.iter_crawled_docs(config)] == [f"team_{i}" for i in range(8) if i != 3]
+    assert len(threads) > 1
+
+
+def test_rate_limiter_holds_rate_and_burst_across_threads() -> None:
+    rate, burst, calls = 20, 3, 13
+    limiter = RateLimiter(rate=rate, burst=burst)
+    granted: list[float] = []
+    lock = threading.Lock()
+
+    def acquire(_: int) -> None:
+        limiter.acquire()
+        with lock:
+            granted.append(time.monotonic())
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(acquire, range(calls)))
+    elapsed = [t - start for t in sorted(granted)]
+
+    # the burst is granted without waiting for a refill
+    assert elapsed[burst - 1] < 1 / rate
+    # then one token every 1/rate seconds, whatever the number of threads
+    for k, t in enumerate(elapsed):
+        assert t >= (k + 1 - burst) / rate - 0.005
+    assert elapsed[-1] < (calls - burst) / rate + 0.3
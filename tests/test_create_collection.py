@@ -0,0 +1,48 @@
+from unittest.mock import MagicMock
+
+from src.configs.settings import Settings
+from src.infra.create_collection import (
+    create_regular_indexes,
+    find_collection_scans,
+    find_missing_indexes,
+    get_index_models,
+)
+
+
+def test_find_collection_scans_in_nested_plans() -> None:
+    index_plan = {"queryPlanner": {"winningPlan": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}}}}
+    scan_plan = {"queryPlanner": {"winningPlan": {"queryPlan": {"stage": "OR", "inputStages": [{"stage": "COLLSCAN"}]}}}}
+
+    assert not find_collection_scans(index_plan)
+    assert find_collection_scans(scan_plan)
+
+
+def test_find_missing_indexes_compares_key_patterns() -> None:
+    settings = Settings()
+    models = get_index_models(settings)[settings.mongodb_collection]
+    collection = MagicMock()
+    collection.index_information.return_value = {
+        "_id_": {"key": [("_id", 1)]},
+        "legacy_name": {"key": [("team", 1), ("source_url", 1)]},
+    }
+
+    assert find_missing_indexes(collection, models) == ["content_hash"]
+
+
+def test_create_regular_indexes_skips_key_patterns_indexed_under_another_name() -> None:
+    settings = Settings()
+    models = get_index_models(settings)
+    collection = MagicMock()
+    collection.index_information.return_value = {
+        "_id_": {"key": [("_id", 1)]},
+        "legacy_name": {"key": [("team", 1), ("source_url", 1)]},
+        "team_1_summary_type_1": {"key": [("team", 1), ("summary_type", 1)]},
+    }
+    collection.create_indexes.side_effect = lambda created: [model.document["name"] for model in created]
+    db = MagicMock()
+    db.__getitem__.return_value = collection
+
+    create_regular_indexes(db, models)
+
+    collection.create_indexes.assert_called_once()
+    assert [model.document["name"] for model in collection.create_indexes.call_args.args[0]] == ["content_hash"]
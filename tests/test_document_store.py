@@ -0,0 +1,53 @@
+from pathlib import Path
+
+from src.steps.etl.document_store import DocumentStore
+
+TEXT = "# Real Madrid CF\n\nHistory\n\nReal Madrid was founded in 1902."
+
+
+def test_put_and_read_round_trip(tmp_path: Path) -> None:
+    store = DocumentStore(str(tmp_path))
+    content_hash = store.put("Real Madrid", TEXT, revid=42)
+
+    assert store.read(content_hash) == TEXT
+    with store.open(content_hash) as f:
+        assert f.readline() == "# Real Madrid CF\n"
+
+
+def test_unchanged_document_is_not_rewritten(tmp_path: Path) -> None:
+    store = DocumentStore(str(tmp_path))
+    content_hash = store.put("Real Madrid", TEXT)
+    blob = next(tmp_path.rglob("*.txt.gz"))
+    mtime = blob.stat().st_mtime_ns
+
+    assert store.put("Real Madrid", TEXT) == content_hash
+    assert blob.stat().st_mtime_ns == mtime
+    assert len(list(tmp_path.rglob("*.txt.gz"))) == 1
+
+
+def test_index_survives_reload(tmp_path: Path) -> None:
+    store = DocumentStore(str(tmp_path))
+    content_hash = store.put("Real Madrid", TEXT, revid=42)
+    store.save_index()
+
+    entry = DocumentStore(str(tmp_path)).get_entry("Real Madrid")
+    assert entry is not None
+    assert (entry.content_hash, entry.revid, entry.size) == (content_hash, 42, len(TEXT))
+
+
+def test_missing_or_corrupt_blob_is_a_cache_miss(tmp_path: Path) -> None:
+    store = DocumentStore(str(tmp_path))
+    store.put("Real Madrid", TEXT)
+    store.put("Barcelona", TEXT.replace("Real Madrid", "Barcelona"))
+    blobs = sorted(tmp_path.rglob("*.txt.gz"), key=lambda blob: blob.stat().st_mtime_ns)
+    blobs[0].unlink()
+    blobs[1].write_bytes(b"not gzip")
+
+    assert store.read_team("Real Madrid") is None
+    assert store.read_team("Barcelona") is None
+    assert store.get_entry("Real Madrid") is None and store.get_entry("Barcelona") is None
+
+    # the re-crawled document is written again
+    content_hash = store.put("Barcelona", TEXT)
+    assert store.read_team("Barcelona") == TEXT
+    assert store.get_entry("Barcelona").content_hash == content_hash  # type: ignore[union-attr]
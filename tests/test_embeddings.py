@@ -0,0 +1,23 @@
+from collections.abc import Callable
+from unittest.mock import MagicMock
+
+from src.infra.embeddings import BatchEmbedder
+
+
+def test_batches_respect_input_and_token_limits(fake_gateway: MagicMock, count_words: Callable[[str], int]) -> None:
+    embedder = BatchEmbedder(fake_gateway, "model", max_batch_inputs=3, max_batch_tokens=10, count_tokens=count_words)
+    texts = ["a b c", "d e f", "g", "h", "i j k l m n o p", "q r"]
+
+    # a batch closes at 3 inputs or before it would exceed 10 tokens
+    assert embedder.batches(texts) == [[0, 1, 2], [3, 4], [5]]
+
+
+def test_embeddings_are_mapped_back_by_index(fake_gateway: MagicMock, count_words: Callable[[str], int]) -> None:
+    gateway = fake_gateway
+    embedder = BatchEmbedder(gateway, "model", max_batch_inputs=2, max_workers=4, count_tokens=count_words)
+    texts = ["porto", "benfica", "real madrid", "porto", "inter"]
+
+    assert embedder.embed(texts) == [[5.0], [7.0], [11.0], [5.0], [5.0]]
+    # duplicates are embedded once, in two-input requests
+    assert sorted(len(request) for request in gateway.requests) == [2, 2]
+    assert embedder.embed([]) == []
@@ -0,0 +1,53 @@
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+
+from src.configs.prompts import SUMMARY_VARIANTS
+from src.steps.generate_summaries import generate_summaries_step
+from src.steps.generate_summaries.generate_summaries_step import summarize_document, summarize_documents_concurrently
+
+
+def add_team(collection: Any, team: str, **fields: Any) -> None:
+    collection.insert_one({"team": team, "content": f"{team} history", "content_hash": f"hash-{team}"} | fields)
+
+
+def test_concurrent_summaries_match_sequential(summarized: list[str], make_collection: Callable[..., Any]) -> None:
+    sequential, concurrent = make_collection(), make_collection()
+    for collection in (sequential, concurrent):
+        for team in ("real_madrid", "porto", "benfica"):
+            add_team(collection, team)
+
+    for d in sequential.find({}):
+        summarize_document(sequential, d)
+    assert summarize_documents_concurrently(concurrent, concurrent.find({}), max_workers=4) == 3
+
+    assert concurrent.docs == sequential.docs
+    assert len(summarized) == 2 * 3 * len(SUMMARY_VARIANTS)
+
+
+def test_finished_documents_are_not_redone(
+    summarized: list[str], fake_collection: Any, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    collection = fake_collection
+    add_team(collection, "real_madrid")
+    add_team(collection, "porto")
+
+    def flaky_summarize(content: str, team: str, prompt: str, max_tokens: int) -> str:
+        if team == "porto":
+            raise RuntimeError("rate limited")
+        summarized.append(team)
+        return "summary"
+
+    monkeypatch.setattr(generate_summaries_step, "summarize_content", flaky_summarize)
+    summarize_documents_concurrently(collection, collection.find({}), max_workers=2)
+
+    summarized.clear()
+    monkeypatch.undo()
+    monkeypatch.setattr(
+        generate_summaries_step, "summarize_content", lambda content, team, *_: summarized.append(team) or "s"
+    )
+    summarize_documents_concurrently(collection, collection.find({}), max_workers=2)
+
+    # real_madrid was saved by the first run, only porto's summaries are written again
+    assert set(summarized) == {"porto"}
@@ -0,0 +1,35 @@
+import pytest
+
+from src.steps.etl.html_cleaner import clean_html_bs4, clean_html_streaming, get_html_cleaner
+
+SECTION_HTML = [
+    '<div class="mw-heading mw-heading2"><h2 id="History">History</h2><span class="mw-editsection">'
+    '[<a href="/edit">edit</a>]</span></div><p>Founded in <a href="/wiki/1902">1902</a>.'
+    '<sup class="reference"><a href="#cite-1">[1]</a></sup> Champions.</p>',
+    "<style>.hatnote{font-style:italic}</style><script>var x = '<p>';</script><p>Only text</p>",
+    "<p>a<!--comment-->b</p><p>c<br>d</br>e<br/>f</p><ruby>漢<rt>kan</rt></ruby>",
+    "<table><tr><th>Season</th><td>2019&#160;&ndash;&#160;20</td><td>&foo; &#150; &copy</td></tr></table>",
+    "<sup class='reference extra'><sup>nested</sup>dropped</sup>kept<sup>2</sup>",
+    "<p>unclosed <b>bold <i>italic</p> after</b>\n\n  spaced   out\ttext <![CDATA[raw]]>",
+    # regressions found by comparing both cleaners on randomized fragments
+    '<sup class="reference" class=reference/>kept</sup> after',
+    '<sup class="reference"class>kept',
+    "<br><br/>a</br>b <hr><hr/>c</hr>&gt; <img><img/>d</img>&#x41;",
+    "<i>a<sup class='reference'><script>x</script><sup>b</sup></sup>c</i>&#x110000;&#128;&nbsp&amp;amp;",
+]
+
+
+@pytest.mark.parametrize("html", SECTION_HTML)
+def test_streaming_cleaner_matches_bs4(html: str) -> None:
+    assert clean_html_streaming(html) == clean_html_bs4(html)
+
+
+def test_cleaner_drops_references_and_keeps_link_text() -> None:
+    text = clean_html_streaming(SECTION_HTML[0])
+
+    assert text == "History [ edit ] Founded in 1902 . Champions."
+
+
+def test_unknown_cleaner_raises() -> None:
+    with pytest.raises(ValueError):
+        get_html_cleaner("lxml")
@@ -0,0 +1,44 @@
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.steps.etl.http_cache import HttpCache, HttpCacheMiss
+from src.steps.etl.wikipedia_client import WikipediaApiClient
+
+PARAMS = {"action": "parse", "format": "json", "prop": "sections", "page": "Real_Madrid_CF"}
+BODY = {"parse": {"sections": [{"index": "1", "level": "2", "line": "History"}]}}
+
+
+def make_client(cache: HttpCache) -> WikipediaApiClient:
+    client = WikipediaApiClient(cache=cache)
+    response = MagicMock()
+    response.json.return_value = BODY
+    client.session.get = MagicMock(return_value=response)
+    return client
+
+
+def test_record_then_replay_offline(tmp_path: Path) -> None:
+    recorder = make_client(HttpCache(str(tmp_path), mode="record"))
+    assert recorder.get(PARAMS) == BODY
+    assert recorder.session.get.call_count == 1
+    assert list(tmp_path.rglob("*.json.gz"))
+
+    replayer = make_client(HttpCache(str(tmp_path), mode="replay"))
+    # parameter order does not matter for the cache key
+    assert replayer.get(dict(reversed(PARAMS.items()))) == BODY
+    replayer.session.get.assert_not_called()
+
+
+def test_replay_miss_raises(tmp_path: Path) -> None:
+    client = make_client(HttpCache(str(tmp_path), mode="replay"))
+
+    with pytest.raises(HttpCacheMiss):
+        client.get(PARAMS)
+
+
+def test_passthrough_does_not_write(tmp_path: Path) -> None:
+    client = make_client(HttpCache(str(tmp_path), mode="passthrough"))
+
+    assert client.get(PARAMS) == BODY
+    assert not list(tmp_path.rglob("*.json.gz"))
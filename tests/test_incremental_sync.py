@@ -0,0 +1,73 @@
+from collections.abc import Callable
+from datetime import UTC, datetime
+from typing import Any
+
+import pytest
+
+from src.configs.prompts import SUMMARY_VARIANTS
+from src.infra import incremental_sync
+from src.infra.incremental_sync import IncrementalSync
+from src.steps.etl.mongo_ingest_step import ingest_bulk
+
+QUERY_FIELDS = ["team", "source_url"]
+
+
+def test_only_the_changed_document_is_resummarized_and_reembedded(
+    summarized: list[str], make_collection: Callable[..., Any], make_doc: Callable[[str, str], dict[str, Any]]
+) -> None:
+    teams, vectors = make_collection("teams"), make_collection("summary_vectors")
+    embedded: list[tuple[str, list[str]]] = []
+
+    def fake_embed(collection: Any, doc: dict[str, Any], summary_types: list[str]) -> int:
+        embedded.append((doc["team"], summary_types))
+        return len(summary_types)
+
+    ingest_bulk(teams, [make_doc("real_madrid", "v1"), make_doc("porto", "v1")], QUERY_FIELDS)
+    sync = IncrementalSync(teams, vectors, embed=fake_embed)
+
+    assert sync.catch_up() == 2
+    assert sorted(team for team, _ in embedded) == ["porto", "real_madrid"]
+
+    summarized.clear()
+    embedded.clear()
+    sync.watermark = datetime.now(UTC)
+    ingest_bulk(teams, [make_doc("real_madrid", "v2"), make_doc("porto", "v1")], QUERY_FIELDS)
+
+    assert sync.poll_once() == 1
+    assert summarized == ["real_madrid"] * len(SUMMARY_VARIANTS)
+    assert embedded == [("real_madrid", list(SUMMARY_VARIANTS))]
+
+    doc = teams.find_one({"team": "real_madrid"})
+    assert doc is not None
+    assert doc["summaries"]["default"] == "summary of v2"
+    assert doc["summaries_content_hash"] == doc["content_hash"]
+
+    # nothing changed since the last poll
+    assert sync.poll_once() == 0
+
+
+def test_default_embedder_is_built_once(
+    summarized: list[str],
+    make_collection: Callable[..., Any],
+    make_doc: Callable[[str, str], dict[str, Any]],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    teams, vectors = make_collection("teams"), make_collection("summary_vectors")
+    embedders: list[object] = []
+    used: list[object] = []
+
+    def fake_embedder(**kwargs: Any) -> object:
+        embedders.append(object())
+        return embedders[-1]
+
+    def fake_upsert(embedder: object, *args: Any) -> int:
+        used.append(embedder)
+        return 1
+
+    monkeypatch.setattr(incremental_sync, "BatchEmbedder", fake_embedder)
+    monkeypatch.setattr(incremental_sync, "upsert_summary_embeddings", fake_upsert)
+    ingest_bulk(teams, [make_doc("real_madrid", "v1"), make_doc("porto", "v1")], QUERY_FIELDS)
+
+    assert IncrementalSync(teams, vectors).catch_up() == 2
+    assert len(embedders) == 1
+    assert used == embedders * 2
@@ -0,0 +1,85 @@
+from collections.abc import Callable
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.infra.embeddings import BatchEmbedder
+from src.infra.insert_embeddings import sync_embeddings, truncate_embeddings
+
+
+@pytest.fixture
+def source(make_collection: Callable[..., Any]) -> Any:
+    source = make_collection()
+    for team in ("porto", "benfica"):
+        source.insert_one({"team": team, "summaries": {"default": f"{team} summary", "recent": f"{team} lately"}})
+    return source
+
+
+def test_only_new_or_changed_summaries_are_embedded(
+    source: Any, make_collection: Callable[..., Any], fake_gateway: MagicMock, count_words: Callable[[str], int]
+) -> None:
+    vectors = make_collection()
+    gateway = fake_gateway
+    embedder = BatchEmbedder(gateway, "model", count_tokens=count_words)
+
+    assert sync_embeddings(source, vectors, embedder, batch_size=3) == 4
+    # pending summaries are written in bulk batches of 3
+    assert vectors.calls.count("bulk_write") == 2
+    assert sync_embeddings(source, vectors, embedder) == 0
+
+    source.docs[0]["summaries"]["recent"] = "porto regenerated summary"
+    gateway.requests.clear()
+    assert sync_embeddings(source, vectors, embedder) == 1
+    assert gateway.requests == [["porto regenerated summary"]]
+    assert len(vectors.docs) == 4
+    assert next(v for v in vectors.docs if v["team"] == "porto" and v["summary_type"] == "recent")["summary_text"] == (
+        "porto regenerated summary"
+    )
+
+
+def test_vectors_without_text_hash_are_backfilled_not_reembedded(
+    source: Any, make_collection: Callable[..., Any], fake_gateway: MagicMock, count_words: Callable[[str], int]
+) -> None:
+    vectors = make_collection()
+    for doc in source.docs:
+        for summary_type, text in doc["summaries"].items():
+            vectors.insert_one({"team": doc["team"], "summary_type": summary_type, "summary_text": text})
+    gateway = fake_gateway
+
+    assert sync_embeddings(source, vectors, BatchEmbedder(gateway, "model", count_tokens=count_words)) == 0
+    assert gateway.requests == []
+    assert all(vector.get("text_hash") for vector in vectors.docs)
+
+
+def test_changing_the_encoding_rewrites_stored_vectors(
+    source: Any, make_collection: Callable[..., Any], fake_gateway: MagicMock, count_words: Callable[[str], int]
+) -> None:
+    vectors = make_collection()
+    embedder = BatchEmbedder(fake_gateway, "model", count_tokens=count_words)
+    sync_embeddings(source, vectors, embedder)
+
+    assert sync_embeddings(source, vectors, embedder, encoding="float32") == 4
+    assert {vector["vector_encoding"] for vector in vectors.docs} == {"float32"}
+    assert sync_embeddings(source, vectors, embedder, encoding="float32") == 0
+
+
+def test_larger_vectors_are_truncated_then_smaller_ones_reembedded(
+    source: Any, make_collection: Callable[..., Any], fake_gateway: MagicMock, count_words: Callable[[str], int]
+) -> None:
+    vectors = make_collection()
+    vectors.insert_one({"team": "porto", "embedding": [3.0, 4.0, 12.0], "vector_encoding": "array", "dimensions": 3})
+    vectors.insert_one({"team": "benfica", "embedding": [1.0], "vector_encoding": "array", "dimensions": 1})
+    vectors.insert_one({"team": "inter", "embedding": [1, 2, 3], "vector_encoding": "int8", "dimensions": 3})
+
+    assert truncate_embeddings(vectors, dimensions=2) == 1
+    assert vectors.docs[0]["embedding"] == pytest.approx([0.6, 0.8])
+    assert vectors.docs[0]["dimensions"] == 2
+    assert [vector["dimensions"] for vector in vectors.docs[1:]] == [1, 3]
+
+    vectors = make_collection()
+    embedder = BatchEmbedder(fake_gateway, "model", count_tokens=count_words)
+    sync_embeddings(source, vectors, embedder, dimensions=1)
+    assert sync_embeddings(source, vectors, embedder, dimensions=1) == 0
+    # the fake embeddings have one dimension, so any other size is re-embedded
+    assert sync_embeddings(source, vectors, embedder, dimensions=256) == 4
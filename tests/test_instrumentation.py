@@ -0,0 +1,98 @@
+import json
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.infra import instrumentation as instrumentation_module
+from src.infra.instrumentation import SAMPLE_SIZE, Instrumentation, estimate_cost, percentile
+from src.infra.llm_gateway import LLMGateway
+
+
+@pytest.fixture
+def instrumentation(monkeypatch: pytest.MonkeyPatch) -> Instrumentation:
+    fresh = Instrumentation()
+    monkeypatch.setattr(instrumentation_module, "_instrumentation", fresh)
+    return fresh
+
+
+def test_percentiles_interpolate_between_ranks() -> None:
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == pytest.approx(50.5)
+    assert percentile(values, 95) == pytest.approx(95.05)
+    assert percentile([3.0], 99) == 3.0
+    assert percentile([], 50) == 0.0
+
+
+def test_cost_uses_the_longest_matching_model_price() -> None:
+    assert estimate_cost("gpt-4o-mini-2024-07-18", 1_000_000, 1_000_000) == pytest.approx(0.75)
+    assert estimate_cost("gpt-4o", 1_000_000, 0) == pytest.approx(2.5)
+    assert estimate_cost("unknown-model", 10, 10) is None
+
+
+def test_gateway_calls_are_recorded_per_stage_and_model(
+    instrumentation: Instrumentation, tmp_path: Path, raw_response: Callable[..., SimpleNamespace]
+) -> None:
+    client = MagicMock()
+    client.chat.completions.with_raw_response.create.side_effect = lambda **_: raw_response("ok")
+    gateway = LLMGateway(client=client)
+
+    with instrumentation.stage("summarize"), ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda _: gateway.chat([{"role": "user", "content": "hi"}], model="gpt-4o-mini"), range(8)))
+    with instrumentation.stage("rag_query"):
+        gateway.chat([{"role": "user", "content": "hi"}], model="gpt-4o")
+
+    path = instrumentation.finish_run("test", str(tmp_path))
+    with open(path, encoding="utf-8") as f:
+        report = json.load(f)
+
+    summarize = report["stages"]["summarize"]
+    assert summarize["runs"] == 1
+    assert summarize["models"]["gpt-4o-mini"]["calls"] == 8
+    assert summarize["models"]["gpt-4o-mini"]["prompt_tokens"] == 80
+    assert summarize["models"]["gpt-4o-mini"]["completion_tokens"] == 40
+    assert set(report["stages"]["rag_query"]["models"]) == {"gpt-4o"}
+    assert {"latency_p50", "latency_p95", "latency_p99"} <= set(summarize["models"]["gpt-4o-mini"])
+
+
+def test_concurrent_stages_record_their_own_calls(instrumentation: Instrumentation) -> None:
+    entered, exited = threading.Barrier(3), threading.Barrier(3)
+
+    def run(stage: str, model: str) -> None:
+        with instrumentation.stage(stage):
+            entered.wait()
+            instrumentation.record_call(model, 0.1)
+            exited.wait()
+
+    threads = [
+        threading.Thread(target=run, args=("summarize", "gpt-4o-mini")),
+        threading.Thread(target=run, args=("rag_query", "gpt-4o")),
+        threading.Thread(target=run, args=("rag_query", "gpt-4o")),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert {key: metrics.calls for key, metrics in instrumentation.metrics.items()} == {
+        ("summarize", "gpt-4o-mini"): 1,
+        ("rag_query", "gpt-4o"): 2,
+    }
+    assert instrumentation.stage_durations["rag_query"].count == 2
+    assert instrumentation.current_stage == "untracked"
+
+
+def test_latencies_are_kept_in_a_bounded_sample(instrumentation: Instrumentation) -> None:
+    with instrumentation.stage("summarize"):
+        for i in range(3 * SAMPLE_SIZE):
+            instrumentation.record_call("gpt-4o-mini", i / SAMPLE_SIZE)
+
+    latencies = instrumentation.metrics[("summarize", "gpt-4o-mini")].latencies
+    assert latencies.count == 3 * SAMPLE_SIZE
+    assert len(latencies.values) == SAMPLE_SIZE
+    # the sample is uniform over the run, not its first calls
+    assert 1.0 < percentile(latencies.values, 50) < 2.0
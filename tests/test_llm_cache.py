@@ -0,0 +1,65 @@
+from collections.abc import Callable
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.infra import llm_cache
+from src.infra.llm_cache import LLMResponseCache
+from src.infra.llm_gateway import LLMGateway
+
+MESSAGES = [{"role": "user", "content": "Who won the 2024 league?"}]
+
+
+def test_least_recently_used_responses_are_evicted(tmp_path: Path) -> None:
+    cache = LLMResponseCache(str(tmp_path / "cache.sqlite"), max_entries=2)
+    cache.put("a", "gpt", "A")
+    cache.put("b", "gpt", "B")
+    assert cache.get("a") == "A"  # "b" is now the least recently used
+    cache.put("c", "gpt", "C")
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ("A", "C")
+    assert cache.hit_ratio == 0.75
+
+
+def test_expired_responses_are_misses(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    cache = LLMResponseCache(str(tmp_path / "cache.sqlite"), ttl_seconds=60)
+    cache.put("a", "gpt", "A")
+
+    now[0] += 30
+    assert cache.get("a") == "A"
+    now[0] += 60
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_key_covers_model_and_parameters() -> None:
+    key = LLMResponseCache.request_key("gpt-4o-mini", MESSAGES, 100, 0.3)
+    assert key == LLMResponseCache.request_key("gpt-4o-mini", [dict(m) for m in MESSAGES], 100, 0.3)
+    assert key != LLMResponseCache.request_key("gpt-4o", MESSAGES, 100, 0.3)
+    assert key != LLMResponseCache.request_key("gpt-4o-mini", MESSAGES, 200, 0.3)
+    assert key != LLMResponseCache.request_key("gpt-4o-mini", MESSAGES, 100, 0.0)
+
+
+def test_gateway_serves_repeated_completions_from_cache(
+    tmp_path: Path, raw_response: Callable[..., SimpleNamespace]
+) -> None:
+    client = MagicMock()
+    client.chat.completions.with_raw_response.create.side_effect = lambda **_: raw_response("Porto")
+    gateway = LLMGateway(client=client, cache=LLMResponseCache(str(tmp_path / "cache.sqlite")))
+
+    assert gateway.chat(MESSAGES, model="gpt-4o-mini") == "Porto"
+    assert gateway.chat(MESSAGES, model="gpt-4o-mini") == "Porto"
+    assert gateway.stats.calls == 1
+
+    # the cache is persistent, and can be bypassed per request
+    reopened = LLMGateway(client=client, cache=LLMResponseCache(str(tmp_path / "cache.sqlite")))
+    assert reopened.chat(MESSAGES, model="gpt-4o-mini") == "Porto"
+    assert reopened.stats.calls == 0
+    reopened.chat(MESSAGES, model="gpt-4o-mini", use_cache=False)
+    assert reopened.stats.calls == 1
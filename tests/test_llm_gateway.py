@@ -0,0 +1,88 @@
+from collections.abc import Callable
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import httpx
+import openai
+import pytest
+
+from src.infra import llm_gateway
+from src.infra.llm_gateway import LLMGateway, RateBudget, parse_reset
+
+REQUEST = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+
+
+def rate_limit_error() -> openai.RateLimitError:
+    return openai.RateLimitError("rate limited", response=httpx.Response(429, request=REQUEST), body=None)
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    """Replace sleeping with a fake clock that records the waits and advances instantly."""
+    sleeps: list[float] = []
+    now = [1000.0]
+
+    def fake_sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr(llm_gateway.time, "sleep", fake_sleep)
+    monkeypatch.setattr(llm_gateway.time, "monotonic", lambda: now[0])
+    return sleeps
+
+
+def test_rate_limit_errors_are_retried_and_counted(
+    no_sleep: list[float], raw_response: Callable[..., SimpleNamespace]
+) -> None:
+    client = MagicMock()
+    client.chat.completions.with_raw_response.create.side_effect = [
+        rate_limit_error(),
+        rate_limit_error(),
+        raw_response("ok"),
+    ]
+    gateway = LLMGateway(client=client, base_delay=1.0)
+
+    assert gateway.chat([{"role": "user", "content": "hi"}]) == "ok"
+    assert (gateway.stats.calls, gateway.stats.retries, gateway.stats.failures) == (1, 2, 0)
+    assert (gateway.stats.prompt_tokens, gateway.stats.completion_tokens) == (10, 5)
+    # full jitter: the n-th retry waits up to base_delay * 2**n
+    assert 0 <= no_sleep[0] <= 1.0 and 0 <= no_sleep[1] <= 2.0
+
+
+def test_persistent_errors_are_raised() -> None:
+    client = MagicMock()
+    client.chat.completions.with_raw_response.create.side_effect = rate_limit_error()
+    gateway = LLMGateway(client=client, max_retries=2)
+
+    with pytest.raises(openai.RateLimitError):
+        gateway.chat([{"role": "user", "content": "hi"}])
+    assert (gateway.stats.retries, gateway.stats.failures) == (2, 1)
+
+
+def test_budget_waits_for_the_reset_when_exhausted(no_sleep: list[float]) -> None:
+    assert parse_reset("6m0s") == 360.0
+    assert parse_reset("20ms") == pytest.approx(0.02)
+
+    budget = RateBudget()
+    budget.update(httpx.Headers({"x-ratelimit-remaining-requests": "1", "x-ratelimit-reset-requests": "20ms"}))
+    budget.wait(estimated_tokens=100)
+    assert not no_sleep
+
+    budget.wait(estimated_tokens=100)
+    assert no_sleep == [pytest.approx(0.02)]
+
+
+def test_shortened_embeddings_are_requested_only_from_models_supporting_them() -> None:
+    client = MagicMock()
+    embeddings = SimpleNamespace(data=[SimpleNamespace(embedding=[0.6, 0.8])], usage=None)
+    client.embeddings.with_raw_response.create.return_value = SimpleNamespace(
+        headers=httpx.Headers(), parse=lambda: embeddings
+    )
+    gateway = LLMGateway(client=client)
+
+    gateway.embed("porto", model="text-embedding-3-small", dimensions=256)
+    gateway.embed("porto", model="text-embedding-ada-002", dimensions=256)
+
+    calls = client.embeddings.with_raw_response.create.call_args_list
+    assert calls[0].kwargs["dimensions"] == 256
+    assert "dimensions" not in calls[1].kwargs
@@ -0,0 +1,85 @@
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.steps.generate_summaries.chunking import SectionChunker
+from src.steps.generate_summaries.map_reduce import MAP_SYSTEM_MSG, REDUCE_SYSTEM_MSG, MapReduceSummarizer
+
+VARIANTS = ["{team} default: {content}", "{team} recent: {content}", "{team} achievements: {content}"]
+
+
+class FakeChat:
+    def __init__(self, fail: bool = False) -> None:
+        self.calls: list[tuple[str, str]] = []
+        self.fail = fail
+        self._lock = threading.Lock()
+
+    def __call__(self, system_msg: str, user_msg: str, max_tokens: int) -> str | None:
+        with self._lock:
+            self.calls.append((system_msg, user_msg))
+        if self.fail and system_msg == MAP_SYSTEM_MSG:
+            return None
+        return "partial summary"
+
+    def count(self, system_msg: str) -> int:
+        return sum(1 for system, _ in self.calls if system == system_msg)
+
+
+@pytest.fixture
+def make_summarizer(count_words: Callable[[str], int]) -> Callable[..., MapReduceSummarizer]:
+    def make(chat: FakeChat, max_tokens: int = 100) -> MapReduceSummarizer:
+        return MapReduceSummarizer(chat, SectionChunker(max_tokens, count_words), max_workers=4)
+
+    return make
+
+
+def test_map_stage_is_shared_across_variants(
+    make_summarizer: Callable[..., MapReduceSummarizer], make_article: Callable[[list[int]], str]
+) -> None:
+    chat = FakeChat()
+    summarizer = make_summarizer(chat)
+    article = make_article([60, 60, 60, 60])
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        results = list(executor.map(lambda prompt: summarizer.summarize(article, "porto", prompt, 50), VARIANTS))
+
+    assert results == ["partial summary"] * 3
+    # each chunk is summarized once, even with the variants running at the same time
+    assert chat.count(MAP_SYSTEM_MSG) == len(summarizer.chunker.chunk(article))
+    assert chat.count(REDUCE_SYSTEM_MSG) == 3
+    assert {user.split(":")[0] for system, user in chat.calls if system == REDUCE_SYSTEM_MSG} == {
+        "porto default",
+        "porto recent",
+        "porto achievements",
+    }
+
+
+def test_overflowing_partials_are_reduced_hierarchically(
+    make_summarizer: Callable[..., MapReduceSummarizer], count_words: Callable[[str], int]
+) -> None:
+    chat = FakeChat()
+    # 2-word partials, 5-word budget: 8 partials are combined over two levels before the final reduce
+    summarizer = make_summarizer(chat, max_tokens=5)
+    partials = [f"part {i}" for i in range(8)]
+
+    assert summarizer.reduce(partials, "porto", VARIANTS[0], 50) == "partial summary"
+    final_prompt = chat.calls[-1][1]
+    assert chat.calls[-1][0] == REDUCE_SYSTEM_MSG
+    assert count_words(final_prompt) <= count_words(VARIANTS[0]) + 5
+    assert len(chat.calls) > 2
+
+
+def test_failed_chunk_summaries_are_not_cached(
+    make_summarizer: Callable[..., MapReduceSummarizer], make_article: Callable[[list[int]], str]
+) -> None:
+    failing = FakeChat(fail=True)
+    summarizer = make_summarizer(failing)
+    article = make_article([60, 60])
+
+    assert summarizer.summarize(article, "porto", VARIANTS[0], 50) is None
+
+    summarizer.chat = chat = FakeChat()
+    assert summarizer.summarize(article, "porto", VARIANTS[0], 50) == "partial summary"
+    assert chat.count(MAP_SYSTEM_MSG) == 2
@@ -0,0 +1,55 @@
+from collections.abc import Callable
+from typing import Any
+
+from src.steps.etl.mongo_ingest_step import collection_state, ingest_bulk, ingest_per_document
+
+QUERY_FIELDS = ["team", "source_url"]
+
+
+def test_bulk_ingest_counts_inserts_updates_and_skips(
+    fake_collection: Any, make_doc: Callable[[str, str], dict[str, Any]]
+) -> None:
+    docs = [make_doc("real_madrid", "v1"), make_doc("fc_barcelona", "v1")]
+    first = ingest_bulk(fake_collection, docs, QUERY_FIELDS)
+    assert (first.inserted, first.updated, first.skipped) == (2, 0, 0)
+
+    docs = [make_doc("real_madrid", "v2"), make_doc("fc_barcelona", "v1"), make_doc("porto", "v1")]
+    fake_collection.calls.clear()
+    second = ingest_bulk(fake_collection, docs, QUERY_FIELDS)
+
+    assert (second.inserted, second.updated, second.skipped) == (1, 1, 1)
+    assert fake_collection.calls == ["find", "bulk_write"]
+    assert {doc["team"]: doc["content"] for doc in fake_collection.docs} == {
+        "real_madrid": "v2",
+        "fc_barcelona": "v1",
+        "porto": "v1",
+    }
+
+
+def test_bulk_ingest_batches(fake_collection: Any, make_doc: Callable[[str, str], dict[str, Any]]) -> None:
+    docs = [make_doc(f"team_{i}", "text") for i in range(5)]
+    stats = ingest_bulk(fake_collection, docs, QUERY_FIELDS, batch_size=2)
+
+    assert stats.inserted == 5
+    assert fake_collection.calls.count("bulk_write") == 3
+
+
+def test_bulk_matches_per_document(fake_collection: Any, make_doc: Callable[[str, str], dict[str, Any]]) -> None:
+    docs = [make_doc("real_madrid", "v1"), make_doc("porto", "v1")]
+    ingest_per_document(fake_collection, docs, QUERY_FIELDS)
+
+    # documents written before content hashes existed are updated once to backfill the hash
+    stats = ingest_bulk(fake_collection, docs, QUERY_FIELDS)
+    assert (stats.inserted, stats.updated, stats.skipped) == (0, 2, 0)
+    assert ingest_bulk(fake_collection, docs, QUERY_FIELDS).skipped == 2
+
+
+def test_collection_state_tracks_stored_content(
+    fake_collection: Any, make_doc: Callable[[str, str], dict[str, Any]]
+) -> None:
+    ingest_bulk(fake_collection, [make_doc("real_madrid", "v1"), make_doc("porto", "v1")], QUERY_FIELDS)
+    state = collection_state(fake_collection, QUERY_FIELDS)
+    assert [row[0] for row in state] == ["porto", "real_madrid"]
+
+    fake_collection.docs.pop()
+    assert collection_state(fake_collection, QUERY_FIELDS) != state
@@ -3,7 +3,14 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 from src.configs.settings import Settings
-from src.search.search_tracing_opik import answer_query_with_context
+from src.infra.llm_gateway import LLMGateway
+from src.search import search_tracing_opik
+from src.search.search_tracing_opik import answer_query_with_context, get_rag_service
+
+
+@pytest.fixture(autouse=True)
+def fresh_rag_service(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(search_tracing_opik, "_rag_service", None)
 
 
 @pytest.fixture
@@ -22,11 +29,11 @@ def fake_chat_response() -> MagicMock:
     return mock
 
 
-@patch("src.search.search_tracing_opik.OpenAI")
+@patch("src.search.search_tracing_opik.get_llm_gateway")
 @patch("src.search.search_tracing_opik.Settings", autospec=True)
 def test_answer_query_with_context(
     mock_settings_cls: MagicMock,
-    mock_openai_cls: MagicMock,
+    mock_get_gateway: MagicMock,
     fake_embedding_response: MagicMock,
     fake_chat_response: MagicMock,
 ) -> None:
@@ -38,14 +45,19 @@ def test_answer_query_with_context(
     mock_settings.mongodb_collection_index = "test_collection"
     mock_settings.mongodb_collection_index_name = "test_index"
     mock_settings.openai_embedding_model = "fake-embedding-model"
+    mock_settings.openai_embedding_dimensions = 1536
     mock_settings.openai_llm_model = "fake-llm-model"
+    mock_settings.vector_encoding = "array"
+    mock_settings.vector_backend = "atlas"
     mock_settings_cls.return_value = mock_settings
 
     # Configure mocked OpenAI client
     mock_openai = MagicMock()
     mock_openai.embeddings.create.return_value = fake_embedding_response
     mock_openai.chat.completions.create.return_value = fake_chat_response
-    mock_openai_cls.return_value = mock_openai
+    # the gateway traces calls through a copy of the client sharing its connection pool
+    mock_openai.with_options.return_value = mock_openai
+    mock_get_gateway.return_value = LLMGateway(client=mock_openai)
 
     # Fake MongoDB vector search results
     fake_results = [
@@ -59,7 +71,7 @@ def test_answer_query_with_context(
         }
     ]
 
-    with patch("src.search.search_tracing_opik.MongoVectorSearchClient") as mock_client_cls:
+    with patch("src.infra.retrievers.MongoVectorSearchClient") as mock_client_cls:
         mock_client_instance = mock_client_cls.return_value
         mock_client_instance.vector_search.return_value = fake_results
         mock_client_instance.close_connection.return_value = None
@@ -68,17 +80,24 @@ def test_answer_query_with_context(
         query = "When did Atlético Madrid last win La Liga?"
         answer = answer_query_with_context(query, limit=3)
 
+        # Settings and clients are created once, and the connection stays open between queries
+        answer_query_with_context(query, limit=3)
+        mock_settings_cls.assert_called_once()
+        mock_client_cls.assert_called_once()
+        mock_client_instance.close_connection.assert_not_called()
+
     # Assertions
     assert "test answer" in answer.lower()
 
     # Verify OpenAI embeddings was called correctly
-    mock_openai.embeddings.create.assert_called_once_with(model="fake-embedding-model", input=query)
+    mock_openai.embeddings.create.assert_called_with(model="fake-embedding-model", input=query)
+    assert mock_openai.embeddings.create.call_count == 2
 
     # Verify chat completion was called
-    mock_openai.chat.completions.create.assert_called_once()
+    assert mock_openai.chat.completions.create.call_count == 2
 
     # Verify vector search was called with correct parameters
-    mock_client_instance.vector_search.assert_called_once_with(
+    mock_client_instance.vector_search.assert_called_with(
         collection_name="test_collection",
         index_name="test_index",
         attr_name="embedding",
@@ -86,5 +105,6 @@ def test_answer_query_with_context(
         limit=3,
     )
 
-    # Verify connection cleanup
+    # Verify connection cleanup when the service is closed
+    get_rag_service().close()
     mock_client_instance.close_connection.assert_called_once()
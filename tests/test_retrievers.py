@@ -0,0 +1,81 @@
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.infra.local_vector_index import ExactVectorIndex, HnswVectorIndex  # noqa: E402
+
+
+@pytest.fixture
+def vectors(make_collection: Callable[..., Any]) -> Any:
+    vectors = make_collection()
+    for team, embedding in (("porto", [1.0, 0.0, 0.0]), ("benfica", [0.0, 1.0, 0.0]), ("inter", [0.6, 0.8, 0.0])):
+        vectors.insert_one(
+            {"team": team, "summary_type": "default", "summary_text": f"{team} summary", "text_hash": team}
+            | {"embedding": embedding, "dimensions": 3}
+        )
+    return vectors
+
+
+def search(index: ExactVectorIndex, query: list[float], limit: int = 2) -> list[str]:
+    return [result["team"] for result in index.vector_search("summary_vectors", "index", "embedding", query, limit)]
+
+
+def test_exact_search_returns_atlas_shaped_results(vectors: Any) -> None:
+    index = ExactVectorIndex.from_collection(vectors)
+    results = index.vector_search("summary_vectors", "index", "embedding", [2.0, 0.1, 0.0], limit=2)
+
+    assert [result["team"] for result in results] == ["porto", "inter"]
+    assert set(results[0]) == {"_id", "team", "summary_type", "summary_text", "source_url", "search_score"}
+    # cosine similarities are mapped to [0, 1] like Atlas scores
+    assert results[0]["search_score"] == pytest.approx((1 + 2 / np.sqrt(4.01)) / 2)
+    assert len(search(index, [0.0, 0.0, 1.0], limit=10)) == 3
+
+
+def test_sync_fetches_only_changed_vectors_and_persists(vectors: Any, tmp_path: Path) -> None:
+    index = ExactVectorIndex.from_collection(vectors)
+    assert index.sync(vectors) == 0
+
+    vectors.docs[1] |= {"text_hash": "benfica v2", "embedding": [0.0, 0.0, 1.0]}
+    vectors.docs.pop(0)
+    vectors.calls.clear()
+    assert index.sync(vectors) == 1
+    assert vectors.calls == ["find", "find"]
+    assert search(index, [0.0, 0.0, 1.0], limit=1) == ["benfica"]
+    assert len(index.records) == 2
+
+    index.save(str(tmp_path / "index"))
+    loaded = ExactVectorIndex.load(str(tmp_path / "index"))
+    assert isinstance(loaded.vectors, np.memmap)
+    assert search(loaded, [0.6, 0.8, 0.0]) == search(index, [0.6, 0.8, 0.0]) == ["inter", "benfica"]
+
+
+def test_hnsw_index_matches_exact_search(fake_collection: Any, tmp_path: Path) -> None:
+    pytest.importorskip("hnswlib")
+    rng = np.random.default_rng(0)
+    vectors = fake_collection
+    for i, embedding in enumerate(rng.normal(size=(200, 16))):
+        vectors.insert_one({"team": f"team {i}", "text_hash": str(i), "embedding": embedding.tolist(), "dimensions": 16})
+    exact, hnsw = ExactVectorIndex.from_collection(vectors), HnswVectorIndex.from_collection(vectors)
+    query = rng.normal(size=16).tolist()
+
+    assert search(hnsw, query, limit=5) == search(exact, query, limit=5)
+    hnsw.save(str(tmp_path / "index"))
+    assert search(HnswVectorIndex.load(str(tmp_path / "index")), query, limit=5) == search(exact, query, limit=5)
+
+
+def test_vectors_of_another_size_are_left_out_of_the_index(vectors: Any) -> None:
+    vectors.insert_one({"team": "ajax", "text_hash": "ajax", "embedding": [1.0, 0.0], "dimensions": 2})
+
+    with pytest.raises(ValueError, match="sizes"):
+        ExactVectorIndex.from_collection(vectors)
+
+    index = ExactVectorIndex.from_collection(vectors, dimensions=3)
+    assert sorted(record["team"] for record in index.records) == ["benfica", "inter", "porto"]
+
+    # after a change of embedding size, the index is rebuilt from the vectors of the new size
+    assert index.sync(vectors, dimensions=2) == 1
+    assert search(index, [1.0, 0.0]) == ["ajax"]
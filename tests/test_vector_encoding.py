@@ -0,0 +1,60 @@
+import math
+
+import bson
+import pytest
+
+from src.infra.vector_encoding import (
+    decode_vector,
+    encode_vector,
+    pack_bits,
+    quantize_int8,
+    truncate_vector,
+    vector_index_field,
+)
+
+
+def cosine(a: list[float], b: list[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b, strict=True))
+    return dot / (math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b)))
+
+
+VECTOR = [math.sin(i) for i in range(64)]
+
+
+def test_encodings_round_trip_and_shrink_documents() -> None:
+    sizes = {
+        encoding: len(bson.encode({"embedding": encode_vector(VECTOR, encoding)}))
+        for encoding in ("array", "float32", "int8", "packed_bit")
+    }
+    assert sizes["array"] > sizes["float32"] > sizes["int8"] > sizes["packed_bit"]
+
+    assert encode_vector(VECTOR, "array") == VECTOR
+    assert decode_vector(encode_vector(VECTOR, "float32")) == pytest.approx(VECTOR, abs=1e-6)
+    assert decode_vector(encode_vector(VECTOR, "int8")) == quantize_int8(VECTOR)
+
+
+def test_int8_quantization_preserves_cosine() -> None:
+    quantized = quantize_int8(VECTOR)
+    assert max(abs(x) for x in quantized) == 127
+    assert cosine(VECTOR, [float(x) for x in quantized]) > 0.999
+    assert quantize_int8([0.0, 0.0]) == [0, 0]
+
+
+def test_bits_are_packed_most_significant_first() -> None:
+    assert pack_bits([1.0, -1.0, 0.5, -0.5, 0.0, 2.0, -3.0, 1.0, 0.7]) == [0b10100101, 0b10000000]
+
+
+def test_index_field_matches_the_stored_encoding() -> None:
+    assert vector_index_field("packed_bit", "binary", 1536) == {
+        "type": "vector",
+        "numDimensions": 1536,
+        "path": "embedding",
+        "similarity": "euclidean",
+    }
+    assert vector_index_field("float32", "scalar", 1536)["quantization"] == "scalar"
+    assert "quantization" not in vector_index_field("int8", "scalar", 1536)
+
+
+def test_truncated_vectors_are_renormalized() -> None:
+    assert truncate_vector([3.0, 4.0, 12.0], 2) == pytest.approx([0.6, 0.8])
+    assert truncate_vector([0.0, 0.0, 1.0], 2) == [0.0, 0.0]
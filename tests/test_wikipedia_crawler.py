@@ -0,0 +1,164 @@
+import random
+import time
+from pathlib import Path
+from typing import Any
+
+from src.steps.etl.rate_limiter import RateLimiter
+from src.steps.etl.wikipedia_crawler import extract_wikipedia_page, refresh_wikipedia_page
+
+SECTIONS = [
+    {"index": "1", "level": "2", "number": "1", "line": "History", "anchor": "History"},
+    {"index": "2", "level": "3", "number": "1.1", "line": "Founding", "anchor": "Founding"},
+    {"index": "3", "level": "2", "number": "2", "line": "Stadium", "anchor": "Stadium"},
+    {"index": "4", "level": "2", "number": "3", "line": "References", "anchor": "References"},
+]
+
+
+def section_block(sec: dict[str, str]) -> str:
+    """Render the heading and own body of a section like the MediaWiki parser does."""
+    level, index = sec["level"], sec["index"]
+    heading = (
+        f'<div class="mw-heading mw-heading{level}"><h{level} id="{sec["anchor"]}">{sec["line"]}</h{level}>'
+        f'<span class="mw-editsection">[<a href="/edit">edit</a>]</span></div>'
+    )
+    if sec["line"] == "References":
+        return heading + '<div class="reflist"><ol class="references"><li>Cited source</li></ol></div>'
+    return (
+        f'{heading}<p>Section <a href="/wiki/X">{index}</a> text<sup class="reference">[{index}]</sup>.</p>'
+        f"<style>.x{{}}</style>"
+    )
+
+
+def wrap(html: str) -> str:
+    return f'<div class="mw-content-ltr mw-parser-output">{html}</div><!-- NewPP limit report -->'
+
+
+# A section transcluded from a template ("T-1") between two page sections
+TRANSCLUDED_SECTIONS = [
+    *SECTIONS[:2],
+    {"index": "T-1", "level": "2", "number": "2", "line": "Honours", "anchor": "Honours"},
+    *SECTIONS[2:],
+]
+
+
+def wikitext(bodies: dict[str, str], sections: list[dict[str, str]]) -> str:
+    lines = ["Lead paragraph."]
+    # transcluded headings live in the template, not in the page wikitext
+    for sec in (sec for sec in sections if sec["index"].isdigit()):
+        marker = "=" * int(sec["level"])
+        lines += [f"{marker} {sec['line']} {marker}", bodies.get(sec["index"], f"Section {sec['index']} text.")]
+    return "\n".join(lines)
+
+
+class FakeWikipediaClient:
+    """In-memory stand-in for WikipediaApiClient that answers out of order."""
+
+    def __init__(self, bodies: dict[str, str] | None = None, sections: list[dict[str, str]] = SECTIONS) -> None:
+        self.calls: list[dict[str, str]] = []
+        self.bodies = bodies or {}
+        self.sections = sections
+
+    def get(self, params: dict[str, str]) -> dict[str, Any]:
+        self.calls.append(params)
+        sections = self.sections
+        if params["prop"] == "sections":
+            return {"parse": {"sections": sections}}
+
+        if params["prop"] == "sections|wikitext":
+            return {"parse": {"sections": sections, "wikitext": {"*": wikitext(self.bodies, sections)}}}
+
+        if params["prop"] == "text|sections":
+            page = "<p>Lead paragraph.</p>" + "".join(section_block(sec) for sec in sections)
+            return {"parse": {"sections": sections, "text": {"*": wrap(page)}}}
+
+        time.sleep(random.uniform(0, 0.02))
+        position = next(i for i, sec in enumerate(sections) if sec["index"] == params["section"])
+        level = int(sections[position]["level"])
+        blocks = [section_block(sections[position])]
+        for sec in sections[position + 1 :]:
+            if int(sec["level"]) <= level:
+                break
+            blocks.append(section_block(sec))
+
+        html = "".join(blocks)
+        if sections[position]["line"] == "References":
+            # a single-section parse has no citations to list
+            html = html.replace("<li>Cited source</li>", "")
+        return {"parse": {"text": {"*": wrap(html)}}}
+
+
+def test_concurrent_extraction_matches_sequential(tmp_path: Path) -> None:
+    sequential = extract_wikipedia_page("Test_FC", str(tmp_path / "seq.md"), max_workers=1, client=FakeWikipediaClient())
+    concurrent = extract_wikipedia_page("Test_FC", str(tmp_path / "par.md"), max_workers=8, client=FakeWikipediaClient())
+
+    assert sequential is not None
+    assert sequential == concurrent
+    assert (tmp_path / "seq.md").read_bytes() == (tmp_path / "par.md").read_bytes()
+
+    # Sections are written in TOC order with cleaned text
+    positions = [sequential.index(f"{'#' * int(s['level'])} {s['line']}\n") for s in SECTIONS]
+    assert positions == sorted(positions)
+    assert "Section 3 text ." in sequential
+    assert "[3]" not in sequential
+
+
+def test_full_page_mode_matches_section_mode(tmp_path: Path) -> None:
+    client = FakeWikipediaClient()
+    by_section = extract_wikipedia_page("Test_FC", str(tmp_path / "sections.md"), client=FakeWikipediaClient())
+    full_page = extract_wikipedia_page("Test_FC", str(tmp_path / "full.md"), client=client, mode="full_page")
+
+    assert full_page is not None
+    assert full_page == by_section
+    assert len(client.calls) == 1
+
+    # Parent sections include their subsections, the lead is not part of any section
+    assert "History [ edit ] Section 1 text . Founding [ edit ] Section 2 text ." in full_page
+    assert "Lead paragraph" not in full_page
+    assert "Cited source" not in full_page
+
+
+def test_refresh_refetches_only_changed_sections(tmp_path: Path) -> None:
+    out_path = str(tmp_path / "team.md")
+
+    first_client = FakeWikipediaClient()
+    first = refresh_wikipedia_page("Test_FC", out_path, client=first_client)
+    assert first is not None
+    full_text, fingerprints = first
+    assert len([c for c in first_client.calls if c["prop"] == "text"]) == len(SECTIONS)
+    assert full_text == extract_wikipedia_page("Test_FC", str(tmp_path / "baseline.md"), client=FakeWikipediaClient())
+
+    # Editing the subsection changes it and its parent, the other sections are reused from disk
+    second_client = FakeWikipediaClient(bodies={"2": "Rewritten founding story."})
+    second = refresh_wikipedia_page("Test_FC", out_path, fingerprints, client=second_client)
+    assert second is not None
+    assert sorted(c["section"] for c in second_client.calls if c["prop"] == "text") == ["1", "2"]
+    assert second[1]["3"] == fingerprints["3"]
+    assert second[1]["1"] != fingerprints["1"]
+    assert second[0] == full_text
+
+
+def test_refresh_reuses_sections_around_a_transcluded_one(tmp_path: Path) -> None:
+    out_path = str(tmp_path / "team.md")
+    first = refresh_wikipedia_page("Test_FC", out_path, client=FakeWikipediaClient(sections=TRANSCLUDED_SECTIONS))
+    assert first is not None
+    full_text, fingerprints = first
+    assert "T-1" not in fingerprints
+
+    # the transcluded section has no fingerprint and is refetched, the unchanged page sections are not
+    client = FakeWikipediaClient(bodies={"2": "Rewritten founding story."}, sections=TRANSCLUDED_SECTIONS)
+    second = refresh_wikipedia_page("Test_FC", out_path, fingerprints, client=client)
+    assert second is not None
+    assert sorted(c["section"] for c in client.calls if c["prop"] == "text") == ["1", "2", "T-1"]
+    assert second[0] == full_text
+
+
+def test_rate_limiter_caps_request_rate() -> None:
+    limiter = RateLimiter(rate=50, burst=1)
+
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.acquire()
+    elapsed = time.monotonic() - start
+
+    # First token is immediate, the remaining five wait 1/50 s each
+    assert elapsed >= 0.09